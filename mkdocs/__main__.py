@@ -92,7 +92,7 @@ class State:
 
 pass_state = click.make_pass_decorator(State, ensure=True)
 
-clean_help = "Remove old files from the site_dir before building (the default)."
+clean_help = "Remove the files which the build doesn't output from the site_dir (the default)."
 config_help = "Provide a specific MkDocs config"
 dev_addr_help = "IP address and port to serve documentation locally (default: localhost:8000)"
 strict_help = "Enable strict mode. This will cause MkDocs to abort the build on any warnings."
@@ -126,6 +126,14 @@ watch_theme_help = (
     "Ignored when live reload is not used."
 )
 shell_help = "Use the shell when invoking Git."
+jobs_help = (
+    "The number of processes used to render Markdown, and of threads used to find files "
+    "and render templates (default: 1). Use 0 for one per CPU."
+)
+profile_help = (
+    "Write a JSON report of the time spent in each phase of the build, each page and each "
+    "plugin event handler to FILE, and a Chrome trace of the build next to it."
+)
 watch_help = "A directory or file to watch for live reloading. Can be supplied multiple times."
 
 
@@ -229,13 +237,20 @@ def serve_command(dev_addr, livereload, watch, **kwargs):
 @click.option('-c', '--clean/--dirty', is_flag=True, default=True, help=clean_help)
 @common_config_options
 @click.option('-d', '--site-dir', type=click.Path(), help=site_dir_help)
+@click.option('-j', '--jobs', type=click.IntRange(min=0), default=1, help=jobs_help)
+@click.option('--profile', type=click.Path(dir_okay=False), metavar='FILE', help=profile_help)
 @common_options
-def build_command(clean, **kwargs):
+def build_command(clean, jobs, profile, **kwargs):
     """Build the MkDocs documentation"""
     from mkdocs.commands import build
 
     _enable_warnings()
-    build.build(config.load_config(**kwargs), dirty=not clean)
+    build.build(
+        config.load_config(**kwargs),
+        dirty=not clean,
+        jobs=jobs or os.cpu_count(),
+        profile=profile,
+    )
 
 
 @cli.command(name="gh-deploy")
@@ -1,16 +1,35 @@
-import gzip
+import collections
+import copy
+import json
 import logging
+import multiprocessing
 import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from urllib.parse import urlsplit
 
 import jinja2
+import jinja2.meta
 from jinja2.exceptions import TemplateNotFound
 
 import mkdocs
 from mkdocs import utils
 from mkdocs.exceptions import Abort, BuildError
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.anchors import AnchorIndex
+from mkdocs.structure.dependencies import DependencyGraph
 from mkdocs.structure.files import Files, get_files
 from mkdocs.structure.nav import get_navigation
+from mkdocs.structure.pages import Page, active_page, get_render_cache, read_page_heads
+from mkdocs.theme import Theme, install_bytecode_cache
+from mkdocs.utils import compress, staging, templates
+from mkdocs.utils.cache import SpillFile, json_default
+from mkdocs.utils.filters import NAV_ITEMS_FILE
+from mkdocs.utils.manifest import BuildManifest
+from mkdocs.utils.profiler import Profiler, get_profiler, set_profiler, span
 
 
 class DuplicateFilter:
@@ -107,21 +126,40 @@ def _build_theme_template(template_name, env, files, config, nav):
 
     if output.strip():
         output_path = os.path.join(config['site_dir'], template_name)
-        utils.write_file(output.encode('utf-8'), output_path)
+        data = output.encode('utf-8')
+        written = utils.write_file(data, output_path)
 
         if template_name == 'sitemap.xml':
-            log.debug(f"Gzipping template: {template_name}")
-            gz_filename = f'{output_path}.gz'
-            with open(gz_filename, 'wb') as f:
-                timestamp = utils.get_build_timestamp()
-                with gzip.GzipFile(
-                    fileobj=f, filename=gz_filename, mode='wb', mtime=timestamp
-                ) as gz_buf:
-                    gz_buf.write(output.encode('utf-8'))
+            gz_path = f'{output_path}.gz'
+            # The gzip header holds the build time, so the copy would differ in each build.
+            if not written and os.path.isfile(gz_path):
+                utils.keep_file(gz_path)
+            else:
+                log.debug(f"Gzipping template: {template_name}")
+                level = config['precompress_gzip_level']
+                utils.write_file(compress.gzip_compress(data, output_path, level), gz_path)
     else:
         log.info(f"Template skipped: '{template_name}' generated empty output.")
 
 
+def _compile_extra_template(template_name, source, filename, config):
+    """
+    Return the template compiled from `source`, like `jinja2.Template(source)` does.
+
+    If a `cache_dir` is configured, the compiled template is cached in it between builds.
+    """
+    if not config.get('cache_dir'):
+        return jinja2.Template(source)
+
+    def load(name):
+        if name == template_name:
+            return source, filename, lambda: True
+
+    env = jinja2.Environment(loader=jinja2.FunctionLoader(load))
+    install_bytecode_cache(env, config['cache_dir'])
+    return env.get_template(template_name)
+
+
 def _build_extra_template(template_name, files, config, nav):
     """Build user templates which are not part of the theme."""
 
@@ -134,7 +172,8 @@ def _build_extra_template(template_name, files, config, nav):
 
     try:
         with open(file.abs_src_path, encoding='utf-8', errors='strict') as f:
-            template = jinja2.Template(f.read())
+            source = f.read()
+        template = _compile_extra_template(template_name, source, file.abs_src_path, config)
     except Exception as e:
         log.warning(f"Error reading template '{template_name}': {e}")
         return
@@ -147,33 +186,13 @@ def _build_extra_template(template_name, files, config, nav):
         log.info(f"Template skipped: '{template_name}' generated empty output.")
 
 
-def _populate_page(page, config, files, dirty=False):
-    """Read page content from docs_dir and render Markdown."""
-
+@contextmanager
+def _page_errors(action, page):
+    """Log which page failed, and at which stage, before re-raising the error."""
     try:
-        # When --dirty is used, only read the page if the file has been modified since the
-        # previous build of the output.
-        if dirty and not page.file.is_modified():
-            return
-
-        # Run the `pre_page` plugin event
-        page = config['plugins'].run_event('pre_page', page, config=config, files=files)
-
-        page.read_source(config)
-
-        # Run `page_markdown` plugin events.
-        page.markdown = config['plugins'].run_event(
-            'page_markdown', page.markdown, page=page, config=config, files=files
-        )
-
-        page.render(config, files)
-
-        # Run `page_content` plugin events.
-        page.content = config['plugins'].run_event(
-            'page_content', page.content, page=page, config=config, files=files
-        )
+        yield
     except Exception as e:
-        message = f"Error reading page '{page.file.src_uri}':"
+        message = f"Error {action} page '{page.file.src_uri}':"
         # Prevent duplicated the error message because it will be printed immediately afterwards.
         if not isinstance(e, BuildError):
             message += f" {e}"
@@ -181,60 +200,651 @@ def _populate_page(page, config, files, dirty=False):
         raise
 
 
-def _build_page(page, config, doc_files, nav, env, dirty=False):
-    """Pass a Page to theme template and write output to site_dir."""
+def _populate_page(page, config, files):
+    """Read page content from docs_dir and render Markdown."""
+
+    src_uri = page.file.src_uri
+    with _page_errors('reading', page):
+        with span('page', 'read', src_uri):
+            # Run the `pre_page` plugin event
+            page = config['plugins'].run_event('pre_page', page, config=config, files=files)
+
+            page.read_source(config)
 
+            # Run `page_markdown` plugin events.
+            page.markdown = config['plugins'].run_event(
+                'page_markdown', page.markdown, page=page, config=config, files=files
+            )
+
+        with span('page', 'markdown', src_uri):
+            page.render(config, files)
+
+        with span('page', 'content', src_uri):
+            # Run `page_content` plugin events.
+            page.content = config['plugins'].run_event(
+                'page_content', page.content, page=page, config=config, files=files
+            )
+
+
+class _RecordCollector(logging.Handler):
+    """Keep log records emitted in a worker process so they can be replayed in the parent."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Only the formatted message survives pickling reliably.
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+_worker = {}
+
+
+def _init_render_worker(config, files, level):
+    """Set up a worker process of the parallel Markdown renderer."""
+    collector = _RecordCollector()
+    logger = logging.getLogger('mkdocs')
+    logger.handlers = [collector]
+    logger.setLevel(level)
+    logger.propagate = False
+    _worker.update(config=config, files=files, collector=collector)
+
+
+def _render_page_source(item):
+    """
+    Render one page's Markdown in a worker process.
+
+    Return `(content, toc, log_records, unresolved_links, link_targets, timing)`, where
+    `timing` is the `(start, duration, pid)` of the conversion.
+    """
+    src_uri, markdown = item
+    config, files = _worker['config'], _worker['files']
+    page = Page(None, files.get_file_from_path(src_uri), config)
+    page.markdown = markdown
+    start = time.time()
     try:
-        # When --dirty is used, only build the page if the file has been modified since the
-        # previous build of the output.
-        if dirty and not page.file.is_modified():
-            return
+        page.render(config, files)
+    finally:
+        records = _worker['collector'].records
+        _worker['collector'].records = []
+        unresolved = files.link_index.unresolved
+        files.link_index.unresolved = []
+        targets = files.link_index.targets.pop(src_uri, set())
+    timing = (start, time.time() - start, os.getpid())
+    return page.content, page.toc, records, unresolved, targets, timing
 
-        log.debug(f"Building page {page.file.src_uri}")
 
-        # Activate page. Signals to theme that this is the current page.
-        page.active = True
+def _detach_file(file):
+    """Return a copy of a File without its Page, so that it can be cheaply sent to a worker."""
+    file = copy.copy(file)
+    file.page = None
+    return file
 
-        context = get_context(nav, doc_files, config, page)
 
-        # Allow 'template:' override in md source files.
-        if 'template' in page.meta:
-            template = env.get_template(page.meta['template'])
-        else:
-            template = env.get_template('main.html')
+def _populate_pages_in_parallel(pages, config, files, jobs, spill_file=None, on_populated=None):
+    """
+    Populate pages like `_populate_page` does, converting Markdown in a pool of `jobs` processes.
+
+    Plugin events still run in this process and in page order: `pre_page`, `page_read_source`
+    and `page_markdown` events fire for all pages first, then the Markdown of all pages is
+    converted in parallel, then `page_content` events fire for all pages.
 
-        # Run `page_context` plugin events.
-        context = config['plugins'].run_event(
-            'page_context', context, page=page, config=config, nav=nav
+    If a `spill_file` is given, the Markdown of each page is kept in it rather than in memory
+    in between. `on_populated` is called with each page once it is populated.
+    """
+    worker_config = {
+        key: config.get(key) for key in ('markdown_extensions', 'mdx_configs', 'cache_dir')
+    }
+    try:
+        pickle.dumps(worker_config)
+    except Exception as e:
+        log.warning(
+            f"The Markdown extensions can not be passed to worker processes ({e}). "
+            "Rendering pages serially."
         )
+        for page in pages:
+            _populate_page(page, config, files)
+            if on_populated is not None:
+                on_populated(page)
+        return
+
+    queue = []
+    for page in pages:
+        with _page_errors('reading', page), span('page', 'read', page.file.src_uri):
+            page = config['plugins'].run_event('pre_page', page, config=config, files=files)
+            page.read_source(config)
+            page.markdown = config['plugins'].run_event(
+                'page_markdown', page.markdown, page=page, config=config, files=files
+            )
+            if spill_file is not None:
+                page.spill(spill_file)
+        queue.append(page)
+
+    detached = Files([_detach_file(file) for file in files])
+    level = logging.getLogger('mkdocs').getEffectiveLevel()
+    # Spilled Markdown is only read back as the pool takes it.
+    items = ((page.file.src_uri, page.markdown) for page in queue)
+    chunksize = max(1, min(64, len(queue) // (jobs * 4)))
+    with multiprocessing.Pool(jobs, _init_render_worker, (worker_config, detached, level)) as pool:
+        results = pool.imap(_render_page_source, items, chunksize)
+        profiler = get_profiler()
+        for page in queue:
+            src_uri = page.file.src_uri
+            with _page_errors('reading', page):
+                page.content, page.toc, records, unresolved, targets, timing = next(results)
+                for record in records:
+                    logging.getLogger(record.name).handle(record)
+                files.link_index.unresolved.extend(unresolved)
+                files.link_index.targets[src_uri].update(targets)
+                start, duration, pid = timing
+                if profiler is not None:
+                    profiler.add('page', 'markdown', src_uri, start, duration, pid=pid, tid=pid)
+                with span('page', 'content', src_uri):
+                    page.content = config['plugins'].run_event(
+                        'page_content', page.content, page=page, config=config, files=files
+                    )
+                if on_populated is not None:
+                    on_populated(page)
+
+
+@contextmanager
+def _unspilled(page, spill_file):
+    """Keep the text of a page in memory for the duration, if it is kept in `spill_file`."""
+    if spill_file is None:
+        yield
+        return
+    page.unspill()
+    try:
+        yield
+    finally:
+        page.spill(spill_file)
+
+
+def _check_anchors(anchor_index, files, config):
+    """
+    Report the links to anchors which don't exist in the pages linked to, at the level of the
+    `validate_anchors` option, and write the `anchor_report` if there is one.
+    """
+    levels = {'warn': logging.WARNING, 'info': logging.INFO, 'ignore': None}
+    broken = anchor_index.check(levels[config['validate_anchors']])
+    if config['anchor_report']:
+        report = {
+            'broken_anchors': [link._asdict() for link in broken],
+            'unresolved_links': [link._asdict() for link in files.link_index.unresolved],
+        }
+        report_dir = os.path.dirname(config['anchor_report'])
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(config['anchor_report'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+def _get_page_template(page, config, doc_files, nav, env):
+    """Return the template of a page and its context, as altered by plugins."""
+
+    context = get_context(nav, doc_files, config, page)
+
+    # Allow 'template:' override in md source files.
+    if 'template' in page.meta:
+        template = env.get_template(page.meta['template'])
+    else:
+        template = env.get_template('main.html')
+
+    # Run `page_context` plugin events.
+    context = config['plugins'].run_event(
+        'page_context', context, page=page, config=config, nav=nav
+    )
+    return template, context
+
+
+def _render_page(page, template, context):
+    """
+    Render the template of a page, which is only active for the duration of the render.
+
+    Return the output and the names of the templates it was rendered with.
+    """
+    with active_page(page), span('page', 'template', page.file.src_uri):
+        with templates.recording() as names:
+            output = template.render(context)
+    names.add(template.name)
+    return output, names
 
-        # Render the template.
-        output = template.render(context)
 
-        # Run `post_page` plugin events.
-        output = config['plugins'].run_event('post_page', output, page=page, config=config)
+def _run_post_page(page, output, config):
+    """Run `post_page` plugin events, with the page active."""
+    with active_page(page), span('page', 'post_page', page.file.src_uri):
+        return config['plugins'].run_event('post_page', output, page=page, config=config)
 
-        # Write the output file.
-        if output.strip():
+
+def _write_page(page, output):
+    """Write the output file of a page, unless the output is empty."""
+    if output.strip():
+        with span('page', 'write', page.file.src_uri):
             utils.write_file(
                 output.encode('utf-8', errors='xmlcharrefreplace'), page.file.abs_dest_path
             )
+    else:
+        log.info(f"Page skipped: '{page.file.src_uri}'. Generated empty output.")
+
+
+def _build_page(page, config, doc_files, nav, env, up_to_date=False, manifest=None):
+    """
+    Pass a Page to theme template and write output to site_dir.
+
+    If the output is `up_to_date`, plugins still receive the page context, but the
+    template isn't rendered. Otherwise, the templates it is rendered with are recorded
+    in the build `manifest`, if given.
+    """
+
+    with _page_errors('building', page):
+        log.debug(f"Building page {page.file.src_uri}")
+
+        # Activate page. Signals to theme that this is the current page.
+        with active_page(page), span('page', 'context', page.file.src_uri):
+            template, context = _get_page_template(page, config, doc_files, nav, env)
+        if up_to_date:
+            return
+
+        output, names = _render_page(page, template, context)
+        if manifest is not None:
+            manifest.record_templates(page.file.src_uri, names)
+        output = _run_post_page(page, output, config)
+        _write_page(page, output)
+
+
+def _build_pages_concurrently(
+    pages, config, doc_files, nav, env, up_to_date, jobs, spill_file=None, manifest=None
+):
+    """
+    Build pages like `_build_page` does, rendering templates in a pool of `jobs` threads.
+
+    `up_to_date` is the set of `src_uri`s of the pages whose output needn't be rendered.
+    The text of pages kept in a `spill_file` is only in memory until their output is written.
+
+    Plugin events still run in this thread and in page order. While one page is being rendered,
+    the templates of the following pages are rendered and the previous outputs are written.
+    So the `page_context` events of up to `jobs * 2` following pages run between the
+    `page_context` and `post_page` events of a page, as documented for plugins.
+    """
+
+    def finish(page, future):
+        with _page_errors('building', page), _unspilled(page, spill_file):
+            output, names = future.result()
+            if manifest is not None:
+                manifest.record_templates(page.file.src_uri, names)
+            output = _run_post_page(page, output, config)
+            _write_page(page, output)
+
+    pending = collections.deque()
+    with ThreadPoolExecutor(jobs) as executor:
+        for page in pages:
+            with _page_errors('building', page):
+                log.debug(f"Building page {page.file.src_uri}")
+                if spill_file is not None:
+                    page.unspill()
+                with active_page(page), span('page', 'context', page.file.src_uri):
+                    template, context = _get_page_template(page, config, doc_files, nav, env)
+                if page.file.src_uri in up_to_date:
+                    if spill_file is not None:
+                        page.spill(spill_file)
+                    continue
+                pending.append((page, executor.submit(_render_page, page, template, context)))
+            # Bound the number of rendered pages held in memory.
+            if len(pending) > jobs * 2:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+
+
+def _copy_static_file(file, manifest, hardlink):
+    """
+    Copy a static file to site_dir, unless the destination has the same content already.
+
+    Return True if the file was copied.
+    """
+    src_hash = manifest.hash_file(file.src_uri, file.abs_src_path)
+    # The hash of the destination is recorded too, so that it is only read if it changed.
+    dest_key = 'site:' + file.dest_uri
+    try:
+        src_stat, dest_stat = os.stat(file.abs_src_path), os.stat(file.abs_dest_path)
+    except OSError:
+        src_stat = dest_stat = None
+    if dest_stat is not None and src_stat.st_size == dest_stat.st_size:
+        if os.path.samestat(src_stat, dest_stat):
+            # A hard link of a previous build is only kept if hard links are still wanted.
+            up_to_date = hardlink
         else:
-            log.info(f"Page skipped: '{page.file.src_uri}'. Generated empty output.")
+            up_to_date = manifest.hash_file(dest_key, file.abs_dest_path) == src_hash
+        if up_to_date:
+            log.debug(f"Skip copying unchanged file: '{file.src_uri}'")
+            return False
+    log.debug(f"Copying media file: '{file.src_uri}'")
+    utils.copy_file(file.abs_src_path, file.abs_dest_path, hardlink=hardlink)
+    manifest.record_file(dest_key, file.abs_dest_path, src_hash)
+    return True
+
+
+def _copy_static_files(files, manifest, jobs, hardlink=False):
+    """Copy static files to site_dir like `_copy_static_file`, in a pool of `jobs` threads."""
+    # Of files with the same destination, the last one has precedence.
+    files = list({file.abs_dest_path: file for file in files}.values())
+    if jobs > 1:
+        with ThreadPoolExecutor(jobs) as executor:
+            copied = list(executor.map(lambda f: _copy_static_file(f, manifest, hardlink), files))
+    else:
+        copied = [_copy_static_file(file, manifest, hardlink) for file in files]
+    log.debug(f"Copied {sum(copied)} static files, {len(copied) - sum(copied)} were unchanged.")
+    return sum(copied)
+
+
+def _write_nav_items(env, config, dirty=False):
+    """Write the nav items which the theme loads separately, if its `external_nav` is on."""
+    items = getattr(env.globals.get('render_nav_item'), 'external_items', None)
+    if not items:
+        return
+    path = os.path.join(config['site_dir'], NAV_ITEMS_FILE)
+    # The pages which a dirty build skipped still refer to the items of the previous build,
+    # which are up to date as all pages are rebuilt if anything shown in the nav changes.
+    if dirty:
+        try:
+            with open(path, encoding='utf-8') as f:
+                items = {**json.load(f), **items}
+        except (OSError, ValueError):
+            pass
+    utils.write_file(json.dumps(items, sort_keys=True).encode('utf-8'), path)
+
+
+def _walk_site_dir(site_dir):
+    """
+    Yield the paths of the files in `site_dir` and of its directories, bottom up.
+
+    Like `utils.clean_directory`, hidden entries at the top of `site_dir` are left out. Links
+    to directories are yielded as files.
+    """
+    try:
+        entries = sorted(entry for entry in os.listdir(site_dir) if not entry.startswith('.'))
+    except OSError:
+        return
+    for entry in entries:
+        path = os.path.join(site_dir, entry)
+        if not os.path.isdir(path) or os.path.islink(path):
+            yield path, False
+            continue
+        for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+            # `os.walk` doesn't follow links to directories.
+            links = [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]
+            for name in filenames + links:
+                yield os.path.join(dirpath, name), False
+            yield dirpath, True
+
+
+def _get_site_files(site_dir, paths):
+    """
+    Return the size and modification time of each of the files at `paths`, relative to
+    `site_dir`, which exist. They are keyed by normalized absolute path.
+    """
+    site_dir = os.path.abspath(site_dir)
+    site_files = {}
+    for path in paths:
+        path = os.path.join(site_dir, os.path.normpath(path))
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            continue
+        site_files[path] = (stat.st_size, stat.st_mtime_ns)
+    return site_files
+
+
+def _get_relative_outputs(site_dir, outputs):
+    """Return the paths of those of `outputs` which are in `site_dir`, relative to it."""
+    site_dir = os.path.abspath(site_dir)
+    paths = set()
+    for path in outputs:
+        path = os.path.relpath(path, site_dir)
+        if path != os.pardir and not path.startswith(os.pardir + os.sep):
+            paths.add(path.replace(os.sep, '/'))
+    return paths
+
+
+def _remove_stale_outputs(site_dir, outputs, previous_files):
+    """
+    Remove the files in `site_dir` which aren't among `outputs` (normalized absolute paths),
+    then the directories left empty.
+
+    This leaves the same files as writing the outputs to an empty directory would, without
+    the cost of writing them all or a time when the site is missing. Only the files listed
+    in `previous_files` (see `_get_site_files`), the outputs of the previous build, and
+    unmodified since, are removed. Files which plugins write by other means than
+    `utils.write_file`, which they may skip if the file exists, are kept. The build empties
+    the site directory instead when there is no record of the previous outputs.
+    """
+    removed = 0
+    for path, is_dir in _walk_site_dir(os.path.abspath(site_dir)):
+        try:
+            if is_dir:
+                os.rmdir(path)
+            elif _is_stale(path, outputs, previous_files):
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # The directory isn't empty, or the file is gone already.
+    if removed:
+        log.debug(f"Removed {removed} stale files from the site directory.")
+
+
+def _is_stale(path, outputs, previous_files):
+    """Return True if `_remove_stale_outputs` removes the file at `path`."""
+    if path in outputs or path not in previous_files:
+        return False
+    stat = os.lstat(path)
+    return (stat.st_size, stat.st_mtime_ns) == previous_files[path]
+
+
+def _precompress_file(path, levels, manifest, key, settings_changed):
+    """
+    Write the compressed copies of the output at `path`, unless it is unchanged since the
+    previous build and its copies exist. Return the number of copies written.
+    """
+    copy_paths = [path + compress.FORMATS[name] for name in levels]
+    if (
+        not manifest.file_changed(key, path)
+        and not settings_changed
+        and all(os.path.isfile(copy_path) for copy_path in copy_paths)
+    ):
+        for copy_path in copy_paths:
+            utils.keep_file(copy_path)
+        return 0
+    return compress.compress_file(path, levels)
+
+
+def _precompress_outputs(config, manifest, jobs, outputs=None, previous_files=None):
+    """
+    Write compressed copies of the text outputs in site_dir, in the formats which the config
+    enables, in a pool of `jobs` threads. A clean build passes its `outputs` and
+    `previous_files` (see `_remove_stale_outputs`), so that stale files are left out.
+    """
+    formats = compress.get_formats(
+        [name for name in compress.FORMATS if config[f'precompress_{name}']]
+    )
+    if not formats:
+        return 0
+    levels = {
+        'gzip': config['precompress_gzip_level'],
+        'brotli': config['precompress_brotli_quality'],
+    }
+    levels = {name: levels[name] for name in formats}
+    # All copies are written again if the formats or levels change.
+    settings_changed = manifest.signature_changed('precompress', json.dumps(levels))
+
+    site_dir = os.path.abspath(config['site_dir'])
+    paths = []
+    for path, is_dir in _walk_site_dir(site_dir):
+        try:
+            if is_dir or not compress.is_compressible(path, config['precompress_min_size']):
+                continue
+            if outputs is not None and _is_stale(path, outputs, previous_files):
+                continue
+        except OSError:
+            continue
+        paths.append(path)
+
+    def precompress(path):
+        key = 'precompress:' + os.path.relpath(path, site_dir).replace(os.sep, '/')
+        return _precompress_file(path, levels, manifest, key, settings_changed)
+
+    if jobs > 1:
+        with ThreadPoolExecutor(jobs) as executor:
+            written = sum(executor.map(precompress, paths))
+    else:
+        written = sum(precompress(path) for path in paths)
+    log.debug(f"Compressed {len(paths)} outputs, {written} compressed copies were written.")
+    return written
+
+
+def _json_default(obj):
+    """Represent objects which aren't JSON serializable in a way that is stable across builds."""
+    if isinstance(obj, Theme):
+        return {
+            'name': obj.name,
+            'dirs': obj.dirs,
+            'static_templates': sorted(obj.static_templates),
+            'vars': {key: obj[key] for key in obj},
+        }
+    if isinstance(obj, BasePlugin):
+        return [type(obj).__module__, type(obj).__qualname__, obj.config]
+    return json_default(obj)
+
+
+def _get_config_signature(config):
+    """Return a representation of the validated config which only changes along with it."""
+    # The site_dir doesn't affect the outputs, and changes with each atomic build.
+    items = {key: value for key, value in config.items() if key != 'site_dir'}
+    return json.dumps(items, default=_json_default)
+
 
-        # Deactivate page
-        page.active = False
+def _is_template(name, theme):
+    """Return True if the theme file `name` is a template, which outputs depend on one by one."""
+    return name.lower().endswith('.html') or name in theme.static_templates
+
+
+def _get_theme_signature(theme, manifest):
+    """
+    Return a representation of the content of the theme files other than templates, and a
+    mapping of the name of each template to whether it changed since the previous build.
+
+    Like the Jinja loader, the first of the theme directories which has a template provides it.
+    """
+    hashes = []
+    changed_templates = {}
+    for i, theme_dir in enumerate(theme.dirs):
+        for source_dir, dirnames, filenames in os.walk(theme_dir):
+            dirnames[:] = sorted(d for d in dirnames if d != '__pycache__')
+            for filename in sorted(filenames):
+                path = os.path.join(source_dir, filename)
+                name = os.path.relpath(path, theme_dir).replace(os.sep, '/')
+                if not _is_template(name, theme):
+                    key = f'theme:{i}:{name}'
+                    hashes.append([key, manifest.hash_file(key, path)])
+                elif name not in changed_templates:
+                    changed_templates[name] = manifest.file_changed(f'template:{name}', path)
+    return json.dumps(hashes), changed_templates
+
+
+def _get_nav_signature(nav):
+    """
+    Return a representation of what the nav can show, which only changes along with it. Themes
+    such as readthedocs show the table of contents of every page in the nav, not only of the
+    current page, so those are included along with the titles and URLs.
+    """
+    tocs = [f'{page.file.src_uri}:\n{page.toc}' for page in nav.pages]
+    return '\n'.join([repr(nav), *tocs])
+
+
+def _get_file_states(files):
+    """
+    Return what pages can show of each file, the URL of each file as `url:<src_uri>` and
+    the title of each page as `title:<src_uri>`.
+    """
+    states = {}
+    for file in files:
+        states[f'url:{file.src_uri}'] = file.url
+        if file.page is not None:
+            states[f'title:{file.src_uri}'] = str(file.page.title)
+    return states
+
+
+def _get_changed_files(manifest, files):
+    """Return the `src_uri`s of the files whose URL changed and of the pages whose title changed."""
+    changed = {'url': set(), 'title': set()}
+    for key in manifest.states_changed(_get_file_states(files)):
+        kind, _, src_uri = key.partition(':')
+        changed[kind].add(src_uri)
+    return changed['url'], changed['title']
+
+
+def _get_dependency_graph(files):
+    """Return the `DependencyGraph` of the links and neighbors of the pages in `files`."""
+    graph = DependencyGraph()
+    for file in files.documentation_pages():
+        page = file.page
+        neighbors = [p.file.src_uri for p in (page.previous_page, page.next_page) if p is not None]
+        graph.set(file.src_uri, files.link_index.targets.get(file.src_uri, ()), neighbors)
+    return graph
+
+
+def _get_template_variables(env, name):
+    """Return the names of the variables which the template `name` takes from its context."""
+    try:
+        source = env.loader.get_source(env, name)[0]
+        return jinja2.meta.find_undeclared_variables(env.parse(source))
     except Exception as e:
-        message = f"Error building page '{page.file.src_uri}':"
-        # Prevent duplicated the error message because it will be printed immediately afterwards.
-        if not isinstance(e, BuildError):
-            message += f" {e}"
-        log.error(message)
-        raise
+        log.debug(f"Assuming that template '{name}' shows the nav and all pages: {e}")
+        return {'nav', 'pages'}
+
+
+def _set_template_dependencies(graph, env, manifest):
+    """
+    Set whether each page of the `graph` shows the nav and all pages, according to the
+    templates the page was last rendered with, as recorded in the build `manifest`.
+    """
+    variables = {}
+    for src_uri in graph:
+        names = manifest.get_templates(src_uri)
+        if names is None:
+            # The page wasn't rendered, so it may show anything once it is.
+            graph.update(src_uri, nav=True, pages=True)
+            continue
+        used = set()
+        for name in names:
+            if name not in variables:
+                variables[name] = _get_template_variables(env, name)
+            used.update(variables[name])
+        graph.update(src_uri, nav='nav' in used, pages='pages' in used)
+
+
+def build(config, live_server=False, dirty=False, jobs=1, profile=None):
+    """
+    Perform a full site build.
+
+    A `dirty` build doesn't clean the site_dir first, and only rebuilds the outputs whose
+    inputs changed since the previous build, as recorded in the build manifest.
+
+    When `jobs` is greater than 1, Markdown is converted in that many worker processes,
+    and theme templates are rendered in that many threads.
+
+    If `profile` is a path, a report of the time spent in each phase of the build, each
+    page and each plugin event handler is written to it, along with a Chrome trace.
 
+    With the `low_memory` option, the Markdown and HTML of pages are kept in a temporary
+    file from the time they are read until they are built, and after.
 
-def build(config, live_server=False, dirty=False):
-    """Perform a full site build."""
+    With the `atomic_build` option, the site is built into a staging directory, which then
+    replaces the site_dir at once (see `mkdocs.utils.staging`).
+    """
 
     logger = logging.getLogger('mkdocs')
 
@@ -244,26 +854,42 @@ def build(config, live_server=False, dirty=False):
     if config['strict']:
         logging.getLogger('mkdocs').addHandler(warning_counter)
 
+    profiler = Profiler() if profile else None
+    previous_profiler = set_profiler(profiler)
+    staging_dir = None
+    # With `low_memory`, the text of pages is only in memory while being read or built.
+    spill_file = SpillFile() if config['low_memory'] else None
+
     try:
-        from time import time
+        start = time.time()
+        utils.reset_outputs()
+
+        with span('phase', 'config'):
+            # Run `config` plugin events.
+            config = config['plugins'].run_event('config', config)
 
-        start = time()
+            # Run `pre_build` plugin events.
+            config['plugins'].run_event('pre_build', config=config)
 
-        # Run `config` plugin events.
-        config = config['plugins'].run_event('config', config)
+        # The manifest is named after the site_dir, rather than the staging directory.
+        manifest = BuildManifest(config['site_dir'], config['cache_dir'])
 
-        # Run `pre_build` plugin events.
-        config['plugins'].run_event('pre_build', config=config)
+        if config['atomic_build'] and not live_server:
+            # The site is built into a new directory, which replaces the site_dir at the end.
+            with span('phase', 'stage'):
+                site_dir = config['site_dir']
+                config['site_dir'] = staging_dir = staging.create_staging_dir(site_dir)
 
         if not dirty:
-            log.info("Cleaning site directory")
-            utils.clean_directory(config['site_dir'])
-        else:  # pragma: no cover
-            # Warn user about problems that may occur with --dirty option
-            log.warning(
-                "A 'dirty' build is being performed, this will likely lead to inaccurate navigation and other"
-                " links within your site. This option is designed for site development purposes only."
-            )
+            # Instead of emptying the site directory, the outputs of the previous build which
+            # this build doesn't output are removed at the end. Without a record of them, as
+            # in the first build, they can't be told from other files, so it is emptied.
+            with span('phase', 'clean'):
+                if manifest.previous_outputs:
+                    previous_files = _get_site_files(config['site_dir'], manifest.previous_outputs)
+                else:
+                    utils.clean_directory(config['site_dir'])
+                    previous_files = {}
 
         if not live_server:  # pragma: no cover
             log.info(f"Building documentation to directory: {config['site_dir']}")
@@ -272,52 +898,198 @@ def build(config, live_server=False, dirty=False):
 
         # First gather all data from all files/pages to ensure all data is consistent across all pages.
 
-        files = get_files(config)
-        env = config['theme'].get_env()
-        files.add_files_from_theme(env, config)
+        with span('phase', 'files'):
+            files = get_files(config, jobs)
+            env = config['theme'].get_env(config['cache_dir'])
+            files.add_files_from_theme(env, config)
 
-        # Run `files` plugin events.
-        files = config['plugins'].run_event('files', files, config=config)
+            # Run `files` plugin events.
+            files = config['plugins'].run_event('files', files, config=config)
 
-        nav = get_navigation(files, config)
+        with span('phase', 'nav'):
+            nav = get_navigation(files, config)
+            # The titles and meta-data of pages are known from here on, until they are read.
+            read_page_heads(files, config)
 
-        # Run `nav` plugin events.
-        nav = config['plugins'].run_event('nav', nav, config=config, files=files)
+            # Run `nav` plugin events.
+            nav = config['plugins'].run_event('nav', nav, config=config, files=files)
 
-        log.debug("Reading markdown pages.")
-        for file in files.documentation_pages():
-            log.debug(f"Reading: {file.src_uri}")
-            _populate_page(file.page, config, files, dirty)
+        # The anchors of pages are indexed as they are read, while their content is at hand.
+        anchor_index = None
+        if config['validate_anchors'] != 'ignore' or config['anchor_report']:
+            anchor_index = AnchorIndex()
 
-        # Run `env` plugin events.
-        env = config['plugins'].run_event('env', env, config=config, files=files)
+        def populated(page):
+            if anchor_index is not None:
+                anchor_index.add_page(page)
+            if spill_file is not None:
+                page.spill(spill_file)
+
+        log.debug("Reading markdown pages.")
+        with span('phase', 'read_pages'):
+            if jobs > 1:
+                pages = [file.page for file in files.documentation_pages()]
+                _populate_pages_in_parallel(pages, config, files, jobs, spill_file, populated)
+            else:
+                for file in files.documentation_pages():
+                    log.debug(f"Reading: {file.src_uri}")
+                    _populate_page(file.page, config, files)
+                    populated(file.page)
+
+        if anchor_index is not None:
+            with span('phase', 'check_anchors'):
+                _check_anchors(anchor_index, files, config)
+
+        # The links and neighbors of pages are known from here on, see `DependencyGraph`.
+        files.dependency_graph = _get_dependency_graph(files)
+
+        with span('phase', 'env'):
+            # Run `env` plugin events.
+            env = config['plugins'].run_event('env', env, config=config, files=files)
+
+        # Outputs of a dirty build are only rebuilt if any of their inputs changed since the
+        # previous build. Every page has been read and rendered regardless, so that titles and
+        # links are current. All signatures and hashes are checked so that they are recorded.
+        with span('phase', 'check_outdated'):
+            theme_signature, changed_templates = _get_theme_signature(config['theme'], manifest)
+            changed = [
+                manifest.signature_changed('config', _get_config_signature(config)),
+                manifest.signature_changed('theme', theme_signature),
+            ]
+            rebuild_all = not dirty or any(changed)
+            # Pages also depend on the templates they were rendered with, and on what they
+            # show of other pages and files, one by one.
+            previous_graph = DependencyGraph.from_json(manifest.previous_dependencies)
+            invalidated = previous_graph.invalidated(
+                *_get_changed_files(manifest, files),
+                nav_changed=manifest.signature_changed('nav', _get_nav_signature(nav)),
+            )
+            invalidated.update(files.dependency_graph.changed_pages(previous_graph))
+            outdated = {
+                file.src_uri
+                for file in files
+                if manifest.file_changed(file.src_uri, file.abs_src_path)
+                or rebuild_all
+                or not os.path.isfile(file.abs_dest_path)
+                or (
+                    file.is_documentation_page()
+                    and (
+                        file.src_uri in invalidated
+                        or file.src_uri not in previous_graph
+                        or manifest.templates_changed(file.src_uri, changed_templates)
+                    )
+                )
+            }
+        if dirty:
+            log.debug(f"Rebuilding {len(outdated)} outdated files out of {len(files)}.")
 
         # Start writing files to site_dir now that all data is gathered. Note that order matters. Files
         # with lower precedence get written first so that files with higher precedence can overwrite them.
 
         log.debug("Copying static assets.")
-        files.copy_static_files(dirty=dirty)
+        with span('phase', 'copy_static'):
+            static_files = [
+                file
+                for file in files
+                if not file.is_documentation_page() and file.src_uri in outdated
+            ]
+            copied = _copy_static_files(
+                static_files, manifest, jobs, config['hardlink_static_files']
+            )
 
-        for template in config['theme'].static_templates:
-            _build_theme_template(template, env, files, config, nav)
+        with span('phase', 'build_templates'):
+            for template in config['theme'].static_templates:
+                with span('template', template):
+                    _build_theme_template(template, env, files, config, nav)
 
-        for template in config['extra_templates']:
-            _build_extra_template(template, files, config, nav)
+            for template in config['extra_templates']:
+                with span('template', template):
+                    _build_extra_template(template, files, config, nav)
 
         log.debug("Building markdown pages.")
-        doc_files = files.documentation_pages()
-        for file in doc_files:
-            _build_page(file.page, config, doc_files, nav, env, dirty)
-
-        # Run `post_build` plugin events.
-        config['plugins'].run_event('post_build', config=config)
+        with span('phase', 'build_pages'):
+            doc_files = files.documentation_pages()
+            up_to_date = {file.src_uri for file in doc_files} - outdated
+            if jobs > 1:
+                pages = [file.page for file in doc_files]
+                _build_pages_concurrently(
+                    pages, config, doc_files, nav, env, up_to_date, jobs, spill_file, manifest
+                )
+            else:
+                for file in doc_files:
+                    with _unspilled(file.page, spill_file):
+                        _build_page(
+                            file.page,
+                            config,
+                            doc_files,
+                            nav,
+                            env,
+                            file.src_uri in up_to_date,
+                            manifest,
+                        )
+            _write_nav_items(env, config, dirty)
+
+            _set_template_dependencies(files.dependency_graph, env, manifest)
+            manifest.record_dependencies(files.dependency_graph.to_json())
+
+        with span('phase', 'post_build'):
+            # Run `post_build` plugin events.
+            config['plugins'].run_event('post_build', config=config)
 
         counts = warning_counter.get_counts()
         if counts:
             msg = ', '.join([f'{v} {k.lower()}s' for k, v in counts])
             raise Abort(f'\nAborted with {msg} in strict mode!')
 
-        log.info('Documentation built in %.2f seconds', time() - start)
+        def get_outputs():
+            outputs = utils.get_output_paths()
+            # Static files which were up to date weren't copied.
+            outputs.update(os.path.abspath(file.abs_dest_path) for file in static_files)
+            return outputs
+
+        if config['precompress_gzip'] or config['precompress_brotli']:
+            with span('phase', 'precompress'):
+                if dirty:
+                    _precompress_outputs(config, manifest, jobs)
+                else:
+                    _precompress_outputs(config, manifest, jobs, get_outputs(), previous_files)
+
+        if not dirty:
+            log.info("Cleaning site directory")
+            with span('phase', 'clean'):
+                _remove_stale_outputs(config['site_dir'], get_outputs(), previous_files)
+
+        with span('phase', 'save_state'):
+            outputs = _get_relative_outputs(config['site_dir'], get_outputs())
+            if dirty:
+                # The outputs of previous builds are left in place.
+                outputs.update(manifest.previous_outputs)
+            manifest.record_outputs(outputs)
+            manifest.save()
+
+            render_cache = get_render_cache(config)
+            if render_cache is not None:
+                render_cache.prune(config['render_cache_size'] * 1024 * 1024)
+
+        if staging_dir is not None:
+            with span('phase', 'publish'):
+                staging.publish_staging_dir(
+                    site_dir, staging_dir, config['atomic_build_generations']
+                )
+                config['site_dir'] = site_dir
+                staging_dir = None
+
+        # Outputs which weren't rebuilt at all are unchanged too.
+        counts = utils.get_write_counts()
+        written = counts['written'] + copied
+        unchanged = counts['unchanged'] + len(files) - len(doc_files) - copied + len(up_to_date)
+        log.info(f"Output files: {written} written, {unchanged} unchanged")
+        log.info('Documentation built in %.2f seconds', time.time() - start)
+
+        if profiler is not None:
+            profiler.stop()
+            trace_path = profiler.write(profile)
+            log.info(f"Build profile written to '{profile}', trace written to '{trace_path}'")
 
     except Exception as e:
         # Run `build_error` plugin events.
@@ -328,7 +1100,14 @@ def build(config, live_server=False, dirty=False):
         raise
 
     finally:
+        if spill_file is not None:
+            spill_file.close()
+        if staging_dir is not None:
+            # The build failed, so the current site stays in place.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            config['site_dir'] = site_dir
         logger.removeHandler(warning_counter)
+        set_profiler(previous_profiler)
 
 
 def site_directory_contains_stale_files(site_directory):
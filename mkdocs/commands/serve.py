@@ -1,4 +1,5 @@
 import logging
+import os
 import shutil
 import tempfile
 from os.path import isdir, isfile, join
@@ -10,6 +11,7 @@ from mkdocs.commands.build import build
 from mkdocs.config import load_config
 from mkdocs.exceptions import Abort
 from mkdocs.livereload import LiveReloadServer
+from mkdocs.utils.manifest import get_manifest_path
 
 log = logging.getLogger(__name__)
 
@@ -37,6 +39,8 @@ def serve(
     # PY2 returns a byte string by default. The Unicode prefix ensures a Unicode
     # string is returned. And it makes MkDocs temp dirs easier to identify.
     site_dir = tempfile.mkdtemp(prefix='mkdocs_')
+    # The cache_dirs of the builds, in which their manifests are kept, if configured.
+    cache_dirs = {None}
 
     def mount_path(config):
         return urlsplit(config['site_url'] or '/').path
@@ -61,6 +65,7 @@ def serve(
 
         # Override a few config settings after validation
         config['site_url'] = 'http://{}{}'.format(config['dev_addr'], mount_path(config))
+        cache_dirs.add(config['cache_dir'])
 
         live_server = livereload in ['dirty', 'livereload']
         dirty = livereload == 'dirty'
@@ -115,3 +120,7 @@ def serve(
     finally:
         if isdir(site_dir):
             shutil.rmtree(site_dir)
+        for cache_dir in cache_dirs:
+            manifest_path = get_manifest_path(site_dir, cache_dir)
+            if isfile(manifest_path):
+                os.remove(manifest_path)
@@ -31,6 +31,29 @@ def get_schema():
         'docs_dir': config_options.Dir(default='docs', exists=True),
         # The directory where the site will be built to
         'site_dir': config_options.SiteDir(default='site'),
+        # The directory where caches are kept between builds. Caching is disabled if unset.
+        'cache_dir': config_options.Dir(),
+        # The maximum size of the cache of rendered Markdown pages, in megabytes.
+        'render_cache_size': config_options.Type(int, default=256),
+        # Hard link static files into site_dir instead of copying them, where possible.
+        'hardlink_static_files': config_options.Type(bool, default=False),
+        # Build into a staging directory which replaces site_dir once the build is done.
+        'atomic_build': config_options.Type(bool, default=False),
+        # The number of previous builds to keep along with an atomic build.
+        'atomic_build_generations': config_options.Type(int, default=1),
+        # Keep the Markdown and HTML of pages in a temporary file rather than in memory.
+        'low_memory': config_options.Type(bool, default=False),
+        # How to report links to anchors which don't exist in the pages linked to.
+        'validate_anchors': config_options.Choice(('warn', 'info', 'ignore'), default='info'),
+        # A file to write a JSON report of broken anchors and unresolved links to.
+        'anchor_report': config_options.File(),
+        # Write gzip and brotli compressed copies of the HTML, CSS, JS, JSON and XML outputs,
+        # at these compression levels, for outputs of at least `precompress_min_size` bytes.
+        'precompress_gzip': config_options.Type(bool, default=False),
+        'precompress_gzip_level': config_options.Choice(tuple(range(10)), default=9),
+        'precompress_brotli': config_options.Type(bool, default=False),
+        'precompress_brotli_quality': config_options.Choice(tuple(range(12)), default=11),
+        'precompress_min_size': config_options.Type(int, default=1024),
         # A copyright notice to add to the footer of documentation.
         'copyright': config_options.Type(str),
         # set of values for Google analytics containing the account IO and domain,
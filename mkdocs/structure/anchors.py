@@ -0,0 +1,99 @@
+"""
+Checks that the fragments of links between pages point to anchors which exist.
+
+The anchors of each page, the ids of the headings in its table of contents and of any
+other elements in its content, are indexed as pages are read, along with the links in
+the content which have a fragment. Once all pages are read, the links are checked
+against the index at once.
+"""
+
+import collections
+import html
+import logging
+import posixpath
+import re
+from urllib.parse import unquote as urlunquote
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+_ATTRIBUTE_VALUE = r'''=(?:"([^"]*)"|'([^']*)'|([^\s>"']+))'''
+# Elements can be linked to by their `id`, and anchors by their `name` as well.
+_ANCHOR_RE = re.compile(r'\s(?:id|name)' + _ATTRIBUTE_VALUE)
+_HREF_RE = re.compile(r'<a\s[^>]*?\bhref' + _ATTRIBUTE_VALUE, re.IGNORECASE)
+
+BrokenAnchor = collections.namedtuple('BrokenAnchor', 'src_uri url target_uri anchor')
+BrokenAnchor.__doc__ = """A link in the page `src_uri` to an `anchor` missing from `target_uri`."""
+
+
+def _get_value(match):
+    return html.unescape(next(value for value in match.groups() if value is not None))
+
+
+def _get_page_key(url):
+    """Return the key of the page at the URL `url`, relative to the site."""
+    return posixpath.normpath(urlunquote(url) or '.')
+
+
+def _get_toc_ids(items):
+    for item in items:
+        yield item.id
+        yield from _get_toc_ids(item.children)
+
+
+class AnchorIndex:
+    """The anchors of pages, and the links in pages to anchors in others or themselves."""
+
+    def __init__(self):
+        # Page key -> src_uri
+        self._pages = {}
+        # src_uri -> the ids of the anchors in the page
+        self._anchors = {}
+        # src_uri -> (url, page key, anchor) of each link with a fragment in the page
+        self._links = {}
+
+    def add_page(self, page):
+        """Index the anchors in the TOC and content of `page`, and its links with fragments."""
+        src_uri = page.file.src_uri
+        content = page.content or ''
+        self._pages[_get_page_key(page.url)] = src_uri
+        anchors = set(_get_toc_ids(page.toc))
+        anchors.update(_get_value(m) for m in _ANCHOR_RE.finditer(content))
+        self._anchors[src_uri] = frozenset(anchors)
+
+        base_dir = page.url.rpartition('/')[0]
+        links = []
+        for m in _HREF_RE.finditer(content):
+            url = _get_value(m)
+            if '#' not in url:
+                continue
+            scheme, netloc, path, query, fragment = urlsplit(url)
+            if scheme or netloc or path.startswith('/') or not fragment:
+                continue
+            key = _get_page_key(posixpath.join(base_dir, path)) if path else None
+            links.append((url, key, urlunquote(fragment)))
+        if links:
+            self._links[src_uri] = links
+        else:
+            self._links.pop(src_uri, None)
+
+    def check(self, level=logging.WARNING):
+        """
+        Return a `BrokenAnchor` for each link to an anchor which doesn't exist in an indexed
+        page, and log each at `level`, unless it is None. Links to anything else than indexed
+        pages aren't checked.
+        """
+        broken = []
+        for src_uri, links in self._links.items():
+            for url, key, anchor in links:
+                target_uri = src_uri if key is None else self._pages.get(key)
+                if target_uri is None or anchor in self._anchors[target_uri]:
+                    continue
+                broken.append(BrokenAnchor(src_uri, url, target_uri, anchor))
+                if level is not None:
+                    log.log(
+                        level,
+                        f"Documentation file '{src_uri}' contains a link to '{url}', "
+                        f"but there is no anchor '#{anchor}' in '{target_uri}'.",
+                    )
+        return broken
@@ -0,0 +1,123 @@
+"""
+The dependencies of the output of each page on other pages and files, which tell which
+outputs a change to the site invalidates.
+"""
+
+import collections
+
+PageDependencies = collections.namedtuple('PageDependencies', 'links neighbors nav pages')
+PageDependencies.__doc__ = """
+What the output of a page shows of other pages and files.
+
+- `links`: the `src_uri`s of the files the page links to, whose URLs it shows. Links to
+  files which don't exist are dependencies too, as they resolve once the file is added.
+  The titles of the files linked to aren't shown, as the text of links is in the source.
+- `neighbors`: the `src_uri`s of the previous and next pages, whose titles and URLs it shows.
+- `nav`: whether the page shows the nav, with the titles, URLs and tables of contents of all
+  pages in it.
+- `pages`: whether the page shows all pages, through the `pages` template variable.
+"""
+
+
+class DependencyGraph:
+    """
+    The `PageDependencies` of each page, by the `src_uri` of its file.
+
+    The links and neighbors of each page are known once pages are read. Whether a page shows
+    the nav or all pages depends on the templates it is rendered with, so those are only
+    known once pages are built.
+    """
+
+    def __init__(self, pages=None):
+        self._pages = dict(pages or {})
+        # The src_uris of the pages which link to, and which neighbor, each src_uri. Created on
+        # first use.
+        self._dependents = None
+
+    def __contains__(self, src_uri):
+        return src_uri in self._pages
+
+    def __iter__(self):
+        return iter(self._pages)
+
+    def __len__(self):
+        return len(self._pages)
+
+    def get(self, src_uri):
+        """Return the `PageDependencies` of the page `src_uri`, or None if it is unknown."""
+        return self._pages.get(src_uri)
+
+    def set(self, src_uri, links=(), neighbors=(), nav=False, pages=False):
+        """Set the dependencies of the page `src_uri`."""
+        self._pages[src_uri] = PageDependencies(
+            frozenset(links), frozenset(neighbors), bool(nav), bool(pages)
+        )
+        self._dependents = None
+
+    def update(self, src_uri, **kwargs):
+        """Replace some of the dependencies of the page `src_uri`, which must be known."""
+        self.set(src_uri, **self._pages[src_uri]._replace(**kwargs)._asdict())
+
+    def dependents(self, src_uri, kind=None):
+        """
+        Return the `src_uri`s of the pages which depend on the file `src_uri`. The `kind` of
+        dependency is 'links' or 'neighbors', or else either.
+        """
+        if self._dependents is None:
+            self._dependents = {'links': {}, 'neighbors': {}}
+            for page, dependencies in self._pages.items():
+                for name, dependents in self._dependents.items():
+                    for target in getattr(dependencies, name):
+                        dependents.setdefault(target, set()).add(page)
+        kinds = [kind] if kind else ['links', 'neighbors']
+        return frozenset().union(*(self._dependents[k].get(src_uri, ()) for k in kinds))
+
+    def invalidated(self, changed_urls=(), changed_titles=(), nav_changed=False):
+        """
+        Return the `src_uri`s of the pages whose output depends on something that changed.
+
+        `changed_urls` are the `src_uri`s of the files whose URL changed, including the files
+        which were added or removed, and `changed_titles` those of the pages whose title
+        changed. If `nav_changed`, the pages which show the nav are included.
+        """
+        invalidated = set()
+        for src_uri in changed_urls:
+            invalidated.update(self.dependents(src_uri))
+        for src_uri in changed_titles:
+            invalidated.update(self.dependents(src_uri, 'neighbors'))
+        for page, dependencies in self._pages.items():
+            if (dependencies.nav and nav_changed) or (
+                dependencies.pages and (changed_urls or changed_titles)
+            ):
+                invalidated.add(page)
+        return invalidated
+
+    def changed_pages(self, previous):
+        """
+        Return the `src_uri`s of the pages whose links or neighbors differ from those in the
+        `previous` graph. A page shows other files once they are its neighbors, even if nothing
+        changed about those files. Pages which `previous` doesn't know are left out.
+        """
+        changed = set()
+        for src_uri, dependencies in self._pages.items():
+            old = previous.get(src_uri)
+            if old is not None and (
+                dependencies.links != old.links or dependencies.neighbors != old.neighbors
+            ):
+                changed.add(src_uri)
+        return changed
+
+    def to_json(self):
+        """Return the graph as JSON serializable data, which `from_json` reads back."""
+        return {
+            src_uri: [sorted(deps.links), sorted(deps.neighbors), deps.nav, deps.pages]
+            for src_uri, deps in self._pages.items()
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Return the graph represented by the data from `to_json`."""
+        graph = cls()
+        for src_uri, (links, neighbors, nav, pages) in data.items():
+            graph.set(src_uri, links, neighbors, nav, pages)
+        return graph
@@ -1,9 +1,13 @@
+import collections
 import fnmatch
 import logging
 import os
 import posixpath
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import PurePath
 from urllib.parse import quote as urlquote
+from urllib.parse import unquote as urlunquote
 
 from mkdocs import utils
 
@@ -11,45 +15,107 @@ log = logging.getLogger(__name__)
 
 
 class Files:
-    """A collection of File objects."""
+    """
+    A collection of File objects.
+
+    The files are indexed by `src_uri` and by category as they are added, so lookups don't
+    depend on the number of files. Hence the `src_uri` of a file must not be changed while
+    it is in the collection. Each File object is only held once.
+    """
+
+    # The method of `File` which tells whether a file is in each category.
+    _categories = {
+        'documentation_pages': 'is_documentation_page',
+        'static_pages': 'is_static_page',
+        'media_files': 'is_media_file',
+        'javascript_files': 'is_javascript',
+        'css_files': 'is_css',
+    }
 
     def __init__(self, files):
-        self._files = files
-        self._src_uris = None
+        # Keyed by `id` to remove files in constant time. Dicts preserve insertion order.
+        self._files = {}
+        self._src_uris = {}
+        self._by_category = {category: {} for category in self._categories}
+        # Incremented whenever files are added or removed.
+        self._version = 0
+        self._link_index = None
+        # The `DependencyGraph` of the pages, set by the build once they are read.
+        self.dependency_graph = None
+        self.add_files(files)
 
     def __iter__(self):
-        return iter(self._files)
+        # Iterate over a copy, as plugins may remove files while iterating.
+        return iter(list(self._files.values()))
 
     def __len__(self):
         return len(self._files)
 
     def __contains__(self, path):
-        return PurePath(path).as_posix() in self.src_uris
+        return PurePath(path).as_posix() in self._src_uris
 
     @property
     def src_paths(self):
         """Soft-deprecated, prefer `.src_uris`."""
-        return {file.src_path: file for file in self._files}
+        return {file.src_path: file for file in self}
 
     @property
     def src_uris(self):
-        if self._src_uris is None:
-            self._src_uris = {file.src_uri: file for file in self._files}
         return self._src_uris
 
+    @property
+    def link_index(self):
+        """The `LinkIndex` of the links between the files, created on first use."""
+        if self._link_index is None:
+            self._link_index = LinkIndex(self)
+        return self._link_index
+
     def get_file_from_path(self, path):
         """Return a File instance with File.src_uri equal to path."""
-        return self.src_uris.get(PurePath(path).as_posix())
+        return self._src_uris.get(PurePath(path).as_posix())
 
     def append(self, file):
         """Append file to Files collection."""
-        self._src_uris = None
-        self._files.append(file)
+        self._version += 1
+        key = id(file)
+        if key not in self._files:
+            self._files[key] = file
+            for category, method in self._categories.items():
+                if getattr(file, method)():
+                    self._by_category[category][key] = file
+        self._src_uris[file.src_uri] = file
 
     def remove(self, file):
         """Remove file from Files collection."""
-        self._src_uris = None
-        self._files.remove(file)
+        key = id(file)
+        if key not in self._files:
+            # Like `list.remove`, fall back to removing an equal file.
+            key = next((k for k, f in self._files.items() if f == file), None)
+            if key is None:
+                raise ValueError(f"{file!r} is not in Files")
+            file = self._files[key]
+        self._version += 1
+        del self._files[key]
+        for files in self._by_category.values():
+            files.pop(key, None)
+        if self._src_uris.get(file.src_uri) is file:
+            del self._src_uris[file.src_uri]
+            if len(self._src_uris) < len(self._files):
+                # Another file with the same `src_uri` may take its place.
+                for other in reversed(self._files.values()):
+                    if other.src_uri == file.src_uri:
+                        self._src_uris[file.src_uri] = other
+                        break
+
+    def add_files(self, files):
+        """Append all of `files` to the Files collection."""
+        for file in files:
+            self.append(file)
+
+    def remove_files(self, files):
+        """Remove all of `files` from the Files collection."""
+        for file in files:
+            self.remove(file)
 
     def copy_static_files(self, dirty=False):
         """Copy static files from source to destination."""
@@ -59,23 +125,23 @@ class Files:
 
     def documentation_pages(self):
         """Return iterable of all Markdown page file objects."""
-        return [file for file in self if file.is_documentation_page()]
+        return list(self._by_category['documentation_pages'].values())
 
     def static_pages(self):
         """Return iterable of all static page file objects."""
-        return [file for file in self if file.is_static_page()]
+        return list(self._by_category['static_pages'].values())
 
     def media_files(self):
         """Return iterable of all file objects which are not documentation or static pages."""
-        return [file for file in self if file.is_media_file()]
+        return list(self._by_category['media_files'].values())
 
     def javascript_files(self):
         """Return iterable of all javascript file objects."""
-        return [file for file in self if file.is_javascript()]
+        return list(self._by_category['javascript_files'].values())
 
     def css_files(self):
         """Return iterable of all CSS file objects."""
-        return [file for file in self if file.is_css()]
+        return list(self._by_category['css_files'].values())
 
     def add_files_from_theme(self, env, config):
         """Retrieve static files from Jinja environment and add to collection."""
@@ -105,6 +171,94 @@ class Files:
                         break
 
 
+UnresolvedLink = collections.namedtuple('UnresolvedLink', 'src_uri url target_uri')
+UnresolvedLink.__doc__ = """A link in the page `src_uri` to the missing source file `target_uri`."""
+
+
+class LinkIndex:
+    """
+    Resolves relative links in pages to the files of a Files collection.
+
+    The target of each distinct link from each source directory, and the URL of each
+    target relative to each page, are only worked out once for all pages. They are worked
+    out again once files are added to or removed from the collection. The URLs of files
+    must not change while the index is in use.
+
+    Links to files which don't exist are recorded in `unresolved`, as `UnresolvedLink`s.
+    The URIs of the targets of the links of each page, whether they exist or not, are
+    recorded in `targets` by the `src_uri` of the page.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.unresolved = []
+        self.targets = collections.defaultdict(set)
+        self._version = files._version
+        # (source directory, link path) -> (target URI, key in `files.src_uris`)
+        self._targets = {}
+        # (target URL, page URL) -> relative URL
+        self._urls = {}
+
+    def resolve(self, file, path):
+        """
+        Return the URI of the target of a link from `file` to the relative `path`, which is
+        the quoted path part of a URL, the target File, and its URL relative to `file`. The
+        File and the URL are None if the target doesn't exist.
+        """
+        if self._version != self.files._version:
+            self._targets.clear()
+            self._urls.clear()
+            self._version = self.files._version
+
+        src_dir = posixpath.dirname(file.src_uri)
+        target = self._targets.get((src_dir, path))
+        if target is None:
+            target_uri = posixpath.join(src_dir, urlunquote(path))
+            target_uri = posixpath.normpath(target_uri).lstrip('/')
+            target = self._targets[src_dir, path] = (target_uri, PurePath(target_uri).as_posix())
+        target_uri, key = target
+        self.targets[file.src_uri].add(key)
+
+        target_file = self.files.src_uris.get(key)
+        if target_file is None:
+            return target_uri, None, None
+        url = self._urls.get((target_file.url, file.url))
+        if url is None:
+            url = self._urls[target_file.url, file.url] = target_file.url_relative_to(file)
+        return target_uri, target_file, url
+
+    def add_unresolved(self, file, url, target_uri):
+        """Record that the link `url` in `file` points to the missing `target_uri`."""
+        self.unresolved.append(UnresolvedLink(file.src_uri, url, target_uri))
+
+
+class _LazyAttribute:
+    """
+    An attribute of a File which is derived from others on first access, unless it was
+    assigned before. The value is kept in the slot of the same name prefixed with '_'.
+    """
+
+    def __init__(self, get_value):
+        self.get_value = get_value
+        self.__doc__ = get_value.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.get_value(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
+
+
 class File:
     """
     A MkDocs File object.
@@ -136,16 +290,53 @@ class File:
 
     File.url
         The url of the destination file relative to the destination directory as a string.
+
+    All but `src_uri` are derived on first access, so they follow changes to the properties
+    they are derived from until then. Any of them can be assigned.
     """
 
+    # Sites may have a great many files. Attributes which plugins add are still kept in a dict.
+    __slots__ = (
+        'page',
+        'src_uri',
+        '_src_dir',
+        '_dest_dir',
+        '_use_directory_urls',
+        '_name',
+        '_dest_uri',
+        '_abs_src_path',
+        '_abs_dest_path',
+        '_url',
+        '__dict__',
+    )
+
     def __init__(self, path, src_dir, dest_dir, use_directory_urls):
         self.page = None
         self.src_path = path
-        self.abs_src_path = os.path.normpath(os.path.join(src_dir, self.src_path))
-        self.name = self._get_stem()
-        self.dest_uri = self._get_dest_path(use_directory_urls)
-        self.abs_dest_path = os.path.normpath(os.path.join(dest_dir, self.dest_path))
-        self.url = self._get_url(use_directory_urls)
+        self._src_dir = src_dir
+        self._dest_dir = dest_dir
+        self._use_directory_urls = use_directory_urls
+
+    @_LazyAttribute
+    def name(self):
+        return self._get_stem()
+
+    @_LazyAttribute
+    def dest_uri(self):
+        return self._get_dest_path(self._use_directory_urls)
+
+    @_LazyAttribute
+    def abs_src_path(self):
+        # `normpath` converts the '/'-separated URIs to OS paths.
+        return os.path.normpath(os.path.join(self._src_dir, self.src_uri))
+
+    @_LazyAttribute
+    def abs_dest_path(self):
+        return os.path.normpath(os.path.join(self._dest_dir, self.dest_uri))
+
+    @_LazyAttribute
+    def url(self):
+        return self._get_url(self._use_directory_urls)
 
     @property
     def src_path(self):
@@ -245,37 +436,84 @@ class File:
         return self.src_uri.endswith('.css')
 
 
-def get_files(config):
-    """Walk the `docs_dir` and return a Files collection."""
-    files = []
-    exclude = ['.*', '/templates']
-
-    for source_dir, dirnames, filenames in os.walk(config['docs_dir'], followlinks=True):
-        relative_dir = os.path.relpath(source_dir, config['docs_dir'])
-
-        for dirname in list(dirnames):
-            path = os.path.normpath(os.path.join(relative_dir, dirname))
-            # Skip any excluded directories
-            if _filter_paths(basename=dirname, path=path, is_dir=True, exclude=exclude):
-                dirnames.remove(dirname)
-        dirnames.sort()
+def get_files(config, jobs=1):
+    """
+    Walk the `docs_dir` and return a Files collection.
 
-        for filename in _sort_files(filenames):
-            path = os.path.normpath(os.path.join(relative_dir, filename))
-            # Skip any excluded files
-            if _filter_paths(basename=filename, path=path, is_dir=False, exclude=exclude):
-                continue
-            # Skip README.md if an index file also exists in dir
-            if filename == 'README.md' and 'index.md' in filenames:
-                log.warning(
-                    f"Both index.md and README.md found. Skipping README.md from {source_dir}"
-                )
-                continue
-            files.append(
-                File(path, config['docs_dir'], config['site_dir'], config['use_directory_urls'])
-            )
+    If `jobs` is more than 1, the subdirectories of `docs_dir` are walked in a pool of that
+    many threads, which helps when listing directories is slow.
+    """
+    exclude = _get_exclude_matcher(['.*', '/templates'])
+    subdirs = []
+    paths = _scan_dir(config['docs_dir'], '', exclude, subdirs)
+    if jobs > 1 and len(subdirs) > 1:
+        with ThreadPoolExecutor(jobs) as executor:
+            for subdir_paths in executor.map(lambda subdir: _walk_dir(*subdir, exclude), subdirs):
+                paths.extend(subdir_paths)
+    else:
+        for subdir in subdirs:
+            paths.extend(_walk_dir(*subdir, exclude))
+
+    return Files(
+        [
+            File(path, config['docs_dir'], config['site_dir'], config['use_directory_urls'])
+            for path in paths
+        ]
+    )
+
+
+def _walk_dir(source_dir, relative_dir, exclude):
+    """Return the paths of all files in `source_dir`, in the order of `os.walk`."""
+    subdirs = []
+    paths = _scan_dir(source_dir, relative_dir, exclude, subdirs)
+    for subdir in subdirs:
+        paths.extend(_walk_dir(*subdir, exclude))
+    return paths
+
+
+def _scan_dir(source_dir, relative_dir, exclude, subdirs):
+    """
+    Return the paths of the files directly in `source_dir`, and append its subdirectories to
+    `subdirs`, leaving out the ones which are excluded.
 
-    return Files(files)
+    Paths are '/'-separated, and prefixed with `relative_dir`, which is either empty or ends
+    with a '/'. Subdirectories are appended as `(source_dir, relative_dir)` tuples.
+    """
+    try:
+        with os.scandir(source_dir) as entries:
+            entries = list(entries)
+    except OSError:
+        # Like `os.walk`, skip directories which can't be listed.
+        return []
+
+    dirnames = []
+    filenames = []
+    for entry in entries:
+        try:
+            # Follows symlinks.
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        (dirnames if is_dir else filenames).append(entry.name)
+
+    for dirname in sorted(dirnames):
+        path = relative_dir + dirname
+        # Skip any excluded directories
+        if not exclude(dirname, path, is_dir=True):
+            subdirs.append((os.path.join(source_dir, dirname), path + '/'))
+
+    paths = []
+    for filename in _sort_files(filenames):
+        path = relative_dir + filename
+        # Skip any excluded files
+        if exclude(filename, path, is_dir=False):
+            continue
+        # Skip README.md if an index file also exists in dir
+        if filename == 'README.md' and 'index.md' in filenames:
+            log.warning(f"Both index.md and README.md found. Skipping README.md from {source_dir}")
+            continue
+        paths.append(path)
+    return paths
 
 
 def _sort_files(filenames):
@@ -291,13 +529,40 @@ def _sort_files(filenames):
 
 def _filter_paths(basename, path, is_dir, exclude):
     """.gitignore style file filtering."""
+    return _get_exclude_matcher(exclude)(basename, path, is_dir)
+
+
+def _get_exclude_matcher(exclude):
+    """
+    Return a function of `(basename, path, is_dir)` which tells whether a file or directory
+    is excluded by any of the `.gitignore` style patterns in `exclude`.
+
+    All patterns are compiled into a few regular expressions, so the cost of a match
+    doesn't grow with their number.
+    """
+    # Keyed by (whether the pattern applies to directories only, whether it applies to the
+    # whole path rather than to the basename).
+    patterns = {}
     for item in exclude:
         # Items ending in '/' apply only to directories.
-        if item.endswith('/') and not is_dir:
-            continue
         # Items starting with '/' apply to the whole path.
         # In any other cases just the basename is used.
-        match = path if item.startswith('/') else basename
-        if fnmatch.fnmatch(match, item.strip('/')):
-            return True
-    return False
+        key = (item.endswith('/'), item.startswith('/'))
+        # Like `fnmatch.fnmatch`, match case-insensitively where the OS does.
+        patterns.setdefault(key, []).append(os.path.normcase(item.strip('/')))
+    regexes = {
+        key: re.compile('|'.join(f'(?:{fnmatch.translate(item)})' for item in items))
+        for key, items in patterns.items()
+    }
+
+    def matcher(basename, path, is_dir):
+        basename = os.path.normcase(basename)
+        path = os.path.normcase(path)
+        for (dirs_only, whole_path), regex in regexes.items():
+            if dirs_only and not is_dir:
+                continue
+            if regex.match(path if whole_path else basename):
+                return True
+        return False
+
+    return matcher
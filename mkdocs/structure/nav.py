@@ -1,7 +1,7 @@
 import logging
 from urllib.parse import urlsplit
 
-from mkdocs.structure.pages import Page
+from mkdocs.structure.pages import Page, get_active_page, get_ancestors
 from mkdocs.utils import nest_paths
 
 log = logging.getLogger(__name__)
@@ -29,22 +29,34 @@ class Navigation:
 
 
 class Section:
+    # Attributes which plugins add are still kept in a dict.
+    __slots__ = ('title', 'children', 'parent', '__active', '_ancestors', '__dict__')
+
+    is_section = True
+    is_page = False
+    is_link = False
+
     def __init__(self, title, children):
         self.title = title
         self.children = children
 
         self.parent = None
         self.active = False
-
-        self.is_section = True
-        self.is_page = False
-        self.is_link = False
+        self._ancestors = None
 
     def __repr__(self):
         return f"Section(title='{self.title}')"
 
     def _get_active(self):
         """Return active status of section."""
+        current = get_active_page()
+        if current is not None:
+            item = current.parent
+            while item is not None:
+                if item is self:
+                    return True
+                item = item.parent
+            return False
         return self.__active
 
     def _set_active(self, value):
@@ -57,9 +69,7 @@ class Section:
 
     @property
     def ancestors(self):
-        if self.parent is None:
-            return []
-        return [self.parent] + self.parent.ancestors
+        return get_ancestors(self)
 
     def _indent_print(self, depth=0):
         ret = ['{}{}'.format('    ' * depth, repr(self))]
@@ -69,17 +79,21 @@ class Section:
 
 
 class Link:
+    # Attributes which plugins add are still kept in a dict.
+    __slots__ = ('title', 'url', 'parent', '_ancestors', '__dict__')
+
+    # These should never change but are included for consistency with sections and pages.
+    children = None
+    active = False
+    is_section = False
+    is_page = False
+    is_link = True
+
     def __init__(self, title, url):
         self.title = title
         self.url = url
         self.parent = None
-
-        # These should never change but are included for consistency with sections and pages.
-        self.children = None
-        self.active = False
-        self.is_section = False
-        self.is_page = False
-        self.is_link = True
+        self._ancestors = None
 
     def __repr__(self):
         title = f"'{self.title}'" if (self.title is not None) else '[blank]'
@@ -87,9 +101,7 @@ class Link:
 
     @property
     def ancestors(self):
-        if self.parent is None:
-            return []
-        return [self.parent] + self.parent.ancestors
+        return get_ancestors(self)
 
     def _indent_print(self, depth=0):
         return '{}{}'.format('    ' * depth, repr(self))
@@ -1,7 +1,11 @@
+import json
 import logging
 import os
-import posixpath
-from urllib.parse import unquote as urlunquote
+import pickle
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlsplit, urlunsplit
 
 import markdown
@@ -9,17 +13,96 @@ from markdown.extensions import Extension
 from markdown.treeprocessors import Treeprocessor
 from markdown.util import AMP_SUBSTITUTE
 
+import mkdocs
+from mkdocs.structure.files import Files
 from mkdocs.structure.toc import get_toc
 from mkdocs.utils import get_build_date, get_markdown_title, meta
+from mkdocs.utils.cache import DiskCache, make_key
 
 log = logging.getLogger(__name__)
 
+_render_state = threading.local()
+
+
+@contextmanager
+def active_page(page):
+    """
+    Mark `page` and its ancestors as active for the current thread only.
+
+    While in effect, the `active` attribute of all pages and sections reflects `page`
+    in this thread, regardless of the values assigned to them. This allows several
+    pages to be rendered at once without mutating the shared navigation objects.
+    """
+    previous = getattr(_render_state, 'page', None)
+    _render_state.page = page
+    try:
+        yield page
+    finally:
+        _render_state.page = previous
+
+
+def get_active_page():
+    """Return the page activated with `active_page` in the current thread, or None."""
+    return getattr(_render_state, 'page', None)
+
+
+def get_ancestors(item):
+    """
+    Return the ancestors of a nav item, nearest first.
+
+    The list is cached on the item, in its `_ancestors` slot, for as long as its ancestors
+    are the same. Checking that doesn't allocate anything, so it is cheap to call for every
+    item on every page. The list must not be modified.
+    """
+    cached = item._ancestors
+    if cached is not None:
+        node = item
+        for ancestor in cached:
+            if node.parent is not ancestor:
+                break
+            node = ancestor
+        else:
+            if node.parent is None:
+                return cached
+    parent = item.parent
+    item._ancestors = [] if parent is None else [parent] + parent.ancestors
+    return item._ancestors
+
 
 class Page:
+    # Attributes which plugins add are still kept in a dict.
+    __slots__ = (
+        'file',
+        'title',
+        '_head_title',
+        'parent',
+        'children',
+        'previous_page',
+        'next_page',
+        '__active',
+        '_ancestors',
+        'update_date',
+        'canonical_url',
+        'abs_url',
+        'edit_url',
+        '_spilled',
+        '_markdown',
+        '_content',
+        'toc',
+        'meta',
+        '__dict__',
+    )
+
+    is_section = False
+    is_page = True
+    is_link = False
+
     def __init__(self, title, file, config):
         file.page = self
         self.file = file
         self.title = title
+        # The title set by `read_head`, which `read_source` replaces.
+        self._head_title = None
 
         # Navigation attributes
         self.parent = None
@@ -27,16 +110,17 @@ class Page:
         self.previous_page = None
         self.next_page = None
         self.active = False
+        self._ancestors = None
 
-        self.is_section = False
-        self.is_page = True
-        self.is_link = False
-
-        self.update_date = get_build_date()
+        # All pages share the same string.
+        self.update_date = sys.intern(get_build_date())
 
         self._set_canonical_url(config.get('site_url', None))
         self._set_edit_url(config.get('repo_url', None), config.get('edit_uri', None))
 
+        # The `markdown` and `content` kept in a `SpillFile` rather than in memory, once spilled.
+        self._spilled = None
+
         # Placeholders to be filled in later in the build process.
         self.markdown = None
         self.content = None
@@ -60,6 +144,9 @@ class Page:
 
     def _get_active(self):
         """Return active status of page."""
+        current = get_active_page()
+        if current is not None:
+            return current is self
         return self.__active
 
     def _set_active(self, value):
@@ -70,6 +157,48 @@ class Page:
 
     active = property(_get_active, _set_active)
 
+    def _get_text(self, name):
+        value = getattr(self, '_' + name)
+        if value is None and self._spilled and name in self._spilled:
+            return self._spilled[name].read()
+        return value
+
+    def _set_text(self, name, value):
+        if self._spilled:
+            self._spilled.pop(name, None)
+        setattr(self, '_' + name, value)
+
+    markdown = property(
+        lambda self: self._get_text('markdown'),
+        lambda self, value: self._set_text('markdown', value),
+    )
+    content = property(
+        lambda self: self._get_text('content'),
+        lambda self, value: self._set_text('content', value),
+    )
+
+    def spill(self, store):
+        """
+        Move the `markdown` and `content` of the page out of memory, into the `SpillFile`
+        `store`. They are read back from it on each access, until `unspill` is called.
+        """
+        if self._spilled is None:
+            self._spilled = {}
+        for name in ('markdown', 'content'):
+            value = getattr(self, '_' + name)
+            if value is None:
+                continue
+            # Text which is unchanged since it was read back is in the store already.
+            if name not in self._spilled:
+                self._spilled[name] = store.put(value)
+            setattr(self, '_' + name, None)
+
+    def unspill(self):
+        """Read the `markdown` and `content` moved out by `spill` back into memory."""
+        for name, text in (self._spilled or {}).items():
+            if getattr(self, '_' + name) is None:
+                setattr(self, '_' + name, text.read())
+
     @property
     def is_index(self):
         return self.file.name == 'index'
@@ -88,9 +217,7 @@ class Page:
 
     @property
     def ancestors(self):
-        if self.parent is None:
-            return []
-        return [self.parent] + self.parent.ancestors
+        return get_ancestors(self)
 
     def _set_canonical_url(self, base):
         if base:
@@ -138,9 +265,37 @@ class Page:
                 raise
 
         self.markdown, self.meta = meta.get_data(source)
+        if self._head_title is not None and self.title is self._head_title:
+            self.title = None
+        self._head_title = None
         self._set_title()
 
-    def _set_title(self):
+    def read_head(self, heads=None):
+        """
+        Set the `meta` and the `title` of the page from its source file, reading only the
+        meta-data and the first heading (see `meta.read_head`). This gives the structure
+        of the site without reading or rendering the pages.
+
+        The values are provisional: `read_source` sets them again from the full source, as
+        altered by plugins, unless the title was changed in between. `heads` is a
+        `PageHeadCache` to get them from. Return False if the file couldn't be read.
+        """
+        try:
+            if heads is not None:
+                data, heading = heads.get(self.file)
+            else:
+                data, heading = meta.read_head(self.file.abs_src_path)
+        except (OSError, ValueError) as e:
+            log.debug(f"Failed to read the head of '{self.file.src_uri}': {e}")
+            return False
+        self.meta = data
+        if self.title is None or self.title is self._head_title:
+            self.title = None
+            self._set_title(lambda: heading)
+            self._head_title = self.title
+        return True
+
+    def _set_title(self, get_heading=None):
         """
         Set the title for a Markdown document.
 
@@ -157,7 +312,7 @@ class Page:
             self.title = self.meta['title']
             return
 
-        title = get_markdown_title(self.markdown)
+        title = get_heading() if get_heading else get_markdown_title(self.markdown)
 
         if title is None:
             if self.is_homepage:
@@ -173,22 +328,219 @@ class Page:
     def render(self, config, files):
         """
         Convert the Markdown source file to HTML as per the config.
+
+        If a `cache_dir` is configured, the result is cached, and is reused for as long as
+        the Markdown source, the Markdown extension configs and the URLs of the targets
+        of the relative links of the page are unchanged.
         """
 
-        extensions = [_RelativePathExtension(self.file, files)] + config['markdown_extensions']
+        cache = get_render_cache(config)
+        if cache is not None:
+            key = make_key(
+                mkdocs.__version__,
+                markdown.__version__,
+                self.file.src_uri,
+                self.file.url,
+                config['markdown_extensions'],
+                config['mdx_configs'],
+                self.markdown,
+            )
+            if self._render_from_cache(cache.get(key), files):
+                return
 
-        md = markdown.Markdown(
-            extensions=extensions,
-            extension_configs=config['mdx_configs'] or {},
-        )
+        md, relpath = _get_markdown(config)
+        relpath.set_page(self.file, files)
+        md.reset()
         self.content = md.convert(self.markdown)
-        self.toc = get_toc(getattr(md, 'toc_tokens', []))
+        toc_tokens = getattr(md, 'toc_tokens', [])
+        self.toc = get_toc(toc_tokens)
+
+        if cache is not None:
+            entry = {
+                'content': self.content,
+                'toc_tokens': toc_tokens,
+                'links': relpath.treeprocessor.links,
+            }
+            cache.set(key, json.dumps(entry).encode('utf-8'))
+
+    def _render_from_cache(self, value, files):
+        """Set the content and TOC from a cache entry, if its links resolve to the same URLs."""
+        if value is None:
+            return False
+        try:
+            entry = json.loads(value)
+        except ValueError:
+            return False
+
+        relpath = _RelativePathTreeprocessor(self.file, files)
+        missing = []
+        for url, new_url in entry['links']:
+            target_uri, target_file, resolved_url = relpath.resolve_url(url)
+            if resolved_url != new_url:
+                return False
+            if target_file is None:
+                missing.append((url, target_uri))
+        for url, target_uri in missing:
+            relpath.warn_missing(url, target_uri)
+
+        self.content = entry['content']
+        self.toc = get_toc(entry['toc_tokens'])
+        return True
+
+
+# The Markdown extensions which `Markdown.reset` resets entirely, so that converting a page
+# doesn't affect the conversion of the next one. Others, like 'abbr', which adds a pattern
+# for each abbreviation it finds, keep state from page to page.
+_RESETTABLE_EXTENSIONS = frozenset(
+    f'markdown.extensions.{name}'
+    for name in (
+        'admonition',
+        'attr_list',
+        'codehilite',
+        'def_list',
+        'fenced_code',
+        'footnotes',
+        'legacy_attrs',
+        'legacy_em',
+        'meta',
+        'nl2br',
+        'sane_lists',
+        'smarty',
+        'tables',
+        'toc',
+        'wikilinks',
+    )
+)
+
+
+def _is_resettable(extension):
+    """Return True if the Markdown `extension`, a name or an instance, resets entirely."""
+    if isinstance(extension, str):
+        name = extension.partition(':')[0]
+        return (
+            name in _RESETTABLE_EXTENSIONS
+            or f'markdown.extensions.{name}' in _RESETTABLE_EXTENSIONS
+        )
+    return type(extension).__module__ in _RESETTABLE_EXTENSIONS
+
+
+def _get_markdown(config):
+    """
+    Return a Markdown instance and its `_RelativePathExtension` for the config.
+
+    Setting up the extensions is costly, so the instance is reused by all pages
+    rendered in the current thread for as long as the `markdown_extensions` and
+    `mdx_configs` of the config are the same objects, and all the extensions are
+    known to be reset entirely by `Markdown.reset`. Otherwise, each page gets a new
+    instance. It must be reset before converting each page.
+    """
+    key = (config['markdown_extensions'], config['mdx_configs'])
+    cached = getattr(_render_state, 'markdown', None)
+    if cached is not None and all(a is b for a, b in zip(cached[0], key)):
+        return cached[1], cached[2]
+
+    relpath = _RelativePathExtension(None, None)
+    md = markdown.Markdown(
+        extensions=[relpath] + config['markdown_extensions'],
+        extension_configs=config['mdx_configs'] or {},
+    )
+    if all(_is_resettable(extension) for extension in config['markdown_extensions']):
+        _render_state.markdown = (key, md, relpath)
+    return md, relpath
+
+
+def get_render_cache(config):
+    """Return the cache of rendered pages, or None if no `cache_dir` is configured."""
+    if not config.get('cache_dir'):
+        return None
+    return DiskCache(os.path.join(config['cache_dir'], 'render'))
+
+
+class PageHeadCache:
+    """
+    The meta-data and first headings of pages, as `meta.read_head` returns them, kept in
+    a file between builds if a `path` is given.
+
+    An entry is reused for as long as the size and modification time of the source file
+    are the same, so that the files of unchanged pages aren't even opened.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = self._load()
+        self._changed = False
+
+    def _load(self):
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, 'rb') as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return {}
+        return entries if version == mkdocs.__version__ else {}
+
+    def get(self, file):
+        """Return the meta-data and the first heading of the source of `file`."""
+        stat = os.stat(file.abs_src_path)
+        entry = self._entries.get(file.src_uri)
+        if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+            entry = (stat.st_size, stat.st_mtime_ns) + meta.read_head(file.abs_src_path)
+            self._entries[file.src_uri] = entry
+            self._changed = True
+        return entry[2], entry[3]
+
+    def save(self, src_uris=None):
+        """Write the cache out, keeping only the entries of `src_uris` if given."""
+        if src_uris is not None:
+            src_uris = set(src_uris)
+            if not src_uris.issuperset(self._entries):
+                self._entries = {k: v for k, v in self._entries.items() if k in src_uris}
+                self._changed = True
+        if self.path is None or not self._changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((mkdocs.__version__, self._entries), f)
+            os.replace(tmp_path, self.path)
+        except (OSError, pickle.PicklingError) as e:
+            log.debug(f"Failed to write the cache of page heads to '{self.path}': {e}")
+        self._changed = False
+
+
+def read_page_heads(files, config):
+    """
+    Call `Page.read_head` for all documentation pages in `files`, which must have Pages,
+    as after `get_navigation`. The result is cached in the `cache_dir`, if one is configured.
+    """
+    path = None
+    if config.get('cache_dir'):
+        path = os.path.join(config['cache_dir'], 'page_heads.pickle')
+    heads = PageHeadCache(path)
+    doc_files = files.documentation_pages()
+    for file in doc_files:
+        file.page.read_head(heads)
+    heads.save(file.src_uri for file in doc_files)
 
 
 class _RelativePathTreeprocessor(Treeprocessor):
     def __init__(self, file, files):
         self.file = file
         self.files = files
+        # Pairs of the original and new URLs of all relative links to source files.
+        self.links = []
+
+    @property
+    def files(self):
+        return self._files
+
+    @files.setter
+    def files(self, files):
+        if files is not None and not isinstance(files, Files):
+            files = Files(files)
+        self._files = files
 
     def run(self, root):
         """
@@ -212,6 +564,20 @@ class _RelativePathTreeprocessor(Treeprocessor):
         return root
 
     def path_to_url(self, url):
+        target_uri, target_file, new_url = self.resolve_url(url)
+        if target_uri is not None:
+            self.links.append((url, new_url))
+            if target_file is None:
+                self.warn_missing(url, target_uri)
+        return new_url
+
+    def resolve_url(self, url):
+        """
+        Return the target URI, target File and new URL of a link.
+
+        The target URI is None if the link is not a relative link to a source file,
+        and the target File is None if no such file exists.
+        """
         scheme, netloc, path, query, fragment = urlsplit(url)
 
         if (
@@ -226,23 +592,21 @@ class _RelativePathTreeprocessor(Treeprocessor):
             # Ignore URLs unless they are a relative link to a source file.
             # AMP_SUBSTITUTE is used internally by Markdown only for email.
             # No '.' in the last part of a path indicates path does not point to a file.
-            return url
-
-        # Determine the filepath of the target.
-        target_uri = posixpath.join(posixpath.dirname(self.file.src_uri), urlunquote(path))
-        target_uri = posixpath.normpath(target_uri).lstrip('/')
+            return None, None, url
 
-        # Validate that the target exists in files collection.
-        if target_uri not in self.files:
-            log.warning(
-                f"Documentation file '{self.file.src_uri}' contains a link to "
-                f"'{target_uri}' which is not found in the documentation files."
-            )
-            return url
-        target_file = self.files.get_file_from_path(target_uri)
-        path = target_file.url_relative_to(self.file)
+        # Determine the filepath of the target, and whether it exists in files collection.
+        target_uri, target_file, path = self.files.link_index.resolve(self.file, path)
+        if target_file is None:
+            return target_uri, None, url
         components = (scheme, netloc, path, query, fragment)
-        return urlunsplit(components)
+        return target_uri, target_file, urlunsplit(components)
+
+    def warn_missing(self, url, target_uri):
+        self.files.link_index.add_unresolved(self.file, url, target_uri)
+        log.warning(
+            f"Documentation file '{self.file.src_uri}' contains a link to "
+            f"'{target_uri}' which is not found in the documentation files."
+        )
 
 
 class _RelativePathExtension(Extension):
@@ -256,5 +620,11 @@ class _RelativePathExtension(Extension):
         self.files = files
 
     def extendMarkdown(self, md):
-        relpath = _RelativePathTreeprocessor(self.file, self.files)
-        md.treeprocessors.register(relpath, "relpath", 0)
+        self.treeprocessor = _RelativePathTreeprocessor(self.file, self.files)
+        md.treeprocessors.register(self.treeprocessor, "relpath", 0)
+
+    def set_page(self, file, files):
+        """Point the registered treeprocessor at another page, to reuse the Markdown instance."""
+        self.file = self.treeprocessor.file = file
+        self.files = self.treeprocessor.files = files
+        self.treeprocessor.links = []
@@ -38,6 +38,9 @@ class AnchorLink:
     A single entry in the table of contents.
     """
 
+    # `active` is only set on the first entry.
+    __slots__ = ('title', 'id', 'level', 'children', 'active', '__dict__')
+
     def __init__(self, title, id, level):
         self.title, self.id, self.level = title, id, level
         self.children = []
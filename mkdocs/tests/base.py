@@ -7,6 +7,7 @@ import markdown
 
 from mkdocs import config, utils
 from mkdocs.config import defaults as config_defaults
+from mkdocs.utils.manifest import get_manifest_path
 
 
 def dedent(text):
@@ -74,10 +75,16 @@ def tempdir(files=None, **kw):
         @wraps(fn)
         def wrapper(self, *args):
             with TemporaryDirectory(**kw) as td:
-                for path, content in files.items():
-                    pth = os.path.join(td, path)
-                    utils.write_file(content.encode(encoding='utf-8'), pth)
-                return fn(self, td, *args)
+                try:
+                    for path, content in files.items():
+                        pth = os.path.join(td, path)
+                        utils.write_file(content.encode(encoding='utf-8'), pth)
+                    return fn(self, td, *args)
+                finally:
+                    # Builds to the directory keep their manifest next to it.
+                    manifest_path = get_manifest_path(td)
+                    if os.path.isfile(manifest_path):
+                        os.remove(manifest_path)
 
         return wrapper
 
@@ -1,16 +1,20 @@
 #!/usr/bin/env python
 
+import gzip
+import json
+import os
 import sys
 import unittest
 from unittest import mock
 
+from mkdocs import utils
 from mkdocs.commands import build
-from mkdocs.exceptions import PluginError
+from mkdocs.exceptions import Abort, BuildError, PluginError
 from mkdocs.structure.files import File, Files
 from mkdocs.structure.nav import get_navigation
 from mkdocs.structure.pages import Page
 from mkdocs.tests.base import PathAssertionMixin, load_config, tempdir
-from mkdocs.utils import meta
+from mkdocs.utils import compress, manifest, meta, staging
 
 
 def build_page(title, path, config, md_src=''):
@@ -230,14 +234,17 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
 
     @mock.patch('mkdocs.utils.write_file')
     @mock.patch('mkdocs.commands.build._build_template', return_value='some content')
-    @mock.patch('gzip.GzipFile')
-    def test_build_sitemap_template(self, mock_gzip_gzipfile, mock_build_template, mock_write_file):
+    @mock.patch('mkdocs.utils.compress.gzip_compress', return_value=b'gzipped')
+    def test_build_sitemap_template(self, mock_gzip_compress, mock_build_template, mock_write_file):
         cfg = load_config()
         env = cfg['theme'].get_env()
         build._build_theme_template('sitemap.xml', env, mock.Mock(), cfg, mock.Mock())
-        mock_write_file.assert_called_once()
+        self.assertEqual(mock_write_file.call_count, 2)
+        mock_write_file.assert_called_with(
+            b'gzipped', os.path.join(cfg['site_dir'], 'sitemap.xml.gz')
+        )
         mock_build_template.assert_called_once()
-        mock_gzip_gzipfile.assert_called_once()
+        mock_gzip_compress.assert_called_once()
 
     @mock.patch('mkdocs.utils.write_file')
     @mock.patch('mkdocs.commands.build._build_template', return_value='')
@@ -324,6 +331,21 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
             ["INFO:mkdocs.commands.build:Template skipped: 'foo.html' generated empty output."],
         )
 
+    @tempdir(files={'foo.html': 'Site: {{ config.site_name }}'})
+    @tempdir()
+    @tempdir()
+    def test_build_extra_template_with_cache(self, cache_dir, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, cache_dir=cache_dir)
+        files = Files(
+            [File('foo.html', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])]
+        )
+        build._build_extra_template('foo.html', files, cfg, mock.Mock())
+        with mock.patch('jinja2.Environment.compile') as mock_compile:
+            build._build_extra_template('foo.html', files, cfg, mock.Mock())
+        mock_compile.assert_not_called()
+        with open(os.path.join(site_dir, 'foo.html'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'Site: Example')
+
     # Test build._populate_page
 
     @tempdir(files={'index.md': 'page content'})
@@ -334,28 +356,6 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         build._populate_page(page, cfg, Files([file]))
         self.assertEqual(page.content, '<p>page content</p>')
 
-    @tempdir(files={'testing.html': '<p>page content</p>'})
-    def test_populate_page_dirty_modified(self, site_dir):
-        cfg = load_config(site_dir=site_dir)
-        file = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
-        page = Page('Foo', file, cfg)
-        build._populate_page(page, cfg, Files([file]), dirty=True)
-        self.assertTrue(page.markdown.startswith('# Welcome to MkDocs'))
-        self.assertTrue(
-            page.content.startswith('<h1 id="welcome-to-mkdocs">Welcome to MkDocs</h1>')
-        )
-
-    @tempdir(files={'index.md': 'page content'})
-    @tempdir(files={'index.html': '<p>page content</p>'})
-    def test_populate_page_dirty_not_modified(self, site_dir, docs_dir):
-        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
-        file = File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
-        page = Page('Foo', file, cfg)
-        build._populate_page(page, cfg, Files([file]), dirty=True)
-        # Content is empty as file read was skipped
-        self.assertEqual(page.markdown, None)
-        self.assertEqual(page.content, None)
-
     @tempdir(files={'index.md': 'new page content'})
     @mock.patch('mkdocs.structure.pages.open', side_effect=OSError('Error message.'))
     def test_populate_page_read_error(self, docs_dir, mock_open):
@@ -425,40 +425,27 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         self.assertPathNotFile(site_dir, 'index.html')
         render_mock.assert_called_once()
 
-    @tempdir(files={'index.md': 'page content'})
-    @tempdir(files={'index.html': '<p>page content</p>'})
+    @tempdir()
     @mock.patch('mkdocs.utils.write_file')
-    def test_build_page_dirty_modified(self, site_dir, docs_dir, mock_write_file):
-        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, nav=['index.md'], plugins=[])
+    def test_build_page_up_to_date(self, site_dir, mock_write_file):
+        cfg = load_config(site_dir=site_dir, nav=['index.md'], plugins=[])
         fs = [File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])]
         files = Files(fs)
         nav = get_navigation(files, cfg)
         page = files.documentation_pages()[0].page
         # Fake populate page
         page.title = 'Title'
-        page.markdown = 'new page content'
-        page.content = '<p>new page content</p>'
-        build._build_page(
-            page, cfg, files, nav, self._get_env_with_null_translations(cfg), dirty=True
-        )
-        mock_write_file.assert_not_called()
-
-    @tempdir(files={'testing.html': '<p>page content</p>'})
-    @mock.patch('mkdocs.utils.write_file')
-    def test_build_page_dirty_not_modified(self, site_dir, mock_write_file):
-        cfg = load_config(site_dir=site_dir, nav=['testing.md'], plugins=[])
-        fs = [File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])]
-        files = Files(fs)
-        nav = get_navigation(files, cfg)
-        page = files.documentation_pages()[0].page
-        # Fake populate page
-        page.title = 'Title'
         page.markdown = 'page content'
         page.content = '<p>page content</p>'
+        cfg['plugins'] = mock.Mock(run_event=mock.Mock(side_effect=lambda name, item, **kw: item))
         build._build_page(
-            page, cfg, files, nav, self._get_env_with_null_translations(cfg), dirty=True
+            page, cfg, files, nav, self._get_env_with_null_translations(cfg), up_to_date=True
+        )
+        mock_write_file.assert_not_called()
+        # Plugins still see the page context.
+        self.assertEqual(
+            [c[0][0] for c in cfg['plugins'].run_event.call_args_list], ['page_context']
         )
-        mock_write_file.assert_called_once()
 
     @tempdir()
     def test_build_page_custom_template(self, site_dir):
@@ -564,6 +551,659 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         self.assertPathNotExists(site_dir, 'main.html')
         self.assertPathNotExists(site_dir, 'locales')
 
+    @tempdir(
+        files={
+            'index.md': '# Home\n\n[Other](sub/other.md) [Missing](missing.md)',
+            'sub/other.md': '# Other\n\n## Section\n\n[Home](../index.md)',
+            'img.jpg': '',
+        }
+    )
+    @tempdir()
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_parallel(self, serial_dir, parallel_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=serial_dir)
+        with self.assertLogs('mkdocs', level='WARNING'):
+            build.build(cfg)
+        cfg = load_config(docs_dir=docs_dir, site_dir=parallel_dir)
+        with self.assertLogs('mkdocs', level='WARNING') as cm:
+            build.build(cfg, jobs=2)
+        self.assertEqual(
+            cm.output,
+            [
+                "WARNING:mkdocs.structure.pages:Documentation file 'index.md' contains a link to "
+                "'missing.md' which is not found in the documentation files."
+            ],
+        )
+
+        for path in ('index.html', 'sub/other/index.html'):
+            with open(os.path.join(serial_dir, path), 'rb') as f:
+                expected = f.read()
+            with open(os.path.join(parallel_dir, path), 'rb') as f:
+                self.assertEqual(f.read(), expected)
+        self.assertPathIsFile(parallel_dir, 'img.jpg')
+
+    @tempdir(
+        files={
+            'index.md': '# Home\n\n[Other](sub/other.md)',
+            'sub/other.md': '# Other\n\n## Section\n\n[Home](../index.md)',
+        }
+    )
+    @tempdir()
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_low_memory(self, expected_dir, site_dir, docs_dir):
+        build.build(load_config(docs_dir=docs_dir, site_dir=expected_dir))
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, low_memory=True)
+                with mock.patch.object(Page, 'spill', autospec=True, wraps=Page.spill) as spill:
+                    build.build(cfg, jobs=jobs)
+                # Each page is spilled once it is read, and again once it is built.
+                self.assertGreaterEqual(spill.call_count, 4)
+
+                for path in ('index.html', 'sub/other/index.html', 'search/search_index.json'):
+                    with open(os.path.join(expected_dir, path), 'rb') as f:
+                        expected = f.read()
+                    with open(os.path.join(site_dir, path), 'rb') as f:
+                        self.assertEqual(f.read(), expected)
+
+    def _build_and_list_compressed_outputs(self, cfg, **kwargs):
+        with mock.patch(
+            'mkdocs.utils.compress.compress_file', wraps=compress.compress_file
+        ) as mock_compress_file:
+            build.build(cfg, **kwargs)
+        paths = [
+            os.path.relpath(c[0][0], cfg['site_dir']) for c in mock_compress_file.call_args_list
+        ]
+        return sorted(p.replace(os.sep, '/') for p in paths)
+
+    @tempdir(
+        files={
+            'index.md': '# Home\n\n' + 'Some text. ' * 200,
+            'other.md': '# Other\n\n' + 'Other text. ' * 200,
+            'small.css': 'p {}',
+            'img.jpg': 'a' * 2000,
+        }
+    )
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_precompress(self, site_dir, docs_dir):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, precompress_gzip=True)
+                compressed = self._build_and_list_compressed_outputs(cfg, jobs=jobs)
+                if jobs == 1:
+                    self.assertIn('index.html', compressed)
+                    self.assertIn('other/index.html', compressed)
+                    self.assertIn('search/search_index.json', compressed)
+                else:
+                    # Unchanged outputs aren't compressed again.
+                    self.assertEqual(compressed, [])
+                for path in ('index.html', 'other/index.html', 'search/search_index.json'):
+                    self.assertPathIsFile(site_dir, path + '.gz')
+                    with open(os.path.join(site_dir, path), 'rb') as f:
+                        with gzip.open(os.path.join(site_dir, path + '.gz')) as gz:
+                            self.assertEqual(gz.read(), f.read())
+                # Small files and binary files aren't compressed.
+                self.assertPathNotExists(site_dir, 'small.css.gz')
+                self.assertPathNotExists(site_dir, 'img.jpg.gz')
+
+        with open(os.path.join(docs_dir, 'other.md'), 'a') as f:
+            f.write('More text.')
+        compressed = self._build_and_list_compressed_outputs(cfg)
+        self.assertIn('other/index.html', compressed)
+        self.assertNotIn('index.html', compressed)
+        self.assertPathIsFile(site_dir, 'index.html.gz')
+
+        # A clean build without precompression removes the compressed copies.
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertPathNotExists(site_dir, 'index.html.gz')
+        self.assertPathNotExists(site_dir, 'other/index.html.gz')
+
+    @tempdir(files={'index.md': '# Home\n\n' + 'Some text. ' * 200})
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_precompress_level_change(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, precompress_gzip=True)
+        build.build(cfg)
+        cfg = load_config(
+            docs_dir=docs_dir, site_dir=site_dir, precompress_gzip=True, precompress_gzip_level=1
+        )
+        # All outputs are compressed again at the new level.
+        self.assertIn('index.html', self._build_and_list_compressed_outputs(cfg, dirty=True))
+        with open(os.path.join(site_dir, 'index.html'), 'rb') as f:
+            expected = compress.gzip_compress(f.read(), os.path.join(site_dir, 'index.html'), 1)
+        with open(os.path.join(site_dir, 'index.html.gz'), 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+    def _build_and_list_written_pages(self, cfg, **kwargs):
+        with mock.patch('mkdocs.utils.write_file', wraps=utils.write_file) as mock_write_file:
+            build.build(cfg, **kwargs)
+        paths = [os.path.relpath(c[0][1], cfg['site_dir']) for c in mock_write_file.call_args_list]
+        return sorted(p.replace(os.sep, '/') for p in paths if p.endswith('index.html'))
+
+    @tempdir(files={'index.md': '# Home', 'other.md': '# Other\n\nSome text.', 'img.jpg': 'a'})
+    @tempdir()
+    def test_build_dirty_only_changed_pages(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        self.assertEqual(
+            self._build_and_list_written_pages(cfg), ['index.html', 'other/index.html']
+        )
+        # The manifest isn't deployed with the site.
+        self.assertPathIsFile(manifest.get_manifest_path(site_dir))
+        self.assertEqual([name for name in os.listdir(site_dir) if name.startswith('.')], [])
+
+        # Nothing changed
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        self.assertEqual(self._build_and_list_written_pages(cfg, dirty=True), [])
+
+        # The content changed, but not the title.
+        utils.write_file(b'# Other\n\nSome other text.', os.path.join(docs_dir, 'other.md'))
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        self.assertEqual(self._build_and_list_written_pages(cfg, dirty=True), ['other/index.html'])
+        with open(os.path.join(site_dir, 'other', 'index.html'), encoding='utf-8') as f:
+            self.assertIn('Some other text.', f.read())
+
+        # A missing output is restored.
+        os.remove(os.path.join(site_dir, 'index.html'))
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        self.assertEqual(self._build_and_list_written_pages(cfg, dirty=True), ['index.html'])
+
+        # A clean build rebuilds everything.
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        self.assertEqual(
+            self._build_and_list_written_pages(cfg), ['index.html', 'other/index.html']
+        )
+
+    @tempdir(files={'index.md': '# Home', 'other.md': '# Other\n\nSome text.'})
+    @tempdir()
+    def test_build_dirty_title_changed(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg)
+
+        utils.write_file(b'# Renamed\n\nSome text.', os.path.join(docs_dir, 'other.md'))
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        # The title is shown in the nav of all pages.
+        self.assertEqual(
+            self._build_and_list_written_pages(cfg, dirty=True),
+            ['index.html', 'other/index.html'],
+        )
+        with open(os.path.join(site_dir, 'index.html'), encoding='utf-8') as f:
+            self.assertIn('Renamed', f.read())
+
+    @tempdir(files={'index.md': '# Home', 'a.md': '# A\n\n## First'})
+    @tempdir()
+    def test_build_dirty_toc_changed(self, site_dir, docs_dir):
+        def build_dirty():
+            cfg = load_config(
+                docs_dir=docs_dir,
+                site_dir=site_dir,
+                theme={'name': 'readthedocs', 'collapse_navigation': False},
+            )
+            return self._build_and_list_written_pages(cfg, dirty=True)
+
+        self.assertEqual(build_dirty(), ['a/index.html', 'index.html'])
+
+        # The nav of this theme shows the table of contents of every page in it.
+        utils.write_file(b'# A\n\n## First\n\n## Second', os.path.join(docs_dir, 'a.md'))
+        self.assertEqual(build_dirty(), ['a/index.html', 'index.html'])
+        with open(os.path.join(site_dir, 'index.html'), encoding='utf-8') as f:
+            self.assertIn('#second', f.read())
+
+    @tempdir(files={'index.md': '# Home', 'other.md': '# Other'})
+    @tempdir()
+    def test_build_dirty_config_changed(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg)
+
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, copyright='Changed')
+        self.assertEqual(
+            self._build_and_list_written_pages(cfg, dirty=True),
+            ['index.html', 'other/index.html'],
+        )
+
+    @tempdir(
+        files={
+            'special.html': '{% extends "main.html" %}{% block content %}{% include "part.html" %}'
+            '{% endblock %}',
+            'part.html': 'Part',
+        }
+    )
+    @tempdir(files={'index.md': '# Home', 'other.md': '---\ntemplate: special.html\n---\n# Other'})
+    @tempdir()
+    def test_build_dirty_template_changed(self, site_dir, docs_dir, theme_dir):
+        def build_dirty(jobs=1):
+            cfg = load_config(
+                docs_dir=docs_dir,
+                site_dir=site_dir,
+                theme={'name': 'mkdocs', 'custom_dir': theme_dir},
+            )
+            return self._build_and_list_written_pages(cfg, dirty=True, jobs=jobs)
+
+        self.assertEqual(build_dirty(), ['index.html', 'other/index.html'])
+        self.assertEqual(build_dirty(), [])
+
+        # Only the page rendered with the template which includes it depends on it.
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                utils.write_file(f'Part {jobs}'.encode(), os.path.join(theme_dir, 'part.html'))
+                self.assertEqual(build_dirty(jobs), ['other/index.html'])
+                with open(os.path.join(site_dir, 'other', 'index.html'), encoding='utf-8') as f:
+                    self.assertIn(f'Part {jobs}', f.read())
+
+        # A template which overrides a template of the theme is a change of that template.
+        utils.write_file(
+            b'{% extends "base.html" %}{% block footer %}Footer{% endblock %}',
+            os.path.join(theme_dir, 'main.html'),
+        )
+        self.assertEqual(build_dirty(), ['index.html', 'other/index.html'])
+        self.assertEqual(build_dirty(), [])
+
+        # Any other theme file may affect all pages.
+        utils.write_file(b'{}', os.path.join(theme_dir, 'mkdocs_theme.yml'))
+        self.assertEqual(build_dirty(), ['index.html', 'other/index.html'])
+
+    @tempdir(files={'main.html': 'NEXT: {{ page.next_page and page.next_page.title }}'})
+    @tempdir(files={'a.md': '# A', 'c.md': '# C'})
+    @tempdir()
+    def test_build_dirty_neighbor_added(self, site_dir, docs_dir, theme_dir):
+        def build_dirty():
+            cfg = load_config(
+                docs_dir=docs_dir,
+                site_dir=site_dir,
+                theme={'name': None, 'custom_dir': theme_dir},
+            )
+            with self.assertLogs('mkdocs', level='INFO'):
+                return self._build_and_list_written_pages(cfg, dirty=True)
+
+        self.assertEqual(build_dirty(), ['a/index.html', 'c/index.html'])
+
+        # The pages around the new page show it as their neighbor, though nothing changed
+        # about the pages they showed before.
+        utils.write_file(b'# B', os.path.join(docs_dir, 'b.md'))
+        self.assertEqual(build_dirty(), ['a/index.html', 'b/index.html', 'c/index.html'])
+        with open(os.path.join(site_dir, 'a', 'index.html'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'NEXT: B')
+
+    @tempdir(files={'main.html': '{{ page.content }}{{ page.next_page and page.next_page.title }}'})
+    @tempdir(
+        files={
+            'index.md': '# Home\n\n[a](hidden.md) [b](new.md)',
+            'a.md': '# A',
+            'b.md': '# B',
+            'hidden.md': '# Hidden',
+        }
+    )
+    @tempdir()
+    def test_build_dirty_page_dependencies(self, site_dir, docs_dir, theme_dir):
+        def build_dirty(nav_theme=False):
+            cfg = load_config(
+                docs_dir=docs_dir,
+                site_dir=site_dir,
+                nav=['index.md', 'a.md', 'b.md'],
+                theme={'name': 'mkdocs'} if nav_theme else {'name': None, 'custom_dir': theme_dir},
+            )
+            with self.assertLogs('mkdocs', level='INFO'):
+                return self._build_and_list_written_pages(cfg, dirty=True)
+
+        self.assertEqual(
+            build_dirty(), ['a/index.html', 'b/index.html', 'hidden/index.html', 'index.html']
+        )
+        self.assertEqual(build_dirty(), [])
+
+        # Links show the URL of a page, but not its title.
+        utils.write_file(b'# Hidden renamed', os.path.join(docs_dir, 'hidden.md'))
+        self.assertEqual(build_dirty(), ['hidden/index.html'])
+
+        # The page before shows the title as that of the next page. The theme shows no nav.
+        utils.write_file(b'# A renamed', os.path.join(docs_dir, 'a.md'))
+        self.assertEqual(build_dirty(), ['a/index.html', 'b/index.html', 'index.html'])
+
+        # A link to a missing file resolves once it is added.
+        utils.write_file(b'# New', os.path.join(docs_dir, 'new.md'))
+        self.assertEqual(build_dirty(), ['index.html', 'new/index.html'])
+        with open(os.path.join(site_dir, 'index.html'), encoding='utf-8') as f:
+            self.assertIn('href="new/"', f.read())
+
+        # A theme which shows the nav shows the titles of all pages in it.
+        self.assertEqual(len(build_dirty(nav_theme=True)), 5)
+        utils.write_file(b'# B renamed', os.path.join(docs_dir, 'b.md'))
+        self.assertEqual(len(build_dirty(nav_theme=True)), 5)
+        utils.write_file(b'# Hidden', os.path.join(docs_dir, 'hidden.md'))
+        self.assertEqual(build_dirty(nav_theme=True), ['hidden/index.html'])
+
+        # Plugins find the graph in the files collection.
+        events = {}
+
+        def run_event(self, name, item=None, **kwargs):
+            events[name] = kwargs
+            return item
+
+        with mock.patch('mkdocs.plugins.PluginCollection.run_event', run_event):
+            build_dirty()
+        graph = events['env']['files'].dependency_graph
+        self.assertEqual(graph.get('index.md').links, {'hidden.md', 'new.md'})
+        self.assertEqual(graph.dependents('a.md'), {'index.md', 'b.md'})
+
+    @tempdir(files={'index.md': '# Home', 'img.jpg': 'a', 'sub/doc.pdf': 'b'})
+    @tempdir()
+    def test_build_skips_unchanged_static_files(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg)
+
+        # A change of the config rebuilds everything, but identical files aren't copied again.
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, copyright='Changed')
+        with mock.patch('mkdocs.utils.copy_file', wraps=utils.copy_file) as mock_copy_file:
+            build.build(cfg, dirty=True, jobs=2)
+        mock_copy_file.assert_not_called()
+
+        # A destination which differs from the source is replaced.
+        utils.write_file(b'x', os.path.join(site_dir, 'img.jpg'))
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, copyright='Changed again')
+        with mock.patch('mkdocs.utils.copy_file', wraps=utils.copy_file) as mock_copy_file:
+            build.build(cfg, dirty=True)
+        self.assertEqual(mock_copy_file.call_count, 1)
+        with open(os.path.join(site_dir, 'img.jpg'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'a')
+
+    @tempdir(files={'index.md': '# Home', 'other.md': '# Other', 'img.jpg': 'a'})
+    @tempdir()
+    def test_build_reports_unchanged_outputs(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg)
+        mtime = os.stat(os.path.join(site_dir, 'other', 'index.html')).st_mtime_ns
+        gz_mtime = os.stat(os.path.join(site_dir, 'sitemap.xml.gz')).st_mtime_ns
+
+        # All outputs are rebuilt, and only the homepage shows the description.
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, site_description='Changed')
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(cfg, dirty=True)
+        self.assertRegex('\n'.join(cm.output), r'Output files: 1 written, [1-9]\d* unchanged')
+        self.assertEqual(os.stat(os.path.join(site_dir, 'other', 'index.html')).st_mtime_ns, mtime)
+        # The compressed sitemap is counted, and kept while the sitemap is unchanged.
+        self.assertEqual(os.stat(os.path.join(site_dir, 'sitemap.xml.gz')).st_mtime_ns, gz_mtime)
+        total = sum(not name.startswith('.') for _, _, names in os.walk(site_dir) for name in names)
+        self.assertIn(f'Output files: 1 written, {total - 1} unchanged', '\n'.join(cm.output))
+
+    @tempdir(files={'index.md': '# Home', 'img.jpg': 'a'})
+    @tempdir()
+    def test_build_hardlink_static_files(self, site_dir, docs_dir):
+        src, dest = os.path.join(docs_dir, 'img.jpg'), os.path.join(site_dir, 'img.jpg')
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, hardlink_static_files=True)
+        build.build(cfg)
+        self.assertTrue(os.path.samefile(src, dest))
+
+        # The links are replaced by copies once they aren't wanted anymore.
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg, dirty=True)
+        self.assertFalse(os.path.samefile(src, dest))
+        with open(dest, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'a')
+
+    @tempdir(files={'index.md': '# Home', 'sub/other.md': '# Other'})
+    @tempdir()
+    @tempdir()
+    def test_build_profile(self, profile_dir, site_dir, docs_dir):
+        profile = os.path.join(profile_dir, 'profile.json')
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+                build.build(cfg, jobs=jobs, profile=profile)
+
+                with open(profile, encoding='utf-8') as f:
+                    report = json.load(f)
+                self.assertIn('read_pages', report['phases'])
+                self.assertIn('build_pages', report['phases'])
+                self.assertEqual(set(report['pages']), {'index.md', 'sub/other.md'})
+                self.assertEqual(
+                    set(report['pages']['index.md']),
+                    {
+                        'read',
+                        'markdown',
+                        'content',
+                        'context',
+                        'template',
+                        'post_page',
+                        'write',
+                        'total',
+                    },
+                )
+                self.assertIn('sitemap.xml', report['templates'])
+                self.assertEqual(report['plugins']['search.on_page_context']['calls'], 2)
+                self.assertEqual(len(report['slowest_pages']), 2)
+                self.assertEqual(
+                    report['slowest_handlers'][0]['handler'],
+                    max(report['plugins'], key=lambda name: report['plugins'][name]['total']),
+                )
+
+                with open(os.path.join(profile_dir, 'profile.trace.json'), encoding='utf-8') as f:
+                    trace = json.load(f)
+                names = {event['name'] for event in trace['traceEvents']}
+                self.assertIn('markdown sub/other.md', names)
+                self.assertIn('search.on_post_build', names)
+
+    @tempdir(files={'index.md': '# Home', 'sub/one.md': '# One', 'sub/two.md': '# Two'})
+    @tempdir()
+    def test_build_external_nav(self, site_dir, docs_dir):
+        cfg = load_config(
+            docs_dir=docs_dir,
+            site_dir=site_dir,
+            theme={'name': 'readthedocs', 'external_nav': True},
+        )
+        build.build(cfg)
+
+        with open(os.path.join(site_dir, 'nav-items.json'), encoding='utf-8') as f:
+            items = json.load(f)
+        self.assertEqual(
+            items['nav.html 1.0 navlevel=1'],
+            '<a class="reference internal" href="\x1asub/one/\x1a">One</a>',
+        )
+        with open(os.path.join(site_dir, 'sub', 'two', 'index.html'), encoding='utf-8') as f:
+            output = f.read()
+        self.assertIn('<template data-nav-item="nav.html 1.0 navlevel=1"></template>', output)
+        self.assertNotIn('sub/one/', output)
+
+        # A dirty build keeps the items which only the pages it skipped refer to.
+        os.remove(os.path.join(site_dir, 'sub', 'two', 'index.html'))
+        build.build(cfg, dirty=True)
+        with open(os.path.join(site_dir, 'nav-items.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), items)
+
+    @tempdir(files={'nav-sub.html': '<a href="{{ base_url }}/{{ nav_item.url }}">X</a>'})
+    @tempdir(files={'index.md': '# Home', 'sec/a.md': '# A', 'sec/b.md': '# B'})
+    @tempdir()
+    def test_build_nav_item_with_base_url(self, site_dir, docs_dir, theme_dir):
+        cfg = load_config(
+            docs_dir=docs_dir,
+            site_dir=site_dir,
+            theme={'name': 'mkdocs', 'custom_dir': theme_dir},
+        )
+        build.build(cfg)
+
+        # The output of nav items isn't reused between pages with another `base_url`.
+        for path, href in (
+            ('index.html', './sec/a/'),
+            ('sec/b/index.html', '../../sec/a/'),
+            ('404.html', '//sec/a/'),
+        ):
+            with open(os.path.join(site_dir, path), encoding='utf-8') as f:
+                self.assertIn(f'<a href="{href}">X</a>', f.read())
+
+    @tempdir(files={'index.md': '# Home', 'a.md': '# A', 'b/img.jpg': 'a', 'img.jpg': 'a'})
+    @tempdir()
+    def test_build_removes_stale_outputs(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        build.build(cfg)
+        mtime = os.stat(os.path.join(site_dir, 'a', 'index.html')).st_mtime_ns
+
+        os.remove(os.path.join(docs_dir, 'b', 'img.jpg'))
+        os.remove(os.path.join(docs_dir, 'img.jpg'))
+        # Files which the build didn't output, like those of a plugin which only writes them if
+        # they don't exist, are kept.
+        for path in ('.hidden', 'extra.txt', 'x/y/extra.txt'):
+            utils.write_file(b'', os.path.join(site_dir, path))
+        build.build(cfg)
+
+        for path in ('index.html', 'a/index.html', '.hidden', 'extra.txt', 'x/y/extra.txt'):
+            self.assertPathIsFile(site_dir, path)
+        for path in ('b', 'img.jpg'):
+            self.assertPathNotExists(site_dir, path)
+        # Unchanged outputs weren't rewritten.
+        self.assertEqual(os.stat(os.path.join(site_dir, 'a', 'index.html')).st_mtime_ns, mtime)
+
+        # Without a manifest, the outputs of the previous build are unknown, so the site
+        # directory is emptied.
+        os.remove(manifest.get_manifest_path(site_dir))
+        os.rename(os.path.join(docs_dir, 'a.md'), os.path.join(docs_dir, 'a2.md'))
+        build.build(cfg)
+        for path in ('index.html', 'a2/index.html', '.hidden'):
+            self.assertPathIsFile(site_dir, path)
+        for path in ('a', 'extra.txt', 'x'):
+            self.assertPathNotExists(site_dir, path)
+
+    @tempdir(files={'index.md': '# Home', 'a.md': '# A', 'img.jpg': 'a'})
+    @tempdir()
+    def test_build_atomic(self, tdir, docs_dir):
+        site_dir = os.path.join(tdir, 'site')
+        cfg = load_config(
+            docs_dir=docs_dir, site_dir=site_dir, atomic_build=True, atomic_build_generations=1
+        )
+        build.build(cfg)
+        self.assertTrue(os.path.islink(site_dir))
+        first = os.path.realpath(site_dir)
+        self.assertEqual(cfg['site_dir'], site_dir)
+
+        with open(os.path.join(docs_dir, 'a.md'), 'w') as f:
+            f.write('# Changed')
+        build.build(cfg)
+        second = os.path.realpath(site_dir)
+        self.assertNotEqual(second, first)
+        # The previous generation is kept as it was, sharing the unchanged files.
+        with open(os.path.join(first, 'a', 'index.html'), encoding='utf-8') as f:
+            self.assertNotIn('Changed', f.read())
+        with open(os.path.join(site_dir, 'a', 'index.html'), encoding='utf-8') as f:
+            self.assertIn('Changed', f.read())
+        self.assertTrue(
+            os.path.samefile(os.path.join(first, 'img.jpg'), os.path.join(second, 'img.jpg'))
+        )
+
+        build.build(cfg)
+        self.assertPathNotExists(first)
+        self.assertEqual(len(os.listdir(staging.get_generations_dir(site_dir))), 2)
+
+    @tempdir(files={'index.md': '# Home'})
+    @tempdir()
+    def test_build_atomic_failure(self, tdir, docs_dir):
+        site_dir = os.path.join(tdir, 'site')
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, atomic_build=True)
+        build.build(cfg)
+        published = os.path.realpath(site_dir)
+
+        with mock.patch('mkdocs.commands.build._build_page', side_effect=BuildError('x')):
+            with self.assertRaises(Abort):
+                build.build(cfg)
+        # The published site is left alone, and the staging directory is removed.
+        self.assertEqual(os.path.realpath(site_dir), published)
+        self.assertEqual(
+            os.listdir(staging.get_generations_dir(site_dir)), [os.path.basename(published)]
+        )
+        self.assertEqual(cfg['site_dir'], site_dir)
+
+    @tempdir(
+        files={
+            'index.md': '# Home\n\n[a](sub/other.md#section) [b](sub/other.md#missing) [c](#home)',
+            'sub/other.md': '# Other\n\n## Section\n\n[d](../index.md#nowhere) [e](none.md#x)',
+        }
+    )
+    @tempdir()
+    def test_build_validate_anchors(self, tdir, docs_dir):
+        report_path = os.path.join(tdir, 'report', 'anchors.json')
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                cfg = load_config(
+                    docs_dir=docs_dir,
+                    site_dir=os.path.join(tdir, 'site'),
+                    validate_anchors='warn',
+                    anchor_report=report_path,
+                )
+                with self.assertLogs('mkdocs', level='WARN') as cm:
+                    build.build(cfg, jobs=jobs)
+                self.assertIn(
+                    "WARNING:mkdocs.structure.anchors:Documentation file 'index.md' contains a link "
+                    "to 'sub/other/#missing', but there is no anchor '#missing' in 'sub/other.md'.",
+                    cm.output,
+                )
+                self.assertIn(
+                    "WARNING:mkdocs.structure.anchors:Documentation file 'sub/other.md' contains a "
+                    "link to '../..#nowhere', but there is no anchor '#nowhere' in 'index.md'.",
+                    cm.output,
+                )
+                self.assertEqual(len([msg for msg in cm.output if 'no anchor' in msg]), 2)
+
+                with open(report_path, encoding='utf-8') as f:
+                    report = json.load(f)
+                self.assertEqual(
+                    sorted(link['anchor'] for link in report['broken_anchors']),
+                    ['missing', 'nowhere'],
+                )
+                self.assertEqual(
+                    report['unresolved_links'],
+                    [{'src_uri': 'sub/other.md', 'url': 'none.md#x', 'target_uri': 'sub/none.md'}],
+                )
+
+        # Broken anchors count in strict mode along with the unresolved link, unless only
+        # reported as info, which is the default.
+        for validate_anchors, count in (('warn', 3), ('info', 1), (None, 1)):
+            with self.subTest(validate_anchors=validate_anchors):
+                options = {} if validate_anchors is None else {'validate_anchors': validate_anchors}
+                cfg = load_config(
+                    docs_dir=docs_dir,
+                    site_dir=os.path.join(tdir, 'site'),
+                    strict=True,
+                    **options,
+                )
+                with self.assertLogs('mkdocs', level='INFO') as cm:
+                    with self.assertRaisesRegex(Abort, f'Aborted with {count} warnings'):
+                        build.build(cfg)
+                self.assertEqual(len([msg for msg in cm.output if 'no anchor' in msg]), 2)
+
+    @tempdir()
+    def test_anchor_report_in_current_dir(self, tdir):
+        cfg = {'validate_anchors': 'info', 'anchor_report': 'anchors.json'}
+        anchor_index = mock.Mock(**{'check.return_value': []})
+        files = mock.Mock(**{'link_index.unresolved': []})
+        old_cwd = os.getcwd()
+        os.chdir(tdir)
+        try:
+            build._check_anchors(anchor_index, files, cfg)
+        finally:
+            os.chdir(old_cwd)
+        with open(os.path.join(tdir, 'anchors.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'broken_anchors': [], 'unresolved_links': []})
+
+    @tempdir(files=['.hidden', 'a.txt', 'b/c.txt', 'b/d.txt', 'e/f.txt', 'g.txt'])
+    def test_remove_stale_outputs(self, site_dir):
+        previous_files = build._get_site_files(
+            site_dir, ['a.txt', 'b/c.txt', 'b/d.txt', 'e/f.txt', 'missing.txt']
+        )
+        self.assertEqual(len(previous_files), 4)
+        utils.write_file(b'new', os.path.join(site_dir, 'a.txt'))
+        utils.write_file(b'new', os.path.join(site_dir, 'h', 'i.txt'))
+
+        outputs = {os.path.join(site_dir, 'b', 'c.txt')}
+        build._remove_stale_outputs(site_dir, outputs, previous_files)
+        # Files which changed or were added since, or weren't outputs before, are kept.
+        self.assertEqual(
+            sorted(
+                os.path.relpath(os.path.join(dirpath, filename), site_dir).replace(os.sep, '/')
+                for dirpath, _, filenames in os.walk(site_dir)
+                for filename in filenames
+            ),
+            ['.hidden', 'a.txt', 'b/c.txt', 'g.txt', 'h/i.txt'],
+        )
+        self.assertPathNotExists(site_dir, 'e')
+
     # Test build.site_directory_contains_stale_files
 
     @tempdir(files=['index.html'])
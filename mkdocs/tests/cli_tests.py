@@ -217,6 +217,8 @@ class CLITests(unittest.TestCase):
         args, kwargs = mock_build.call_args
         self.assertTrue('dirty' in kwargs)
         self.assertFalse(kwargs['dirty'])
+        self.assertEqual(kwargs['jobs'], 1)
+        self.assertIsNone(kwargs['profile'])
         mock_load_config.assert_called_once_with(
             config_file=None,
             strict=None,
@@ -251,6 +253,42 @@ class CLITests(unittest.TestCase):
         self.assertTrue('dirty' in kwargs)
         self.assertTrue(kwargs['dirty'])
 
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_jobs(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(cli.cli, ['build', '--jobs', '4'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertEqual(kwargs['jobs'], 4)
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    @mock.patch('os.cpu_count', return_value=8)
+    def test_build_jobs_per_cpu(self, mock_cpu_count, mock_build, mock_load_config):
+
+        result = self.runner.invoke(cli.cli, ['build', '-j', '0'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertEqual(kwargs['jobs'], 8)
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_profile(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--profile', 'profile.json'], catch_exceptions=False
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertEqual(kwargs['profile'], 'profile.json')
+
     @mock.patch('mkdocs.config.load_config', autospec=True)
     @mock.patch('mkdocs.commands.build.build', autospec=True)
     def test_build_config_file(self, mock_build, mock_load_config):
@@ -123,6 +123,7 @@ class ConfigTests(unittest.TestCase):
                         'hljs_languages': [],
                         'navigation_depth': 2,
                         'nav_style': 'primary',
+                        'external_nav': False,
                         'shortcuts': {'help': 191, 'next': 78, 'previous': 80, 'search': 83},
                     },
                 },
@@ -143,6 +144,7 @@ class ConfigTests(unittest.TestCase):
                         'logo': None,
                         'titles_only': False,
                         'collapse_navigation': True,
+                        'external_nav': False,
                     },
                 },
                 {
@@ -162,6 +164,7 @@ class ConfigTests(unittest.TestCase):
                         'logo': None,
                         'titles_only': False,
                         'collapse_navigation': True,
+                        'external_nav': False,
                     },
                 },
                 {
@@ -186,6 +189,7 @@ class ConfigTests(unittest.TestCase):
                         'logo': None,
                         'titles_only': False,
                         'collapse_navigation': True,
+                        'external_nav': False,
                     },
                 },
                 {
@@ -203,6 +207,7 @@ class ConfigTests(unittest.TestCase):
                         'hljs_languages': [],
                         'navigation_depth': 2,
                         'nav_style': 'primary',
+                        'external_nav': False,
                         'shortcuts': {'help': 191, 'next': 78, 'previous': 80, 'search': 83},
                     },
                 },
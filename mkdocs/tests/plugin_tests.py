@@ -148,6 +148,105 @@ class TestPluginCollection(unittest.TestCase):
         with self.assertRaises(AttributeError):
             collection.run_event('unknown', 'page content')
 
+    def test_register_overridden_events_only(self):
+        collection = plugins.PluginCollection()
+        plugin = DummyPlugin()
+        collection['foo'] = plugin
+        self.assertEqual(
+            collection.events,
+            {
+                'on_pre_build': [('foo', plugin.on_pre_build)],
+                'on_nav': [('foo', plugin.on_nav)],
+                'on_pre_page': [('foo', plugin.on_pre_page)],
+                'on_page_read_source': [('foo', plugin.on_page_read_source)],
+            },
+        )
+
+    def test_replace_and_delete_plugins_on_collection(self):
+        collection = plugins.PluginCollection()
+        plugin1 = DummyPlugin()
+        plugin1.load_config({'foo': 'first'})
+        collection['foo'] = plugin1
+        plugin2 = DummyPlugin()
+        plugin2.load_config({'foo': 'second'})
+        collection['bar'] = plugin2
+        plugin3 = DummyPlugin()
+        plugin3.load_config({'foo': 'third'})
+        collection['foo'] = plugin3
+        self.assertEqual(collection.run_event('pre_page', 'content'), 'second third content')
+        del collection['foo']
+        self.assertEqual(collection.run_event('pre_page', 'content'), 'second content')
+
+    def _ordered_collection(self):
+        collection = plugins.PluginCollection()
+        for key in 'ABC':
+            plugin = DummyPlugin()
+            plugin.load_config({'foo': key})
+            collection[key] = plugin
+        return collection
+
+    def test_pop_plugins_on_collection(self):
+        collection = self._ordered_collection()
+        plugin = collection.pop('A')
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'C B x')
+        self.assertIsNone(collection.pop('A', None))
+        collection['A'] = plugin
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'A C B x')
+
+    def test_popitem_plugins_on_collection(self):
+        collection = self._ordered_collection()
+        self.assertEqual(collection.popitem()[0], 'C')
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'B A x')
+        self.assertEqual(collection.popitem(last=False)[0], 'A')
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'B x')
+
+    def test_clear_plugins_on_collection(self):
+        collection = self._ordered_collection()
+        collection.clear()
+        self.assertEqual(collection.events, {})
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'x')
+
+    def test_move_plugins_on_collection(self):
+        collection = self._ordered_collection()
+        collection.move_to_end('A')
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'A C B x')
+        collection.move_to_end('A', last=False)
+        self.assertEqual(collection.run_event('pre_page', 'x'), 'C B A x')
+
+    def test_add_plugin_during_event(self):
+        collection = plugins.PluginCollection()
+        calls = []
+
+        class AddingPlugin(plugins.BasePlugin):
+            def on_pre_build(self, **kwargs):
+                calls.append(self)
+                if len(collection) == 1:
+                    collection['bar'] = AddingPlugin()
+
+        plugin = AddingPlugin()
+        collection['foo'] = plugin
+        collection.run_event('pre_build')
+        self.assertEqual(calls, [plugin])
+        collection.run_event('pre_build')
+        self.assertEqual(calls, [plugin, plugin, collection['bar']])
+
+    def test_event_stats(self):
+        collection = plugins.PluginCollection()
+        plugin = DummyPlugin()
+        plugin.load_config({'foo': 'new'})
+        collection['foo'] = plugin
+        collection.run_event('pre_page', 'page content')
+        self.assertIsNone(collection.stats)
+
+        collection.stats = {}
+        collection.run_event('pre_page', 'page content')
+        collection.run_event('pre_page', 'page content')
+        collection.run_event('nav', 'nav item')
+        collection.run_event('post_build')
+        self.assertEqual(set(collection.stats), {'foo.on_pre_page', 'foo.on_nav'})
+        self.assertEqual(collection.stats['foo.on_pre_page']['calls'], 2)
+        self.assertGreaterEqual(collection.stats['foo.on_pre_page']['total'], 0)
+
     def test_run_build_error_event(self):
         build_errors = []
 
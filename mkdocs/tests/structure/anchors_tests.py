@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+import unittest
+
+from mkdocs.structure.anchors import AnchorIndex, BrokenAnchor
+from mkdocs.structure.files import File
+from mkdocs.structure.pages import Page
+from mkdocs.structure.toc import get_toc
+from mkdocs.tests.base import get_markdown_toc, load_config
+
+
+class AnchorIndexTests(unittest.TestCase):
+    def _make_page(self, src_uri, content, toc_md='', use_directory_urls=True):
+        cfg = load_config(use_directory_urls=use_directory_urls)
+        file = File(src_uri, cfg['docs_dir'], cfg['site_dir'], use_directory_urls)
+        page = Page(None, file, cfg)
+        page.content = content
+        page.toc = get_toc(get_markdown_toc(toc_md))
+        return page
+
+    def test_anchors_from_toc_and_content(self):
+        index = AnchorIndex()
+        index.add_page(
+            self._make_page(
+                'a.md',
+                '<p id="para">x</p><a name=\'old\'></a><span id=plain>y</span>'
+                '<a href="../b/#heading-1">1</a><a href="../b/#para">2</a>'
+                '<a href="../b/#old">3</a><a href="../b/#plain">4</a>',
+            )
+        )
+        index.add_page(self._make_page('b.md', '', '# Heading 1'))
+        index.add_page(
+            self._make_page(
+                'c.md',
+                '<a href="../a/#para">ok</a><a href="../a/#heading-1">bad</a>',
+                '# Heading 1',
+            )
+        )
+        self.assertEqual(
+            index.check(None),
+            [
+                BrokenAnchor('a.md', '../b/#para', 'b.md', 'para'),
+                BrokenAnchor('a.md', '../b/#old', 'b.md', 'old'),
+                BrokenAnchor('a.md', '../b/#plain', 'b.md', 'plain'),
+                BrokenAnchor('c.md', '../a/#heading-1', 'a.md', 'heading-1'),
+            ],
+        )
+
+    def test_links_in_same_page(self):
+        index = AnchorIndex()
+        index.add_page(
+            self._make_page(
+                'a.md', '<a href="#heading-1">1</a><a href="#nope">2</a>', '# Heading 1'
+            )
+        )
+        with self.assertLogs('mkdocs', level='WARN') as cm:
+            self.assertEqual(index.check(), [BrokenAnchor('a.md', '#nope', 'a.md', 'nope')])
+        self.assertEqual(
+            cm.output,
+            [
+                "WARNING:mkdocs.structure.anchors:Documentation file 'a.md' contains a link to "
+                "'#nope', but there is no anchor '#nope' in 'a.md'."
+            ],
+        )
+
+    def test_links_which_are_not_checked(self):
+        index = AnchorIndex()
+        index.add_page(
+            self._make_page(
+                'sub/a.md',
+                '<a href="https://example.com/#x">1</a><a href="/abs/#x">2</a>'
+                '<a href="../../other/#x">3</a><a href="../../#">4</a><a href="../b/">5</a>'
+                '<img src="#x">',
+            )
+        )
+        self.assertEqual(index.check(None), [])
+
+    def test_escaped_urls_and_ids(self):
+        index = AnchorIndex()
+        index.add_page(
+            self._make_page(
+                'my page.md',
+                '<h2 id="a&amp;b">x</h2><a href="#a&amp;b">1</a><a href="#a%26b">2</a>',
+                use_directory_urls=False,
+            )
+        )
+        index.add_page(
+            self._make_page(
+                'index.md',
+                '<a href="my%20page.html#a%26b">1</a><a href="my%20page.html#c">2</a>',
+                use_directory_urls=False,
+            )
+        )
+        self.assertEqual(
+            index.check(None), [BrokenAnchor('index.md', 'my%20page.html#c', 'my page.md', 'c')]
+        )
+
+    def test_index_page(self):
+        index = AnchorIndex()
+        index.add_page(self._make_page('index.md', '', '# Home'))
+        index.add_page(
+            self._make_page('sub/index.md', '<a href="../#home">1</a><a href="..#gone">2</a>')
+        )
+        self.assertEqual(
+            index.check(None), [BrokenAnchor('sub/index.md', '..#gone', 'index.md', 'gone')]
+        )
+
+    def test_add_page_again(self):
+        index = AnchorIndex()
+        index.add_page(self._make_page('a.md', '<a href="#x">1</a>'))
+        self.assertEqual(len(index.check(None)), 1)
+        index.add_page(self._make_page('a.md', '<p id="x"></p><a href="#x">1</a>'))
+        self.assertEqual(index.check(None), [])
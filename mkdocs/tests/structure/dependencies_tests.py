@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import unittest
+
+from mkdocs.structure.dependencies import DependencyGraph, PageDependencies
+
+
+class DependencyGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set('index.md', links=['a.md', 'img.png', 'missing.md'], neighbors=['a.md'])
+        self.graph.set('a.md', neighbors=['index.md', 'b.md'], nav=True)
+        self.graph.set('b.md', links=['a.md'], neighbors=['a.md'])
+        self.graph.set('hidden.md', links=['index.md'])
+
+    def test_get(self):
+        self.assertEqual(
+            self.graph.get('a.md'),
+            PageDependencies(frozenset(), frozenset({'index.md', 'b.md'}), True, False),
+        )
+        self.assertIsNone(self.graph.get('img.png'))
+        self.assertIn('hidden.md', self.graph)
+        self.assertEqual(len(self.graph), 4)
+
+        self.graph.update('hidden.md', pages=True)
+        self.assertEqual(
+            self.graph.get('hidden.md'),
+            PageDependencies(frozenset({'index.md'}), frozenset(), False, True),
+        )
+
+    def test_dependents(self):
+        self.assertEqual(self.graph.dependents('a.md'), {'index.md', 'b.md'})
+        self.assertEqual(self.graph.dependents('a.md', 'links'), {'index.md', 'b.md'})
+        self.assertEqual(self.graph.dependents('index.md', 'neighbors'), {'a.md'})
+        self.assertEqual(self.graph.dependents('index.md'), {'a.md', 'hidden.md'})
+        self.assertEqual(self.graph.dependents('missing.md'), {'index.md'})
+        self.assertEqual(self.graph.dependents('other.md'), set())
+
+        # The reverse index is kept up to date.
+        self.graph.set('hidden.md', links=['other.md'])
+        self.assertEqual(self.graph.dependents('other.md'), {'hidden.md'})
+        self.assertEqual(self.graph.dependents('index.md'), {'a.md'})
+
+    def test_invalidated(self):
+        self.assertEqual(self.graph.invalidated(), set())
+        # Links show the URLs of their targets, but not their titles.
+        self.assertEqual(self.graph.invalidated(changed_urls=['img.png']), {'index.md'})
+        self.assertEqual(self.graph.invalidated(changed_titles=['index.md']), {'a.md'})
+        self.assertEqual(self.graph.invalidated(changed_urls=['index.md']), {'a.md', 'hidden.md'})
+        self.assertEqual(self.graph.invalidated(nav_changed=True), {'a.md'})
+
+        self.graph.update('hidden.md', pages=True)
+        self.assertEqual(self.graph.invalidated(changed_titles=['other.md']), {'hidden.md'})
+
+    def test_changed_pages(self):
+        graph = DependencyGraph.from_json(self.graph.to_json())
+        graph.update('a.md', nav=False)
+        self.assertEqual(graph.changed_pages(self.graph), set())
+
+        # A page was added between 'a.md' and 'b.md', and 'hidden.md' links elsewhere.
+        graph.update('a.md', neighbors=['index.md', 'new.md'])
+        graph.set('new.md', neighbors=['a.md', 'b.md'])
+        graph.update('b.md', neighbors=['new.md'])
+        graph.update('hidden.md', links=['b.md'])
+        self.assertEqual(graph.changed_pages(self.graph), {'a.md', 'b.md', 'hidden.md'})
+
+    def test_json(self):
+        data = self.graph.to_json()
+        self.assertEqual(
+            data['index.md'], [['a.md', 'img.png', 'missing.md'], ['a.md'], False, False]
+        )
+        graph = DependencyGraph.from_json(data)
+        self.assertEqual(list(graph), list(self.graph))
+        for src_uri in graph:
+            self.assertEqual(graph.get(src_uri), self.graph.get(src_uri))
@@ -339,6 +339,22 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertEqual(f.url, 'foo%20bar.html')
         self.assertEqual(f.name, 'foo bar')
 
+    def test_file_derived_attributes(self):
+        f = File('foo.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        # Derived attributes follow the ones they are derived from until they are accessed.
+        f.dest_uri = 'bar/index.html'
+        self.assertPathsEqual(f.abs_dest_path, '/path/to/site/bar/index.html')
+        self.assertEqual(f.url, 'bar/')
+        f.dest_uri = 'baz/index.html'
+        self.assertEqual(f.url, 'bar/')
+        f.url = 'baz/'
+        self.assertEqual(f.url, 'baz/')
+        self.assertEqual(f.name, 'foo')
+
+        # Plugins can still add attributes.
+        f.extra = 'value'
+        self.assertEqual(f.extra, 'value')
+
     def test_files(self):
         fs = [
             File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
@@ -434,6 +450,19 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertFalse(_filter_paths('bar', 'bar', False, ['bar/']))
         self.assertFalse(_filter_paths('bar', 'foo/bar', False, ['bar/']))
 
+    def test_filter_paths_many_patterns(self):
+        exclude = ['*.txt', '/build/', 'node_modules/', '/draft.md', 'temp*']
+        self.assertTrue(_filter_paths('a.txt', 'foo/a.txt', False, exclude))
+        self.assertTrue(_filter_paths('build', 'build', True, exclude))
+        self.assertFalse(_filter_paths('build', 'foo/build', True, exclude))
+        self.assertTrue(_filter_paths('node_modules', 'foo/node_modules', True, exclude))
+        self.assertFalse(_filter_paths('node_modules', 'node_modules', False, exclude))
+        self.assertTrue(_filter_paths('draft.md', 'draft.md', False, exclude))
+        self.assertFalse(_filter_paths('draft.md', 'foo/draft.md', False, exclude))
+        self.assertTrue(_filter_paths('temporary.md', 'foo/temporary.md', False, exclude))
+        self.assertFalse(_filter_paths('foo.md', 'foo.md', False, exclude))
+        self.assertFalse(_filter_paths('foo.md', 'foo.md', False, []))
+
     def test_get_relative_url_use_directory_urls(self):
         to_files = [
             'index.md',
@@ -674,6 +703,42 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertEqual(len(files), len(expected))
         self.assertEqual([f.src_path for f in files], expected)
 
+    @tempdir(
+        files=[
+            'index.md',
+            'a.md',
+            'b/index.md',
+            'b/img.png',
+            'b/.hidden/x.md',
+            'b/c/README.md',
+            'b/c/d/e.md',
+            'b/templates/foo.html',
+            'f/g.md',
+            'templates/foo.html',
+            '.git/config',
+        ]
+    )
+    def test_get_files_nested(self, tdir):
+        config = load_config(docs_dir=tdir)
+        expected = [
+            'index.md',
+            'a.md',
+            'b/index.md',
+            'b/img.png',
+            'b/c/README.md',
+            'b/c/d/e.md',
+            'b/templates/foo.html',
+            'f/g.md',
+        ]
+        for jobs in (1, 4):
+            with self.subTest(jobs=jobs):
+                files = get_files(config, jobs=jobs)
+                self.assertEqual([f.src_uri for f in files], expected)
+                self.assertEqual(
+                    files.get_file_from_path('b/c/d/e.md').abs_src_path,
+                    os.path.join(tdir, 'b', 'c', 'd', 'e.md'),
+                )
+
     @tempdir()
     @tempdir(files={'test.txt': 'source content'})
     def test_copy_file(self, src_dir, dest_dir):
@@ -738,3 +803,88 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertEqual(len(files), 6)
         self.assertEqual(len(files.src_uris), 6)
         self.assertFalse(extra_file.src_uri in files.src_uris)
+
+    def test_link_index(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/baz qux.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(fs)
+        index = files.link_index
+        self.assertIs(files.link_index, index)
+        self.assertEqual(index.resolve(fs[0], 'foo/bar.md'), ('foo/bar.md', fs[1], 'foo/bar/'))
+        self.assertEqual(index.resolve(fs[1], '../index.md'), ('index.md', fs[0], '../..'))
+        self.assertEqual(
+            index.resolve(fs[1], 'baz%20qux.md'), ('foo/baz qux.md', fs[2], '../baz%20qux/')
+        )
+        self.assertEqual(index.resolve(fs[1], './new.md'), ('foo/new.md', None, None))
+
+        # Adding or removing files is picked up.
+        new = File('foo/new.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        files.append(new)
+        self.assertEqual(index.resolve(fs[1], './new.md'), ('foo/new.md', new, '../new/'))
+        files.remove(fs[0])
+        self.assertEqual(index.resolve(fs[1], '../index.md'), ('index.md', None, None))
+
+        # The targets of the links of each page are recorded, whether they exist or not.
+        self.assertEqual(index.targets['index.md'], {'foo/bar.md'})
+        self.assertEqual(index.targets['foo/bar.md'], {'index.md', 'foo/baz qux.md', 'foo/new.md'})
+
+    def test_files_remove_updates_indexes(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.js', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.css', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(fs)
+        files.remove(fs[1])
+        self.assertEqual(list(files), [fs[0], fs[2]])
+        self.assertEqual(files.media_files(), [fs[2]])
+        self.assertEqual(files.javascript_files(), [])
+        self.assertNotIn('foo/bar.js', files)
+        # An equal file is removed like `list.remove` would.
+        files.remove(File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True))
+        self.assertEqual(list(files), [fs[2]])
+        self.assertEqual(files.documentation_pages(), [])
+        with self.assertRaises(ValueError):
+            files.remove(fs[0])
+
+    def test_files_remove_while_iterating(self):
+        fs = [
+            File(f'{i}.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+            for i in range(4)
+        ]
+        files = Files(fs)
+        for file in files:
+            if file.src_uri != '2.md':
+                files.remove(file)
+        self.assertEqual(list(files), [fs[2]])
+        self.assertEqual(files.documentation_pages(), [fs[2]])
+
+    def test_files_remove_duplicate_src_uri(self):
+        first = File('foo.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        second = File('foo.md', '/path/to/theme', '/path/to/site', use_directory_urls=True)
+        files = Files([first, second])
+        self.assertIs(files.get_file_from_path('foo.md'), second)
+        files.remove(second)
+        self.assertIs(files.get_file_from_path('foo.md'), first)
+        files.remove(first)
+        self.assertEqual(files.src_uris, {})
+
+    def test_files_add_remove_files(self):
+        files = Files([])
+        fs = [
+            File(f'{i}.{ext}', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+            for i in range(100)
+            for ext in ('md', 'png')
+        ]
+        files.add_files(fs)
+        self.assertEqual(list(files), fs)
+        self.assertEqual(files.documentation_pages(), fs[::2])
+        self.assertEqual(files.get_file_from_path('42.png'), fs[85])
+        files.remove_files(fs[::2])
+        self.assertEqual(list(files), fs[1::2])
+        self.assertEqual(files.documentation_pages(), [])
+        self.assertEqual(files.media_files(), fs[1::2])
+        self.assertEqual(len(files.src_uris), 100)
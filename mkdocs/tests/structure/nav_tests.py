@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 
 import sys
+import threading
 import unittest
 
 from mkdocs.structure.files import File, Files
 from mkdocs.structure.nav import Section, _get_by_type, get_navigation
-from mkdocs.structure.pages import Page
+from mkdocs.structure.pages import Page, active_page
 from mkdocs.tests.base import dedent, load_config
 
 
@@ -268,6 +269,26 @@ class SiteNavigationTests(unittest.TestCase):
         self.assertEqual(site_navigation.items[3].ancestors, [])
         self.assertIsNone(site_navigation.items[3].children)
 
+    def test_ancestors_cached(self):
+        cfg = load_config()
+        inner = Page('Inner', File('a/b.md', cfg['docs_dir'], cfg['site_dir'], True), cfg)
+        section = Section('A', [inner])
+        outer = Section('Outer', [section])
+        inner.parent, section.parent = section, outer
+        ancestors = inner.ancestors
+        self.assertEqual(ancestors, [section, outer])
+        self.assertIs(inner.ancestors, ancestors)
+
+        # A change of any ancestor is picked up.
+        other = Section('Other', [section])
+        section.parent = other
+        self.assertEqual(inner.ancestors, [section, other])
+        section.parent = None
+        self.assertEqual(inner.ancestors, [section])
+        with active_page(inner):
+            self.assertTrue(section.active)
+            self.assertFalse(other.active)
+
     def test_nested_ungrouped_nav(self):
         nav_cfg = [
             {'Home': 'index.md'},
@@ -459,6 +480,43 @@ class SiteNavigationTests(unittest.TestCase):
         self.assertFalse(site_navigation.items[1].children[3].active)
         self.assertFalse(site_navigation.items[1].active)
 
+    def test_active_page(self):
+        nav_cfg = [
+            {'Home': 'index.md'},
+            {'API Guide': [{'Running': 'api-guide/running.md'}]},
+            {'About': [{'License': 'about/license.md'}]},
+        ]
+        cfg = load_config(nav=nav_cfg, site_url='http://example.com/')
+        fs = ['index.md', 'api-guide/running.md', 'about/license.md']
+        files = Files(
+            [File(s, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']) for s in fs]
+        )
+        site_navigation = get_navigation(files, cfg)
+        home, api_guide, about = site_navigation.items
+        running, license = api_guide.children[0], about.children[0]
+        # A flag set on the shared objects is overridden by the active page of this thread.
+        license.active = True
+        seen_in_thread = []
+
+        def check_in_thread():
+            seen_in_thread.append((home.active, running.active, license.active))
+
+        with active_page(running):
+            self.assertTrue(running.active)
+            self.assertTrue(api_guide.active)
+            self.assertFalse(license.active)
+            self.assertFalse(about.active)
+            self.assertFalse(home.active)
+            thread = threading.Thread(target=check_in_thread)
+            thread.start()
+            thread.join()
+        self.assertEqual(seen_in_thread, [(False, False, True)])
+        # The shared flags are back in effect.
+        self.assertFalse(running.active)
+        self.assertFalse(api_guide.active)
+        self.assertTrue(license.active)
+        self.assertTrue(about.active)
+
     def test_get_by_type_nested_sections(self):
         nav_cfg = [
             {
@@ -4,9 +4,14 @@ import unittest
 from tempfile import TemporaryDirectory
 from unittest import mock
 
-from mkdocs.structure.files import File, Files
-from mkdocs.structure.pages import Page
-from mkdocs.tests.base import dedent, load_config
+import markdown
+
+from mkdocs.structure.files import File, Files, UnresolvedLink, get_files
+from mkdocs.structure.nav import get_navigation
+from mkdocs.structure.pages import Page, PageHeadCache, read_page_heads
+from mkdocs.tests.base import dedent, load_config, tempdir
+from mkdocs.utils import meta
+from mkdocs.utils.cache import SpillFile
 
 
 class PageTests(unittest.TestCase):
@@ -626,6 +631,79 @@ class PageTests(unittest.TestCase):
             ),
         )
 
+    def test_page_render_reuses_markdown(self):
+        cfg = load_config(markdown_extensions=['toc', 'footnotes'])
+        other_cfg = load_config(markdown_extensions=['toc'])
+        fs = [
+            File(f, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+            for f in ('index.md', 'sub/page.md')
+        ]
+        files = Files(fs)
+        with mock.patch('markdown.Markdown', wraps=markdown.Markdown) as mock_markdown:
+            pages = []
+            for fl, link in zip(fs, ('sub/page.md', '../index.md')):
+                pg = Page('Foo', fl, cfg)
+                pg.markdown = f'# Heading\n\n[link]({link})[^1]\n\n[^1]: Note'
+                pg.render(cfg, files)
+                pages.append(pg)
+            self.assertEqual(mock_markdown.call_count, 1)
+
+            # No state is carried over from the previous page.
+            self.assertEqual(str(pages[0].toc), str(pages[1].toc))
+            self.assertEqual(pages[0].content.count('<li id="fn:1">'), 1)
+            self.assertEqual(pages[1].content.count('<li id="fn:1">'), 1)
+            self.assertIn('<a href="sub/page/">link</a>', pages[0].content)
+            self.assertIn('<a href="../..">link</a>', pages[1].content)
+
+            # Another config gets its own Markdown instance.
+            pg = Page('Foo', fs[0], other_cfg)
+            pg.markdown = '# Heading'
+            pg.render(other_cfg, files)
+            self.assertEqual(mock_markdown.call_count, 2)
+
+    def test_page_render_does_not_reuse_stateful_markdown(self):
+        cfg = load_config(markdown_extensions=['toc', 'abbr'])
+        fs = [
+            File(f, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+            for f in ('a.md', 'c.md')
+        ]
+        files = Files(fs)
+        with mock.patch('markdown.Markdown', wraps=markdown.Markdown) as mock_markdown:
+            pages = []
+            for fl, source in zip(fs, ('*[HTML]: Hyper Text\n\nHTML first', 'HTML third')):
+                pg = Page('Foo', fl, cfg)
+                pg.markdown = source
+                pg.render(cfg, files)
+                pages.append(pg)
+            self.assertEqual(mock_markdown.call_count, 2)
+        self.assertEqual(pages[0].content, '<p><abbr title="Hyper Text">HTML</abbr> first</p>')
+        # The abbreviations of a page don't apply to the next one.
+        self.assertEqual(pages[1].content, '<p>HTML third</p>')
+
+    def test_page_spill(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown, pg.content = '# Foo\N{SNOWMAN}', '<h1>Foo\N{SNOWMAN}</h1>'
+        store = SpillFile()
+        self.addCleanup(store.close)
+
+        pg.spill(store)
+        self.assertIsNone(pg._markdown)
+        self.assertIsNone(pg._content)
+        self.assertEqual(pg.markdown, '# Foo\N{SNOWMAN}')
+        self.assertEqual(pg.content, '<h1>Foo\N{SNOWMAN}</h1>')
+
+        pg.unspill()
+        self.assertEqual(pg._content, '<h1>Foo\N{SNOWMAN}</h1>')
+        size = store.size
+        pg.content = '<h1>Bar</h1>'
+        pg.spill(store)
+        # Only the text which changed is stored again.
+        self.assertEqual(store.size, size + len('<h1>Bar</h1>'))
+        self.assertEqual(pg.markdown, '# Foo\N{SNOWMAN}')
+        self.assertEqual(pg.content, '<h1>Bar</h1>')
+
     def test_missing_page(self):
         cfg = load_config()
         fl = File('missing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
@@ -652,6 +730,132 @@ class SourceDateEpochTests(unittest.TestCase):
             del os.environ['SOURCE_DATE_EPOCH']
 
 
+class PageHeadTests(unittest.TestCase):
+    def get_pages(self, docs_dir, nav=None):
+        cfg = load_config(docs_dir=docs_dir, nav=nav)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        return cfg, files, {file.src_uri: file.page for file in files.documentation_pages()}
+
+    @tempdir(
+        files={
+            'index.md': 'Body',
+            'a.md': '---\ntitle: Meta title\n---\n\n# Heading',
+            'b.md': 'Tags: foo\n\n# Heading\n\nBody',
+            'c-page.md': 'Body',
+        }
+    )
+    def test_read_head(self, docs_dir):
+        cfg, files, pages = self.get_pages(docs_dir, nav=[{'Nav title': 'c-page.md'}, 'index.md'])
+        for page in pages.values():
+            self.assertTrue(page.read_head())
+        self.assertEqual(pages['index.md'].title, 'Home')
+        self.assertEqual(pages['a.md'].title, 'Meta title')
+        self.assertEqual(pages['b.md'].title, 'Heading')
+        self.assertEqual(pages['b.md'].meta, {'tags': 'foo'})
+        self.assertEqual(pages['c-page.md'].title, 'Nav title')
+        self.assertIsNone(pages['b.md'].markdown)
+
+        # The title is read again with the source, unless it was changed in between.
+        with open(os.path.join(docs_dir, 'b.md'), 'w', encoding='utf-8') as f:
+            f.write('# New heading')
+        pages['a.md'].title = 'Plugin title'
+        for page in pages.values():
+            page.read_source(cfg)
+        self.assertEqual(pages['b.md'].title, 'New heading')
+        self.assertEqual(pages['b.md'].meta, {})
+        self.assertEqual(pages['a.md'].title, 'Plugin title')
+        self.assertEqual(pages['c-page.md'].title, 'Nav title')
+
+    @tempdir(files={'index.md': 'Body'})
+    def test_read_head_missing(self, docs_dir):
+        cfg, files, pages = self.get_pages(docs_dir)
+        os.remove(os.path.join(docs_dir, 'index.md'))
+        self.assertFalse(pages['index.md'].read_head())
+        self.assertIsNone(pages['index.md'].title)
+
+    @tempdir()
+    @tempdir(files={'a.md': '# A', 'b.md': 'Title: B'})
+    def test_read_page_heads_cached(self, docs_dir, cache_dir):
+        cfg, files, pages = self.get_pages(docs_dir)
+        cfg['cache_dir'] = cache_dir
+        read_page_heads(files, cfg)
+        self.assertEqual([pages['a.md'].title, pages['b.md'].title], ['A', 'B'])
+
+        with open(os.path.join(docs_dir, 'b.md'), 'w', encoding='utf-8') as f:
+            f.write('Title: New B, a bit longer')
+        cfg, files, pages = self.get_pages(docs_dir)
+        cfg['cache_dir'] = cache_dir
+        with mock.patch('mkdocs.utils.meta.read_head', wraps=meta.read_head) as mock_read_head:
+            read_page_heads(files, cfg)
+        # Only the file which changed is read.
+        mock_read_head.assert_called_once_with(pages['b.md'].file.abs_src_path)
+        self.assertEqual([pages['a.md'].title, pages['b.md'].title], ['A', 'New B, a bit longer'])
+
+        # The entries of removed pages are dropped.
+        os.remove(os.path.join(docs_dir, 'a.md'))
+        cfg, files, pages = self.get_pages(docs_dir)
+        cfg['cache_dir'] = cache_dir
+        read_page_heads(files, cfg)
+        heads = PageHeadCache(os.path.join(cache_dir, 'page_heads.pickle'))
+        self.assertEqual(list(heads._entries), ['b.md'])
+
+
+class RenderCacheTests(unittest.TestCase):
+    def render(self, cfg, paths, source):
+        fs = [File(f, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']) for f in paths]
+        pg = Page('Foo', fs[0], cfg)
+        pg.markdown = source
+        pg.render(cfg, Files(fs))
+        return pg
+
+    @tempdir()
+    def test_render_from_cache(self, cache_dir):
+        cfg = load_config(cache_dir=cache_dir)
+        source = '# Title\n\n[link](other.md)'
+        pg = self.render(cfg, ['index.md', 'other.md'], source)
+        with mock.patch('markdown.Markdown') as mock_markdown:
+            cached = self.render(cfg, ['index.md', 'other.md'], source)
+        mock_markdown.assert_not_called()
+        self.assertEqual(cached.content, pg.content)
+        self.assertEqual(str(cached.toc), str(pg.toc))
+
+        # The source changed.
+        pg = self.render(cfg, ['index.md', 'other.md'], source + '!')
+        self.assertEqual(pg.content, '<h1 id="title">Title</h1>\n<p><a href="other/">link</a>!</p>')
+
+    @tempdir()
+    def test_render_cache_link_target_changed(self, cache_dir):
+        cfg = load_config(cache_dir=cache_dir)
+        source = '[link](other.md)'
+        self.render(cfg, ['index.md', 'other.md'], source)
+        with self.assertLogs('mkdocs', level='WARNING') as cm:
+            pg = self.render(cfg, ['index.md'], source)
+        self.assertEqual(pg.content, '<p><a href="other.md">link</a></p>')
+        self.assertEqual(len(cm.output), 1)
+
+        # Warnings are repeated when rendering from the cache.
+        with mock.patch('markdown.Markdown') as mock_markdown:
+            with self.assertLogs('mkdocs', level='WARNING') as cm:
+                pg = self.render(cfg, ['index.md'], source)
+        mock_markdown.assert_not_called()
+        self.assertEqual(
+            cm.output,
+            [
+                "WARNING:mkdocs.structure.pages:Documentation file 'index.md' contains a link to "
+                "'other.md' which is not found in the documentation files."
+            ],
+        )
+
+    @tempdir()
+    def test_render_cache_extensions_changed(self, cache_dir):
+        source = '# Title'
+        self.render(load_config(cache_dir=cache_dir), ['index.md'], source)
+        cfg = load_config(cache_dir=cache_dir, markdown_extensions=[{'toc': {'permalink': True}}])
+        pg = self.render(cfg, ['index.md'], source)
+        self.assertIn('headerlink', pg.content)
+
+
 class RelativePathExtensionTests(unittest.TestCase):
 
     DOCS_DIR = os.path.join(
@@ -794,6 +998,26 @@ class RelativePathExtensionTests(unittest.TestCase):
             ],
         )
 
+    @mock.patch(
+        'mkdocs.structure.pages.open',
+        mock.mock_open(read_data='[link](sub/non-existent.md#a) ![img](../img.png)'),
+    )
+    def test_unresolved_links_recorded(self):
+        cfg = load_config(docs_dir=self.DOCS_DIR)
+        fs = [File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])]
+        files = Files(fs)
+        pg = Page('Foo', fs[0], cfg)
+        pg.read_source(cfg)
+        with self.assertLogs('mkdocs', level='WARNING'):
+            pg.render(cfg, files)
+        self.assertEqual(
+            files.link_index.unresolved,
+            [
+                UnresolvedLink('index.md', 'sub/non-existent.md#a', 'sub/non-existent.md'),
+                UnresolvedLink('index.md', '../img.png', '../img.png'),
+            ],
+        )
+
     @mock.patch(
         'mkdocs.structure.pages.open',
         mock.mock_open(read_data='[external](http://example.com/index.md)'),
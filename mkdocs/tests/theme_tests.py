@@ -5,7 +5,7 @@ from unittest import mock
 
 import mkdocs
 from mkdocs.localization import parse_locale
-from mkdocs.theme import Theme
+from mkdocs.theme import Theme, install_bytecode_cache
 
 abs_path = os.path.abspath(os.path.dirname(__file__))
 mkdocs_dir = os.path.abspath(os.path.dirname(mkdocs.__file__))
@@ -38,6 +38,7 @@ class ThemeTests(unittest.TestCase):
                 'hljs_languages': [],
                 'navigation_depth': 2,
                 'nav_style': 'primary',
+                'external_nav': False,
                 'shortcuts': {'help': 191, 'next': 78, 'previous': 80, 'search': 83},
             },
         )
@@ -105,3 +106,33 @@ class ThemeTests(unittest.TestCase):
                 ],
             )
             self.assertEqual(theme.static_templates, {'sitemap.xml', 'child.html', 'parent.html'})
+
+    def test_get_env_without_cache_dir(self):
+        env = Theme(name='mkdocs').get_env()
+        self.assertIsNone(env.bytecode_cache)
+
+    def test_get_env_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            theme = Theme(name='mkdocs')
+            template = theme.get_env(cache_dir).get_template('main.html')
+
+            env = theme.get_env(cache_dir)
+            with mock.patch.object(env, 'compile') as mock_compile:
+                cached = env.get_template('main.html')
+            mock_compile.assert_not_called()
+            self.assertEqual(set(cached.blocks), set(template.blocks))
+
+            # An environment which compiles templates differently uses other cache entries,
+            # even if it is changed after the cache is installed.
+            for change in (
+                lambda env: setattr(env, 'trim_blocks', True),
+                lambda env: env.add_extension('jinja2.ext.do'),
+            ):
+                other_env = theme.get_env()
+                install_bytecode_cache(other_env, cache_dir)
+                change(other_env)
+                with mock.patch.object(
+                    other_env, 'compile', wraps=other_env.compile
+                ) as mock_compile:
+                    other_env.get_template('main.html')
+                mock_compile.assert_called()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import os
+import unittest
+
+from markdown.extensions.toc import TocExtension
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.cache import DiskCache, SpillFile, make_key
+
+
+class DiskCacheTests(unittest.TestCase):
+    def test_make_key(self):
+        def func():
+            pass
+
+        self.assertEqual(make_key('a', {'b': {1, 2}}, func), make_key('a', {'b': {2, 1}}, func))
+        self.assertNotEqual(make_key('a', {'b': 1}), make_key('a', {'b': 2}))
+        self.assertNotEqual(make_key('a', 'b'), make_key('ab'))
+
+    def test_make_key_of_objects(self):
+        # Objects with the default repr, which holds their address, are keyed by their class,
+        # and Markdown extensions by their config too.
+        self.assertEqual(make_key(object()), make_key(object()))
+        self.assertEqual(
+            make_key(TocExtension(permalink=True)), make_key(TocExtension(permalink=True))
+        )
+        self.assertNotEqual(
+            make_key(TocExtension(permalink=True)), make_key(TocExtension(permalink=False))
+        )
+
+    @tempdir()
+    def test_get_and_set(self, cache_dir):
+        cache = DiskCache(cache_dir)
+        key = make_key('foo')
+        self.assertIsNone(cache.get(key))
+        cache.set(key, b'bar')
+        self.assertEqual(cache.get(key), b'bar')
+        self.assertEqual(DiskCache(cache_dir).get(key), b'bar')
+
+    @tempdir()
+    def test_prune(self, cache_dir):
+        cache = DiskCache(cache_dir)
+        keys = [make_key(i) for i in range(4)]
+        for i, key in enumerate(keys):
+            cache.set(key, b'x' * 10)
+            os.utime(cache._get_path(key), (i, i))
+        # Reading an entry marks it as recently used.
+        cache.get(keys[0])
+
+        cache.prune(25)
+        self.assertEqual(cache.get(keys[0]), b'x' * 10)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNone(cache.get(keys[2]))
+        self.assertEqual(cache.get(keys[3]), b'x' * 10)
+
+
+class SpillFileTests(unittest.TestCase):
+    def test_put_and_read(self):
+        store = SpillFile()
+        self.addCleanup(store.close)
+        texts = ['foo', '', 'b\N{SNOWMAN}r', 'baz' * 1000]
+        spilled = [store.put(text) for text in texts]
+        self.assertEqual([text.read() for text in reversed(spilled)], texts[::-1])
+        self.assertEqual(store.size, sum(len(text.encode('utf-8')) for text in texts))
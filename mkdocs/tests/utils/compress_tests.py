@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import gzip
+import os
+import unittest
+from unittest import mock
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils import compress
+
+
+class CompressTests(unittest.TestCase):
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '123'})
+    def test_gzip_compress_is_reproducible(self):
+        data = b'<p>Some text</p>' * 100
+        compressed = compress.gzip_compress(data, '/site/index.html')
+        self.assertEqual(compress.gzip_compress(data, '/other/index.html'), compressed)
+        self.assertEqual(gzip.decompress(compressed), data)
+        # The time of the build is recorded in the header.
+        self.assertEqual(int.from_bytes(compressed[4:8], 'little'), 123)
+
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_gzip_compress_level(self):
+        data = b'<p>Some text</p>' * 100
+        fast = compress.gzip_compress(data, 'index.html', 1)
+        self.assertEqual(gzip.decompress(fast), data)
+        self.assertNotEqual(fast, compress.gzip_compress(data, 'index.html', 9))
+
+    @unittest.skipUnless(compress.has_brotli, "brotli isn't installed")
+    def test_brotli_compress(self):
+        data = b'<p>Some text</p>' * 100
+        compressed = compress.brotli_compress(data, 'index.html')
+        self.assertEqual(compress.brotli.decompress(compressed), data)
+
+    def test_get_formats(self):
+        self.assertEqual(compress.get_formats([]), [])
+        self.assertEqual(compress.get_formats(['gzip']), ['gzip'])
+
+    @mock.patch.object(compress, 'has_brotli', False)
+    def test_get_formats_without_brotli(self):
+        with self.assertLogs('mkdocs', level='WARNING') as cm:
+            self.assertEqual(compress.get_formats(['gzip', 'brotli']), ['gzip'])
+        self.assertIn("'brotli' package is not installed", cm.output[0])
+
+    @tempdir(files={'index.html': 'a' * 10, 'small.css': 'a', 'img.png': 'a' * 10})
+    def test_is_compressible(self, site_dir):
+        self.assertTrue(compress.is_compressible(os.path.join(site_dir, 'index.html'), 10))
+        self.assertFalse(compress.is_compressible(os.path.join(site_dir, 'index.html'), 11))
+        self.assertTrue(compress.is_compressible(os.path.join(site_dir, 'small.css')))
+        self.assertFalse(compress.is_compressible(os.path.join(site_dir, 'img.png')))
+
+    @tempdir(files={'index.html': 'Some text'})
+    def test_compress_file(self, site_dir):
+        path = os.path.join(site_dir, 'index.html')
+        self.assertEqual(compress.compress_file(path, {'gzip': 9}), 1)
+        with gzip.open(path + '.gz') as f:
+            self.assertEqual(f.read(), b'Some text')
+        # Copies with the same content are left untouched.
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'}):
+            compress.compress_file(path, {'gzip': 9})
+            self.assertEqual(compress.compress_file(path, {'gzip': 9}), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+import re
+import unittest
+from unittest import mock
+
+import jinja2
+
+from mkdocs.structure.files import File, Files
+from mkdocs.structure.nav import get_navigation
+from mkdocs.structure.pages import active_page
+from mkdocs.tests.base import load_config
+from mkdocs.utils import filters, normalize_url, templates
+
+ITEM_TEMPLATE = (
+    '<li{% if nav_item.active %} class="active"{% endif %}>'
+    '{% if nav_item.children %}{{ nav_item.title }}<ul>'
+    '{% for nav_item in nav_item.children %}{{ render("item.html", nav_item) }}{% endfor %}'
+    '</ul>{% else %}<a href="{{ nav_item.url|url }}">{{ nav_item.title }}</a>{% endif %}'
+    '</li>'
+)
+
+
+class NavItemRendererTests(unittest.TestCase):
+    def setUp(self):
+        cfg = load_config(
+            nav=[
+                {'Home': 'index.md'},
+                {'A': [{'One': 'a/one.md'}, {'Two': 'a/two.md'}]},
+                {'B': [{'Three': 'b/three.md'}, {'Link': 'https://example.com/'}]},
+            ]
+        )
+        self.files = Files(
+            [
+                File(path, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+                for path in ('index.md', 'a/one.md', 'a/two.md', 'b/three.md')
+            ]
+        )
+        self.nav = get_navigation(self.files, cfg)
+
+    def render_nav(self, env, render):
+        env.filters['url'] = filters.url_filter
+        env.globals['render'] = render
+        template = env.from_string(
+            '{% for nav_item in nav %}{{ render("item.html", nav_item) }}{% endfor %}'
+        )
+        output = {}
+        for file in self.files:
+            with active_page(file.page):
+                output[file.src_uri] = template.render(nav=self.nav, page=file.page, base_url='')
+        return output
+
+    def test_render_nav_item(self):
+        # Plain includes are the reference.
+        env = jinja2.Environment(
+            loader=jinja2.DictLoader(
+                {
+                    'item.html': ITEM_TEMPLATE.replace(
+                        '{{ render("item.html", nav_item) }}', '{% include "item.html" %}'
+                    )
+                }
+            )
+        )
+        env.filters['url'] = filters.url_filter
+        template = env.from_string('{% for nav_item in nav %}{% include "item.html" %}{% endfor %}')
+        expected = {}
+        for file in self.files:
+            with active_page(file.page):
+                expected[file.src_uri] = template.render(nav=self.nav, page=file.page, base_url='')
+
+        env = jinja2.Environment(loader=jinja2.DictLoader({'item.html': ITEM_TEMPLATE}))
+        render = filters.get_nav_item_renderer()
+        with mock.patch.object(env, 'get_template', wraps=env.get_template) as mock_get_template:
+            self.assertEqual(self.render_nav(env, render), expected)
+        # Each of the 7 items is rendered once while inactive, and again on each page where it
+        # is active: Home, A and One, A and Two, B and Three.
+        self.assertEqual(mock_get_template.call_count, 7 + 7)
+
+        self.assertIn('<li class="active"><a href="./">Two</a></li>', expected['a/two.md'])
+        self.assertIn('<li><a href="../../a/one/">One</a></li>', expected['b/three.md'])
+        self.assertIn('<li><a href="https://example.com/">Link</a></li>', expected['index.md'])
+
+    def test_render_nav_item_records_templates(self):
+        env = jinja2.Environment(
+            loader=jinja2.DictLoader(
+                {
+                    'item.html': ITEM_TEMPLATE.replace('<li', '{% include "li.html" %}'),
+                    'li.html': '<li',
+                }
+            )
+        )
+        render = filters.get_nav_item_renderer()
+        env.filters['url'] = filters.url_filter
+        env.globals['render'] = render
+        template = env.from_string('{{ render("item.html", nav[2]) }}')
+
+        def get_template(name, *args, **kwargs):
+            templates.record(name)
+            return jinja2.Environment.get_template(env, name, *args, **kwargs)
+
+        with mock.patch.object(env, 'get_template', get_template):
+            for file in self.files:
+                with active_page(file.page), templates.recording() as names:
+                    template.render(nav=self.nav.items, page=file.page, base_url='')
+                # The templates of items are recorded on all pages, even where the output of
+                # the item is reused.
+                self.assertEqual(names, {'item.html', 'li.html'})
+
+    def test_url_filter(self):
+        env = jinja2.Environment()
+        env.filters['url'] = filters.url_filter
+        template = env.from_string('{{ "foo/"|url }} {{ "https://example.com/"|url }}')
+        self.assertEqual(template.render(page=None, base_url='..'), '../foo/ https://example.com/')
+
+    def test_render_nav_item_external(self):
+        env = jinja2.Environment(loader=jinja2.DictLoader({'item.html': ITEM_TEMPLATE}))
+        expected = self.render_nav(env, filters.get_nav_item_renderer())
+
+        env = jinja2.Environment(loader=jinja2.DictLoader({'item.html': ITEM_TEMPLATE}))
+        render = filters.get_nav_item_renderer(external=True)
+        output = self.render_nav(env, render)
+
+        self.assertEqual(
+            output['a/two.md'],
+            '<template data-nav-item="item.html 0"></template>'
+            '<li class="active">A<ul>'
+            '<template data-nav-item="item.html 1.0"></template>'
+            '<li class="active"><a href="./">Two</a></li>'
+            '</ul></li>'
+            '<template data-nav-item="item.html 2"></template>',
+        )
+        self.assertEqual(
+            render.external_items,
+            {
+                'item.html 0': '<li><a href="\x1a\x1a">Home</a></li>',
+                'item.html 1': '<li>A<ul><li><a href="\x1aa/one/\x1a">One</a></li>'
+                '<li><a href="\x1aa/two/\x1a">Two</a></li></ul></li>',
+                'item.html 1.0': '<li><a href="\x1aa/one/\x1a">One</a></li>',
+                'item.html 1.1': '<li><a href="\x1aa/two/\x1a">Two</a></li>',
+                'item.html 2': '<li>B<ul><li><a href="\x1ab/three/\x1a">Three</a></li>'
+                '<li><a href="\x1ahttps://example.com/\x1a">Link</a></li></ul></li>',
+                'item.html 2.1': '<li><a href="\x1ahttps://example.com/\x1a">Link</a></li>',
+            },
+        )
+
+        # Filling the placeholders in, as the theme does, results in the same nav.
+        for file in self.files:
+            with self.subTest(file.src_uri):
+                filled = re.sub(
+                    '<template data-nav-item="([^"]*)"></template>',
+                    lambda m: re.sub(
+                        '\x1a([^\x1a]*)\x1a',
+                        lambda u: normalize_url(u.group(1), page=file.page, base=''),
+                        render.external_items[m.group(1)],
+                    ),
+                    output[file.src_uri],
+                )
+                self.assertEqual(filled, expected[file.src_uri])
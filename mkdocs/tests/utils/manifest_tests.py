@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+import json
+import os
+import unittest
+from unittest import mock
+
+import mkdocs
+from mkdocs import utils
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.manifest import BuildManifest, get_manifest_path
+
+
+class BuildManifestTests(unittest.TestCase):
+    @tempdir(files={'foo.md': 'foo'})
+    @tempdir()
+    def test_file_changed(self, site_dir, docs_dir):
+        path = os.path.join(docs_dir, 'foo.md')
+        manifest = BuildManifest(site_dir)
+        # Unknown files are changed.
+        self.assertTrue(manifest.file_changed('foo.md', path))
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertFalse(manifest.file_changed('foo.md', path))
+        manifest.save()
+
+        utils.write_file(b'bar', path)
+        manifest = BuildManifest(site_dir)
+        self.assertTrue(manifest.file_changed('foo.md', path))
+
+    @tempdir(files={'foo.md': 'foo'})
+    @tempdir()
+    def test_file_touched_but_unchanged(self, site_dir, docs_dir):
+        path = os.path.join(docs_dir, 'foo.md')
+        manifest = BuildManifest(site_dir)
+        manifest.file_changed('foo.md', path)
+        manifest.save()
+
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        manifest = BuildManifest(site_dir)
+        self.assertFalse(manifest.file_changed('foo.md', path))
+
+    @tempdir(files={'foo.md': 'foo'})
+    @tempdir()
+    def test_unchanged_files_are_not_read(self, site_dir, docs_dir):
+        path = os.path.join(docs_dir, 'foo.md')
+        manifest = BuildManifest(site_dir)
+        digest = manifest.hash_file('foo.md', path)
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        with mock.patch('mkdocs.utils.manifest.hash_file') as mock_hash_file:
+            self.assertEqual(manifest.hash_file('foo.md', path), digest)
+        mock_hash_file.assert_not_called()
+
+    @tempdir(files={'foo.md': 'foo'})
+    @tempdir()
+    def test_files_are_hashed_once_per_build(self, site_dir, docs_dir):
+        path = os.path.join(docs_dir, 'foo.md')
+        manifest = BuildManifest(site_dir)
+        digest = manifest.hash_file('foo.md', path)
+        with mock.patch('mkdocs.utils.manifest.hash_file') as mock_hash_file:
+            self.assertTrue(manifest.file_changed('foo.md', path))
+            self.assertEqual(manifest.hash_file('foo.md', path), digest)
+        mock_hash_file.assert_not_called()
+
+    @tempdir(files={'foo.md': 'foo'})
+    @tempdir()
+    def test_record_file(self, site_dir, docs_dir):
+        path = os.path.join(docs_dir, 'foo.md')
+        manifest = BuildManifest(site_dir)
+        manifest.record_file('foo.md', path, 'abc')
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.hash_file('foo.md', path), 'abc')
+
+    @tempdir()
+    def test_signature_changed(self, site_dir):
+        manifest = BuildManifest(site_dir)
+        self.assertTrue(manifest.signature_changed('config', 'a'))
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertFalse(manifest.signature_changed('config', 'a'))
+        self.assertTrue(manifest.signature_changed('theme', 'a'))
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertTrue(manifest.signature_changed('config', 'b'))
+
+    @tempdir(files={'a.md': 'a', 'b.md': 'b', 'c.md': 'c'})
+    @tempdir()
+    def test_templates_changed(self, site_dir, docs_dir):
+        manifest = BuildManifest(site_dir)
+        for name in ('a.md', 'b.md', 'c.md'):
+            manifest.hash_file(name, os.path.join(docs_dir, name))
+        # Outputs which weren't rendered before depend on any template.
+        self.assertTrue(manifest.templates_changed('a.md', {}))
+        manifest.record_templates('a.md', {'main.html', 'base.html'})
+        manifest.record_templates('b.md', ['other.html'])
+        manifest.record_templates('c.md', ['other.html'])
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        changed = {'main.html': False, 'base.html': False, 'other.html': True}
+        self.assertFalse(manifest.templates_changed('a.md', changed))
+        self.assertTrue(manifest.templates_changed('b.md', changed))
+        # Templates which don't exist anymore are changed.
+        self.assertTrue(manifest.templates_changed('a.md', {'main.html': False}))
+        # Only `b.md` is rendered again. `a.md` keeps its templates, and `c.md` was removed.
+        manifest.hash_file('a.md', os.path.join(docs_dir, 'a.md'))
+        manifest.hash_file('b.md', os.path.join(docs_dir, 'b.md'))
+        manifest.record_templates('b.md', ['main.html'])
+        manifest.save()
+
+        with open(manifest.path, encoding='utf-8') as f:
+            self.assertEqual(
+                json.load(f)['templates'],
+                {'a.md': ['base.html', 'main.html'], 'b.md': ['main.html']},
+            )
+
+    @tempdir()
+    def test_states_changed(self, site_dir):
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.states_changed({'a': '1', 'b': '2'}), {'a', 'b'})
+        manifest.record_dependencies({'a': ['b']})
+        self.assertEqual(manifest.previous_dependencies, {})
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.previous_dependencies, {'a': ['b']})
+        # Changed, removed and added states.
+        self.assertEqual(manifest.states_changed({'a': '3', 'c': '2'}), {'a', 'b', 'c'})
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.states_changed({'a': '3', 'c': '2'}), set())
+        # Dependencies which aren't recorded again are dropped.
+        self.assertEqual(manifest.previous_dependencies, {})
+
+    @tempdir()
+    def test_record_outputs(self, site_dir):
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.previous_outputs, [])
+        manifest.record_outputs({'index.html', 'a/index.html'})
+        manifest.save()
+
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.previous_outputs, ['a/index.html', 'index.html'])
+        manifest.save()
+        # Outputs which aren't recorded again are dropped.
+        self.assertEqual(BuildManifest(site_dir).previous_outputs, [])
+
+    @tempdir(files={'a.md': 'a'})
+    @tempdir()
+    def test_get_templates(self, site_dir, docs_dir):
+        manifest = BuildManifest(site_dir)
+        manifest.hash_file('a.md', os.path.join(docs_dir, 'a.md'))
+        self.assertIsNone(manifest.get_templates('a.md'))
+        manifest.record_templates('a.md', ['main.html'])
+        self.assertEqual(manifest.get_templates('a.md'), ['main.html'])
+        manifest.save()
+
+        # The templates of the previous build stand until the output is rendered again.
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.get_templates('a.md'), ['main.html'])
+        manifest.record_templates('a.md', ['other.html'])
+        self.assertEqual(manifest.get_templates('a.md'), ['other.html'])
+
+    @tempdir()
+    def test_ignore_other_version(self, site_dir):
+        manifest = BuildManifest(site_dir)
+        manifest.signature_changed('config', 'a')
+        manifest.save()
+
+        with mock.patch.object(mkdocs, '__version__', '0.0'):
+            manifest = BuildManifest(site_dir)
+        self.assertTrue(manifest.signature_changed('config', 'a'))
+
+    @tempdir()
+    def test_ignore_invalid(self, site_dir):
+        utils.write_file(b'not json', get_manifest_path(site_dir))
+        manifest = BuildManifest(site_dir)
+        self.assertTrue(manifest.signature_changed('config', 'a'))
+        manifest.save()
+        with open(manifest.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['version'], mkdocs.__version__)
+
+    @tempdir()
+    @tempdir()
+    def test_manifest_path(self, site_dir, cache_dir):
+        # The manifest is kept out of the site_dir, which is deployed.
+        manifest = BuildManifest(site_dir)
+        self.assertEqual(manifest.path, os.path.abspath(site_dir) + '.manifest.json')
+        manifest = BuildManifest(site_dir, cache_dir)
+        self.assertEqual(os.path.dirname(manifest.path), os.path.join(cache_dir, 'manifests'))
+        self.assertNotEqual(BuildManifest(cache_dir, cache_dir).path, manifest.path)
+        manifest.save()
+        self.assertEqual(os.listdir(site_dir), [])
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+import json
+import os
+import unittest
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils import profiler
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_span_without_profiler(self):
+        self.assertIsNone(profiler.get_profiler())
+        with profiler.span('phase', 'foo'):
+            pass
+
+    def test_span(self):
+        prof = profiler.Profiler()
+        previous = profiler.set_profiler(prof)
+        try:
+            with profiler.span('phase', 'foo'):
+                with profiler.span('page', 'markdown', 'index.md'):
+                    pass
+        finally:
+            profiler.set_profiler(previous)
+        with profiler.span('phase', 'bar'):
+            pass
+
+        self.assertEqual(
+            [span[:3] for span in prof.spans],
+            [('page', 'markdown', 'index.md'), ('phase', 'foo', None)],
+        )
+
+    def test_report(self):
+        prof = profiler.Profiler()
+        prof.add('phase', 'read_pages', None, prof.start, 3.0)
+        prof.add('page', 'markdown', 'a.md', prof.start, 1.0, pid=1, tid=1)
+        prof.add('page', 'template', 'a.md', prof.start + 1, 0.5)
+        prof.add('page', 'markdown', 'b.md', prof.start, 2.0)
+        prof.add('template', 'sitemap.xml', None, prof.start + 2, 0.25)
+        for i in range(3):
+            prof.add('plugin', 'search.on_page_content', None, prof.start + i, 0.5)
+        prof.add('plugin', 'foo.on_page_content', None, prof.start, 1.0)
+        prof.end = prof.start + 4
+
+        report = prof.get_report(limit=1)
+        self.assertEqual(report['total'], 4)
+        self.assertEqual(report['phases'], {'read_pages': 3.0})
+        self.assertEqual(
+            report['pages'],
+            {
+                'a.md': {'markdown': 1.0, 'template': 0.5, 'total': 1.5},
+                'b.md': {'markdown': 2.0, 'total': 2.0},
+            },
+        )
+        self.assertEqual(report['templates'], {'sitemap.xml': 0.25})
+        self.assertEqual(
+            report['plugins'],
+            {
+                'search.on_page_content': {'calls': 3, 'total': 1.5},
+                'foo.on_page_content': {'calls': 1, 'total': 1.0},
+            },
+        )
+        self.assertEqual(report['slowest_pages'], [{'page': 'b.md', 'total': 2.0}])
+        self.assertEqual(
+            report['slowest_handlers'],
+            [{'handler': 'search.on_page_content', 'calls': 3, 'total': 1.5}],
+        )
+
+    @tempdir()
+    def test_write(self, output_dir):
+        prof = profiler.Profiler()
+        prof.add('page', 'markdown', 'a.md', prof.start + 0.5, 0.25, pid=1, tid=2)
+        prof.stop()
+
+        trace_path = prof.write(os.path.join(output_dir, 'profile.json'))
+        self.assertEqual(trace_path, os.path.join(output_dir, 'profile.trace.json'))
+        with open(os.path.join(output_dir, 'profile.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['pages'], {'a.md': {'markdown': 0.25, 'total': 0.25}})
+        with open(trace_path, encoding='utf-8') as f:
+            trace = json.load(f)
+        self.assertEqual(
+            trace['traceEvents'],
+            [
+                {
+                    'name': 'markdown a.md',
+                    'cat': 'page',
+                    'ph': 'X',
+                    'ts': 500000,
+                    'dur': 250000,
+                    'pid': 1,
+                    'tid': 2,
+                    'args': {'page': 'a.md'},
+                }
+            ],
+        )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import os
+import unittest
+from unittest import mock
+
+from mkdocs import utils
+from mkdocs.tests.base import PathAssertionMixin, tempdir
+from mkdocs.utils import staging
+
+
+class StagingTests(PathAssertionMixin, unittest.TestCase):
+    def _build(self, site_dir, content, **kwargs):
+        staging_dir = staging.create_staging_dir(site_dir)
+        utils.write_file(content, os.path.join(staging_dir, 'index.html'))
+        staging.publish_staging_dir(site_dir, staging_dir, **kwargs)
+        return staging_dir
+
+    @tempdir()
+    def test_publish(self, tdir):
+        site_dir = os.path.join(tdir, 'site')
+        first = self._build(site_dir, b'first')
+        self.assertTrue(os.path.islink(site_dir))
+        self.assertEqual(os.path.realpath(site_dir), os.path.realpath(first))
+        utils.write_file(b'same', os.path.join(first, 'same.html'))
+
+        second = self._build(site_dir, b'second')
+        self.assertEqual(os.path.realpath(site_dir), os.path.realpath(second))
+        # Unchanged files are shared with the previous generation, which is left intact.
+        self.assertTrue(
+            os.path.samefile(os.path.join(first, 'same.html'), os.path.join(second, 'same.html'))
+        )
+        with open(os.path.join(first, 'index.html'), 'rb') as f:
+            self.assertEqual(f.read(), b'first')
+        with open(os.path.join(site_dir, 'index.html'), 'rb') as f:
+            self.assertEqual(f.read(), b'second')
+
+        third = self._build(site_dir, b'third')
+        self.assertPathNotExists(first)
+        self.assertPathIsDir(second)
+        self.assertPathIsDir(third)
+
+        self._build(site_dir, b'fourth', keep=0)
+        self.assertEqual(os.listdir(staging.get_generations_dir(site_dir)), ['4'])
+
+    @tempdir(files={'site/index.html': 'in place'})
+    def test_publish_over_directory(self, tdir):
+        site_dir = os.path.join(tdir, 'site')
+        staging_dir = self._build(site_dir, b'staged')
+        self.assertEqual(os.path.realpath(site_dir), os.path.realpath(staging_dir))
+        # The site which was built in place is kept as the previous generation.
+        with open(os.path.join(staging.get_generations_dir(site_dir), '2', 'index.html')) as f:
+            self.assertEqual(f.read(), 'in place')
+
+    @tempdir()
+    def test_publish_without_symlinks(self, tdir):
+        site_dir = os.path.join(tdir, 'site')
+        with mock.patch('os.symlink', side_effect=OSError):
+            self._build(site_dir, b'first')
+            self._build(site_dir, b'second')
+        self.assertFalse(os.path.islink(site_dir))
+        with open(os.path.join(site_dir, 'index.html'), 'rb') as f:
+            self.assertEqual(f.read(), b'second')
+        self.assertEqual(os.listdir(staging.get_generations_dir(site_dir)), ['2'])
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+import threading
+import unittest
+
+from mkdocs.theme import Theme
+from mkdocs.utils import templates
+
+
+class TemplateRecordingTests(unittest.TestCase):
+    def test_nested_recordings(self):
+        templates.record('ignored.html')
+        with templates.recording() as outer:
+            templates.record('a.html')
+            with templates.recording() as inner:
+                templates.record('b.html', 'c.html')
+            templates.record('d.html')
+        self.assertEqual(outer, {'a.html', 'b.html', 'c.html', 'd.html'})
+        self.assertEqual(inner, {'b.html', 'c.html'})
+
+    def test_recording_per_thread(self):
+        thread = threading.Thread(target=templates.record, args=('other.html',))
+        with templates.recording() as names:
+            thread.start()
+            thread.join()
+        self.assertEqual(names, set())
+
+    def test_theme_env_records_templates(self):
+        env = Theme(name='mkdocs').get_env()
+        with templates.recording() as names:
+            env.get_template('main.html')
+        self.assertEqual(names, {'main.html'})
+
+        # Templates loaded while rendering, whether cached or not, are recorded each time.
+        for _ in range(2):
+            with templates.recording() as names:
+                env.from_string('{% include ["missing.html", "toc.html"] %}').render(
+                    page=None, nav=None, config={}, toc=[]
+                )
+            self.assertEqual(names, {'toc.html'})
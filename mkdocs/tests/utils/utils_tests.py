@@ -531,6 +531,64 @@ class UtilsTests(unittest.TestCase):
             shutil.rmtree(src_dir)
             shutil.rmtree(dst_dir)
 
+    @tempdir(files={'foo.txt': 'content'})
+    @tempdir()
+    def test_copy_file_hardlink(self, dst_dir, src_dir):
+        src, dst = os.path.join(src_dir, 'foo.txt'), os.path.join(dst_dir, 'foo', 'foo.txt')
+        utils.copy_file(src, dst, hardlink=True)
+        self.assertTrue(os.path.samefile(src, dst))
+        # Linking again replaces the link.
+        utils.copy_file(src, dst, hardlink=True)
+        self.assertTrue(os.path.samefile(src, dst))
+
+    @tempdir(files={'foo.txt': 'content'})
+    @tempdir()
+    def test_copy_file_to_itself(self, dst_dir, src_dir):
+        src, link = os.path.join(src_dir, 'foo.txt'), os.path.join(dst_dir, 'foo.txt')
+        os.symlink(src, link)
+        for dst in (src, link, dst_dir):
+            for hardlink in (False, True):
+                with self.subTest(dst=dst, hardlink=hardlink):
+                    with self.assertRaises(shutil.SameFileError):
+                        utils.copy_file(src, dst, hardlink=hardlink)
+                    with open(src, encoding='utf-8') as f:
+                        self.assertEqual(f.read(), 'content')
+
+    @tempdir()
+    def test_write_file_unchanged(self, dst_dir):
+        path = os.path.join(dst_dir, 'foo', 'foo.txt')
+        utils.reset_outputs()
+        self.assertTrue(utils.write_file(b'content', path))
+        mtime = os.stat(path).st_mtime_ns - 10**9
+        os.utime(path, ns=(mtime, mtime))
+
+        self.assertFalse(utils.write_file(b'content', path))
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        for content in (b'CONTENT', b'new content'):
+            with self.subTest(content):
+                self.assertTrue(utils.write_file(content, path))
+                with open(path, 'rb') as f:
+                    self.assertEqual(f.read(), content)
+        self.assertEqual(utils.get_write_counts(), {'written': 3, 'unchanged': 1})
+        utils.reset_outputs()
+        self.assertEqual(utils.get_write_counts(), {'written': 0, 'unchanged': 0})
+
+    @tempdir(files={'foo.txt': 'content', 'bar.txt': 'other content'})
+    @tempdir()
+    def test_write_to_hardlink(self, dst_dir, src_dir):
+        src, dst = os.path.join(src_dir, 'foo.txt'), os.path.join(dst_dir, 'foo.txt')
+        for write in (
+            lambda: utils.write_file(b'new content', dst),
+            lambda: utils.copy_file(os.path.join(src_dir, 'bar.txt'), dst),
+        ):
+            with self.subTest(write):
+                os.link(src, dst)
+                write()
+                self.assertFalse(os.path.samefile(src, dst))
+                with open(src, encoding='utf-8') as f:
+                    self.assertEqual(f.read(), 'content')
+                os.remove(dst)
+
     def test_mm_meta_data(self):
         doc = dedent(
             """
@@ -619,6 +677,48 @@ class UtilsTests(unittest.TestCase):
         )
         self.assertEqual(utils.meta.get_data(doc), (doc, {}))
 
+    def test_mm_meta_data_line_endings(self):
+        doc = 'Title: Foo\r\n    Bar\r\n\r\nDoc\rbody'
+        self.assertEqual(utils.meta.get_data(doc), ('Doc\nbody', {'title': 'Foo Bar'}))
+
+    def test_get_markdown_title(self):
+        self.assertEqual(utils.get_markdown_title('\n  \n # Foo Bar \nbody'), 'Foo Bar')
+        self.assertIsNone(utils.get_markdown_title('Intro\n# Foo Bar'))
+        self.assertIsNone(utils.get_markdown_title('## Foo Bar'))
+        self.assertIsNone(utils.get_markdown_title(' \n'))
+
+    @tempdir(
+        files={
+            'yaml.md': '---\ntitle: Foo\nlist:\n  - a\n---\n\n# Heading\n\nBody',
+            'mm.md': 'Title: Foo\nTags: a\n    b\n\n\n# Heading\nBody',
+            'none.md': '\n\nBody\n# Heading',
+            'open.md': '---\n\n# Heading\n',
+        }
+    )
+    def test_read_head(self, docs_dir):
+        for name, expected in (
+            ('yaml.md', ({'title': 'Foo', 'list': ['a']}, 'Heading')),
+            ('mm.md', ({'title': 'Foo', 'tags': 'a b'}, 'Heading')),
+            ('none.md', ({}, None)),
+            ('open.md', ({}, None)),
+        ):
+            path = os.path.join(docs_dir, name)
+            with open(path, encoding='utf-8') as f:
+                doc, data = utils.meta.get_data(f.read())
+            self.assertEqual((data, utils.get_markdown_title(doc)), expected)
+            # Reading the file in chunks as small as can be gives the same result.
+            for size in (1, 4096):
+                with self.subTest(name, size=size):
+                    self.assertEqual(utils.meta.read_head(path, size), expected)
+
+    @tempdir()
+    def test_read_head_stops_early(self, docs_dir):
+        path = os.path.join(docs_dir, 'index.md')
+        with open(path, 'wb') as f:
+            # The body isn't even valid UTF-8, as it is never read.
+            f.write(b'Title: Foo\n\n# Heading\n' + b'Body\n' * 10000 + b'\xff')
+        self.assertEqual(utils.meta.read_head(path, 64), ({'title': 'Foo'}, 'Heading'))
+
 
 class LogCounterTests(unittest.TestCase):
     def setUp(self):
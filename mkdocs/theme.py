@@ -5,7 +5,8 @@ import jinja2
 
 from mkdocs import localization, utils
 from mkdocs.config.base import ValidationError
-from mkdocs.utils import filters
+from mkdocs.utils import filters, templates
+from mkdocs.utils.cache import make_key
 
 log = logging.getLogger(__name__)
 
@@ -109,12 +110,88 @@ class Theme:
         self.static_templates.update(theme_config.pop('static_templates', []))
         self._vars.update(theme_config)
 
-    def get_env(self):
-        """Return a Jinja environment for the theme."""
+    def get_env(self, cache_dir=None):
+        """
+        Return a Jinja environment for the theme.
+
+        If `cache_dir` is given, compiled templates are cached in it between builds.
+        """
 
         loader = jinja2.FileSystemLoader(self.dirs)
         # No autoreload because editing a template in the middle of a build is not useful.
-        env = jinja2.Environment(loader=loader, auto_reload=False)
+        env = _Environment(loader=loader, auto_reload=False)
         env.filters['url'] = filters.url_filter
+        env.globals['render_nav_item'] = filters.get_nav_item_renderer(
+            external=bool(self._vars.get('external_nav'))
+        )
         localization.install_translations(env, self._vars['locale'], self.dirs)
+        if cache_dir:
+            install_bytecode_cache(env, cache_dir)
         return env
+
+
+class _Environment(jinja2.Environment):
+    """A Jinja environment which records the templates it loads, see `mkdocs.utils.templates`."""
+
+    # Includes, imports and `extends` load templates through these methods as they render.
+    def get_template(self, name, parent=None, globals=None):
+        template = super().get_template(name, parent, globals)
+        templates.record(template.name)
+        return template
+
+    def select_template(self, names, parent=None, globals=None):
+        template = super().select_template(names, parent, globals)
+        templates.record(template.name)
+        return template
+
+
+def install_bytecode_cache(env, cache_dir):
+    """
+    Cache the templates compiled by the Jinja environment `env` in a subdirectory of `cache_dir`.
+
+    Jinja only reuses a compiled template if the source of the template is unchanged. The
+    cache key of each template also includes the version of Jinja and the settings of the
+    environment which affect compilation, as Jinja doesn't check those. They are read as
+    each template is loaded, so that the extensions which plugins add to the environment
+    after it is created count too.
+    """
+    directory = os.path.join(cache_dir, 'jinja')
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        log.debug(f"Not caching compiled templates in '{directory}': {e}")
+        return
+    env.bytecode_cache = _BytecodeCache(directory)
+
+
+class _BytecodeCache(jinja2.FileSystemBytecodeCache):
+    """A bytecode cache keyed by the compile settings of the environment, see above."""
+
+    def get_bucket(self, environment, name, filename, source):
+        settings = make_key(
+            jinja2.__version__,
+            sorted(environment.extensions),
+            getattr(environment, 'newstyle_gettext', None),
+            [getattr(environment, attr) for attr in _COMPILE_SETTINGS],
+        )
+        return super().get_bucket(environment, f'{settings}:{name}', filename, source)
+
+
+# The attributes of a Jinja environment which affect how a template is compiled.
+_COMPILE_SETTINGS = (
+    'block_start_string',
+    'block_end_string',
+    'variable_start_string',
+    'variable_end_string',
+    'comment_start_string',
+    'comment_end_string',
+    'line_statement_prefix',
+    'line_comment_prefix',
+    'trim_blocks',
+    'lstrip_blocks',
+    'newline_sequence',
+    'keep_trailing_newline',
+    'autoescape',
+    'finalize',
+    'optimized',
+)
@@ -9,6 +9,36 @@ function getSearchTerm() {
     }
 }
 
+function loadExternalNav(callback) {
+    // With the `external_nav` theme option, the nav items which aren't along the path to
+    // the current page are left out of it, and loaded from 'nav-items.json' instead.
+    var placeholders = document.querySelectorAll('template[data-nav-item]');
+    if (!placeholders.length) {
+        callback();
+        return;
+    }
+    var url = new URL('nav-items.json', new URL(base_url.replace(/\/?$/, '/'), window.location.href));
+    fetch(url).then(function(response) {
+        if (!response.ok) {
+            throw new Error(response.status + ' ' + response.statusText);
+        }
+        return response.json();
+    }).then(function(items) {
+        placeholders.forEach(function(placeholder) {
+            var html = items[placeholder.getAttribute('data-nav-item')];
+            if (html === undefined) {
+                return;
+            }
+            // URLs are marked with '\x1a' and relative to the root of the site.
+            placeholder.outerHTML = html.replace(/\x1a([^\x1a]*)\x1a/g, function(match, path) {
+                return /^([a-z][a-z0-9+.-]*:|\/|#)/i.test(path) ? path : new URL(path || '.', url).href;
+            });
+        });
+    }).catch(function(error) {
+        console.log('Failed to load the nav: ' + error);
+    }).then(callback);
+}
+
 function applyTopPadding() {
     // Update various absolute positions to match where the main container
     // starts. This is necessary for handling multi-line nav headers, since
@@ -136,21 +166,23 @@ $(document).ready(function() {
         popup.find('.dropdown-submenu > a').removeClass('open');
     }
 
-    $('.dropdown-submenu > a').on('click', function(e) {
-        if ($(this).next('.dropdown-menu').hasClass('show')) {
-            hideInnerDropdown(this);
-        } else {
-            showInnerDropdown(this);
-        }
+    loadExternalNav(function() {
+        $('.dropdown-submenu > a').on('click', function(e) {
+            if ($(this).next('.dropdown-menu').hasClass('show')) {
+                hideInnerDropdown(this);
+            } else {
+                showInnerDropdown(this);
+            }
 
-        e.stopPropagation();
-        e.preventDefault();
-    });
+            e.stopPropagation();
+            e.preventDefault();
+        });
 
-    $('.dropdown-menu').parent().on('hide.bs.dropdown', function(e) {
-        $(this).find('.dropdown-menu').scrollTop(0);
-        $(this).find('.dropdown-submenu > a').removeClass('open');
-        $(this).find('.dropdown-menu .dropdown-menu').removeClass('show');
+        $('.dropdown-menu').parent().on('hide.bs.dropdown', function(e) {
+            $(this).find('.dropdown-menu').scrollTop(0);
+            $(this).find('.dropdown-submenu > a').removeClass('open');
+            $(this).find('.dropdown-menu .dropdown-menu').removeClass('show');
+        });
     });
 });
 
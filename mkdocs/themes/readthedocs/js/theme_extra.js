@@ -6,3 +6,36 @@
  */
 
 $('div.rst-content table').addClass('docutils');
+
+/*
+ * With the `external_nav` theme option, the nav items which aren't along the
+ * path to the current page are left out of it, and loaded from
+ * 'nav-items.json' instead. `callback` is called once they are in place.
+ */
+function loadExternalNav(callback) {
+    var placeholders = document.querySelectorAll('template[data-nav-item]');
+    if (!placeholders.length) {
+        callback();
+        return;
+    }
+    var url = new URL('nav-items.json', new URL(base_url.replace(/\/?$/, '/'), window.location.href));
+    fetch(url).then(function (response) {
+        if (!response.ok) {
+            throw new Error(response.status + ' ' + response.statusText);
+        }
+        return response.json();
+    }).then(function (items) {
+        placeholders.forEach(function (placeholder) {
+            var html = items[placeholder.getAttribute('data-nav-item')];
+            if (html === undefined) {
+                return;
+            }
+            // URLs are marked with '\x1a' and relative to the root of the site.
+            placeholder.outerHTML = html.replace(/\x1a([^\x1a]*)\x1a/g, function (match, path) {
+                return /^([a-z][a-z0-9+.-]*:|\/|#)/i.test(path) ? path : new URL(path || '.', url).href;
+            });
+        });
+    }).catch(function (error) {
+        console.log('Failed to load the nav: ' + error);
+    }).then(callback);
+}
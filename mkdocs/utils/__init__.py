@@ -12,8 +12,10 @@ import os
 import posixpath
 import re
 import shutil
+import sys
+import threading
 import warnings
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
 from pathlib import PurePath
 from urllib.parse import urlsplit
@@ -24,6 +26,7 @@ from mergedeep import merge
 from yaml_env_tag import construct_env_tag
 
 from mkdocs import exceptions
+from mkdocs.utils import meta
 
 log = logging.getLogger(__name__)
 
@@ -123,27 +126,147 @@ def reduce_list(data_set):
     return list(dict.fromkeys(data_set))
 
 
-def copy_file(source_path, output_path):
+def copy_file(source_path, output_path, hardlink=False):
     """
     Copy source_path to output_path, making sure any parent directories exist.
 
-    The output_path may be a directory.
+    The output_path may be a directory. If `hardlink` is true, output_path is made a hard link
+    to source_path where possible, so that it shares its content and permissions. Otherwise,
+    the data is left to the file system to share or copy, where it supports that.
     """
     output_dir = os.path.dirname(output_path)
     os.makedirs(output_dir, exist_ok=True)
     if os.path.isdir(output_path):
         output_path = os.path.join(output_path, os.path.basename(source_path))
-    shutil.copyfile(source_path, output_path)
+    # Opening the output for writing would truncate the source. Hard links are replaced below.
+    if os.path.realpath(source_path) == os.path.realpath(output_path):
+        raise shutil.SameFileError(f"{source_path!r} and {output_path!r} are the same file")
+    _unlink_hardlink(output_path)
+    _record_output(output_path)
+    if hardlink:
+        try:
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+            os.link(source_path, output_path)
+            return
+        except OSError:
+            pass
+    if not _copy_file_data(source_path, output_path):
+        shutil.copyfile(source_path, output_path)
+
+
+# The `FICLONE` ioctl of Linux, which makes a file share the data of another one (a reflink).
+_FICLONE = 0x40049409
+
+
+def _copy_file_data(source_path, output_path):
+    """
+    Copy the content of a file without reading it into memory, by a reflink or by
+    `os.copy_file_range`. Return False if neither is supported.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+
+    try:
+        with open(source_path, 'rb') as src, open(output_path, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return True
+            except OSError:
+                pass
+            if not hasattr(os, 'copy_file_range'):
+                return False
+            while os.copy_file_range(src.fileno(), dst.fileno(), 1024 * 1024 * 1024):
+                pass
+            return True
+    except OSError:
+        return False
+
+
+def _unlink_hardlink(path):
+    """Remove the file at `path` if it is a hard link, so that writing to it doesn't write through."""
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+_write_counts = Counter()
+_output_paths = set()
+_outputs_lock = threading.Lock()
+
+
+def get_write_counts():
+    """
+    Return the numbers of files which `write_file` wrote ('written') and left untouched
+    ('unchanged'), counting those of `keep_file` as unchanged, since `reset_outputs` was
+    last called.
+    """
+    with _outputs_lock:
+        return {'written': _write_counts['written'], 'unchanged': _write_counts['unchanged']}
+
+
+def get_output_paths():
+    """
+    Return the set of normalized absolute paths of the files which `write_file` and
+    `copy_file` wrote or left untouched, and which `keep_file` recorded, since
+    `reset_outputs` was last called.
+    """
+    with _outputs_lock:
+        return set(_output_paths)
+
+
+def reset_outputs():
+    """Reset the records returned by `get_write_counts` and `get_output_paths`."""
+    with _outputs_lock:
+        _write_counts.clear()
+        _output_paths.clear()
+
+
+def _record_output(path, count=None):
+    path = os.path.abspath(path)
+    with _outputs_lock:
+        _output_paths.add(path)
+        if count:
+            _write_counts[count] += 1
 
 
 def write_file(content, output_path):
     """
     Write content to output_path, making sure any parent directories exist.
+
+    If the file has that content already, it is left untouched, so that its modification
+    time is kept and tools which sync the output only see the files which changed. Return
+    True if the file was written.
     """
-    output_dir = os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
-    with open(output_path, 'wb') as f:
-        f.write(content)
+    try:
+        unchanged = (
+            os.path.getsize(output_path) == len(content) and _read_bytes(output_path) == content
+        )
+    except OSError:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        unchanged = False
+    if not unchanged:
+        _unlink_hardlink(output_path)
+        with open(output_path, 'wb') as f:
+            f.write(content)
+    _record_output(output_path, 'unchanged' if unchanged else 'written')
+    return not unchanged
+
+
+def keep_file(output_path):
+    """
+    Record the file at output_path as an unchanged output, without reading it, for outputs
+    which are known to be up to date.
+    """
+    _record_output(output_path, 'unchanged')
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
 
 
 def clean_directory(directory):
@@ -354,14 +477,7 @@ def get_markdown_title(markdown_src):
     None.
     """
 
-    lines = markdown_src.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-    while lines:
-        line = lines.pop(0).strip()
-        if not line.strip():
-            continue
-        if not line.startswith('# '):
-            return
-        return line.lstrip('# ')
+    return meta.get_title(markdown_src)
 
 
 def find_or_create_node(branch, key):
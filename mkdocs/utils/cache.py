@@ -0,0 +1,157 @@
+"""
+A persistent cache of byte strings, kept in a directory between builds, and a store
+of strings kept on disk during a build.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import types
+from collections.abc import Mapping
+
+from markdown.extensions import Extension
+
+log = logging.getLogger(__name__)
+
+
+def json_default(obj):
+    """
+    Represent an object which isn't JSON serializable, for use as part of a cache key.
+
+    Mappings, sets, functions and classes are represented in a way that is stable across
+    builds, and so are Markdown extensions, by their class and config. Other objects are
+    represented by their repr, or by their class if their repr is the default one, which
+    holds the address of the object and so changes on every build.
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    if isinstance(obj, (type, types.FunctionType)):
+        return f'{obj.__module__}.{obj.__qualname__}'
+    name = f'{type(obj).__module__}.{type(obj).__qualname__}'
+    if isinstance(obj, Extension):
+        return [name, obj.getConfigs()]
+    if type(obj).__repr__ is object.__repr__:
+        return name
+    return repr(obj)
+
+
+def make_key(*parts):
+    """Return a cache key which is unique to the JSON representation of `parts`."""
+    data = json.dumps(parts, default=json_default)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    A store of byte strings in a directory, keyed by the hex digests from `make_key`.
+
+    Entries are written atomically, so a cache can be shared by several processes.
+    Reading an entry marks it as recently used, and `prune` removes the least recently
+    used entries.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the value stored for `key`, or None."""
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return value
+
+    def set(self, key, value):
+        """Store the byte string `value` for `key`."""
+        path = self._get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.debug(f"Failed to write to the cache at '{self.directory}': {e}")
+
+    def prune(self, max_size):
+        """Remove the least recently used entries until the cache takes at most `max_size` bytes."""
+        entries = []
+        total = 0
+        for root, dirnames, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class SpilledText(collections.namedtuple('SpilledText', 'store offset length')):
+    """A reference to a string stored in a `SpillFile`."""
+
+    def read(self):
+        """Return the string."""
+        return self.store.read(self.offset, self.length)
+
+
+class SpillFile:
+    """
+    A store of strings in an anonymous temporary file, to keep them out of memory.
+
+    `put` appends a string to the file and returns a `SpilledText` to read it back with.
+    Strings are never removed, and the file is deleted once closed. It can be used from
+    several threads at once.
+    """
+
+    def __init__(self, directory=None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def put(self, value):
+        """Store the string `value` and return a `SpilledText` referring to it."""
+        data = value.encode('utf-8', errors='surrogatepass')
+        with self._lock:
+            offset = self._size
+            self._file.seek(offset)
+            self._file.write(data)
+            self._size += len(data)
+        return SpilledText(self, offset, len(data))
+
+    def read(self, offset, length):
+        """Return the string of `length` bytes stored at `offset`."""
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return data.decode('utf-8', errors='surrogatepass')
+
+    @property
+    def size(self):
+        """The number of bytes in the file."""
+        return self._size
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,84 @@
+"""
+Compressed copies of the text outputs of a build, which web servers can send as they are,
+like nginx does with `gzip_static` and `brotli_static`.
+
+Each copy is written next to its output, with the extension of its format appended.
+"""
+
+import gzip
+import io
+import logging
+import os
+
+from mkdocs import utils
+
+try:
+    import brotli
+
+    has_brotli = True
+except ImportError:  # pragma: no cover
+    has_brotli = False
+
+log = logging.getLogger(__name__)
+
+# The extensions of the outputs which are worth compressing.
+COMPRESSED_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.json', '.xml')
+
+# The extension of the copies in each format.
+FORMATS = {'gzip': '.gz', 'brotli': '.br'}
+
+
+def gzip_compress(data, path, level=9):
+    """
+    Return `data`, the content of the file at `path`, compressed with gzip.
+
+    Like the `gzip` command, the name of the file is recorded in the header. Its time is that
+    of the build, so that builds are reproducible.
+    """
+    buf = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buf,
+        filename=path + '.gz',
+        mode='wb',
+        compresslevel=level,
+        mtime=utils.get_build_timestamp(),
+    ) as gz_buf:
+        gz_buf.write(data)
+    return buf.getvalue()
+
+
+def brotli_compress(data, path, quality=11):
+    """Return `data`, the content of the file at `path`, compressed with brotli."""
+    mode = brotli.MODE_TEXT if path.endswith(('.html', '.htm')) else brotli.MODE_GENERIC
+    return brotli.compress(data, mode=mode, quality=quality)
+
+
+def get_formats(names):
+    """Return those of the format `names` which can be written, warning about the others."""
+    if 'brotli' in names and not has_brotli:
+        log.warning(
+            "Brotli compressed outputs are not written, as the 'brotli' package is not "
+            "installed. Install it with `pip install mkdocs[brotli]`."
+        )
+        names = [name for name in names if name != 'brotli']
+    return list(names)
+
+
+def is_compressible(path, min_size=0):
+    """Return True if the file at `path` is a text output of at least `min_size` bytes."""
+    return path.lower().endswith(COMPRESSED_EXTENSIONS) and os.path.getsize(path) >= min_size
+
+
+def compress_file(path, levels):
+    """
+    Write the compressed copies of the file at `path`, in each format of `levels`, a mapping
+    of format names to compression levels. Return the number of copies written, which
+    excludes the copies that had the same content already.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = 0
+    for name, level in levels.items():
+        compress = gzip_compress if name == 'gzip' else brotli_compress
+        written += utils.write_file(compress(data, path, level), path + FORMATS[name])
+    return written
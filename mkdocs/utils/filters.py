@@ -1,12 +1,122 @@
+import re
+import threading
+
 try:
     from jinja2 import pass_context as contextfilter
+    from jinja2 import pass_context as contextfunction
 except ImportError:
-    from jinja2 import contextfilter
+    from jinja2 import contextfilter, contextfunction
+
+from markupsafe import Markup, escape
+
+from mkdocs.utils import normalize_url, templates
+
+# Set while rendering nav items which are cached, to defer making their URLs relative.
+_deferred_urls = threading.local()
 
-from mkdocs.utils import normalize_url
+_URL_PLACEHOLDER = re.compile('\x1a([^\x1a]*)\x1a')
+
+# The file, relative to `site_dir`, to which externalized nav items are written.
+NAV_ITEMS_FILE = 'nav-items.json'
 
 
 @contextfilter
 def url_filter(context, value):
     """A Template filter to normalize URLs."""
+    if getattr(_deferred_urls, 'active', False):
+        return f'\x1a{value or ""}\x1a'
     return normalize_url(value, page=context['page'], base=context['base_url'])
+
+
+def _get_item_position(nav_item, nav):
+    """Return the indexes of `nav_item` and its ancestors in their parents, as 'i.j.k'."""
+    positions = []
+    while nav_item is not None:
+        parent = getattr(nav_item, 'parent', None)
+        siblings = parent.children if parent is not None else nav.items
+        positions.append(next(i for i, item in enumerate(siblings) if item is nav_item))
+        nav_item = parent
+    return '.'.join(str(i) for i in reversed(positions))
+
+
+def get_nav_item_renderer(external=False):
+    """
+    Return the `render_nav_item` template function, with a cache of its own.
+
+    `render_nav_item(template_name, nav_item, **kwargs)` renders the template with the
+    current context, in which `nav_item` and `kwargs` are set. It returns the same output
+    as `{% include %}` would. Unless the item is active, the output is cached and reused
+    for all pages. This saves rendering the whole nav for each page, as only the items
+    along the path to the current page are rendered again.
+
+    The template must not depend on the current page other than through the `active`
+    attribute of nav items, the `url` filter and `base_url`. The URLs output by the `url`
+    filter are made relative to the current page when the cached output is reused. As
+    `base_url` may be output as it is, the output is only reused on pages with the same
+    `base_url`. `kwargs` are part of the cache key, so they must be hashable.
+
+    If `external` is true, inactive items are output as empty `<template data-nav-item>`
+    placeholders instead, and the template must not output `base_url` itself. Their output,
+    with the URLs left as `\\x1a`-delimited markers to be made relative to `site_dir`, is
+    collected in `render_nav_item.external_items` by the key found in the `data-nav-item`
+    attribute. The theme is expected to fill the placeholders in from the `NAV_ITEMS_FILE`
+    to which the build writes them.
+    """
+    cache = {}
+    external_keys = {}
+    external_items = {}
+
+    @contextfunction
+    def render_nav_item(context, template_name, nav_item, **kwargs):
+        def render():
+            template = context.environment.get_template(template_name)
+            return template.render(context.get_all(), nav_item=nav_item, **kwargs)
+
+        if getattr(nav_item, 'active', False):
+            return Markup(render())
+
+        # An absolute `base_url` is used for pages which are not part of the site (404.html).
+        key = (
+            template_name,
+            id(nav_item),
+            context.get('base_url'),
+            context.get('page') is None,
+            tuple(sorted(kwargs.items())),
+        )
+        cached = cache.get(key)
+        deferred = getattr(_deferred_urls, 'active', False)
+        if cached is None:
+            _deferred_urls.active = True
+            try:
+                with templates.recording() as names:
+                    output = render()
+                cache[key] = (output, names)
+            finally:
+                _deferred_urls.active = deferred
+        else:
+            # The page reusing the output depends on the templates it was rendered with.
+            output, names = cached
+            templates.record(*names)
+        if deferred:
+            # The URLs are made relative by the outermost cached item.
+            return Markup(output)
+        if external:
+            external_key = external_keys.get(key)
+            if external_key is None:
+                # Unlike `id(nav_item)`, the key must be the same in each build.
+                external_key = external_keys[key] = ' '.join(
+                    [template_name, _get_item_position(nav_item, context['nav'])]
+                    + [f'{name}={value}' for name, value in key[-1]]
+                )
+                # The same item is rendered once for each `base_url`; keep the first output.
+                external_items.setdefault(external_key, output)
+            return Markup(f'<template data-nav-item="{escape(external_key)}"></template>')
+        page, base_url = context['page'], context['base_url']
+        return Markup(
+            _URL_PLACEHOLDER.sub(
+                lambda m: normalize_url(m.group(1), page=page, base=base_url), output
+            )
+        )
+
+    render_nav_item.external_items = external_items
+    return render_nav_item
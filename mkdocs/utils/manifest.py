@@ -0,0 +1,187 @@
+"""
+A record of the inputs of a build, used to tell which outputs are out of date.
+
+The manifest is stored in the `cache_dir`, if one is configured, or else next to the site
+directory, named after it. It changes with every build, so it is kept out of the site
+directory, which is deployed as it is.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import mkdocs
+
+log = logging.getLogger(__name__)
+
+# The suffix of the name of the site directory which names the manifest next to it.
+MANIFEST_SUFFIX = '.manifest.json'
+
+
+def get_manifest_path(site_dir, cache_dir=None):
+    """Return the path of the manifest of the builds to `site_dir`."""
+    site_dir = os.path.abspath(site_dir)
+    if cache_dir:
+        # Builds to several site directories may share the cache_dir.
+        name = hashlib.sha256(site_dir.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(cache_dir, 'manifests', name + '.json')
+    return site_dir + MANIFEST_SUFFIX
+
+
+def hash_file(path):
+    """Return the hex digest of the content of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Content hashes of the files and signatures of the settings that went into a build.
+
+    Each file is identified by a `key` which is stable across builds (not necessarily
+    its path). The hash recorded by the previous build is reused as long as the size
+    and modification time of the file are unchanged, so unchanged files aren't read.
+
+    Checking a file or a signature records its current value, which is written out
+    by `save` for the next build to compare against.
+
+    The names of the templates that each output was rendered with are recorded too, so
+    that only the outputs which depend on a changed template need to be rendered again.
+    So are the states of files which other outputs show, such as their URLs and titles,
+    the dependencies of outputs on other files, and the paths of the outputs themselves.
+    """
+
+    def __init__(self, site_dir, cache_dir=None):
+        self.path = get_manifest_path(site_dir, cache_dir)
+        self._previous = self._load()
+        self._files = {}
+        self._signatures = {}
+        self._templates = {}
+        self._states = {}
+        self._dependencies = {}
+        self._outputs = []
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict) or data.get('version') != mkdocs.__version__:
+            if data:
+                log.debug(f"Ignoring the build manifest of another version of MkDocs: {self.path}")
+            data = {}
+        for name in ('files', 'signatures', 'templates', 'states', 'dependencies'):
+            data.setdefault(name, {})
+        data.setdefault('outputs', [])
+        return data
+
+    def hash_file(self, key, path):
+        """Return the content hash of the file at `path`, recording it under `key`."""
+        stat = os.stat(path)
+        for record in (self._files.get(key), self._previous['files'].get(key)):
+            if record and record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns:
+                digest = record['hash']
+                break
+        else:
+            digest = hash_file(path)
+        self._files[key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest}
+        return digest
+
+    def record_file(self, key, path, digest):
+        """Record `digest` as the content hash of the file just written to `path`."""
+        stat = os.stat(path)
+        self._files[key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest}
+
+    def file_changed(self, key, path):
+        """Return True if the content of the file has changed since the previous build."""
+        previous = self._previous['files'].get(key)
+        return self.hash_file(key, path) != (previous and previous['hash'])
+
+    def signature_changed(self, name, value):
+        """Record the string `value` as signature `name`. Return True if it changed."""
+        digest = hashlib.sha256(value.encode('utf-8')).hexdigest()
+        self._signatures[name] = digest
+        return self._previous['signatures'].get(name) != digest
+
+    def record_templates(self, key, names):
+        """Record the `names` of the templates that the output of the file `key` depends on."""
+        self._templates[key] = sorted(names)
+
+    def get_templates(self, key):
+        """
+        Return the names of the templates that the output of the file `key` was rendered with
+        in this build, or else in the previous one, or None if it never was.
+        """
+        return self._templates.get(key, self._previous['templates'].get(key))
+
+    def states_changed(self, states):
+        """
+        Record `states`, a mapping of file keys to strings which represent what other outputs
+        show of each file. Return the keys whose state changed since the previous build,
+        including the keys of files which were added or removed.
+        """
+        self._states = {
+            key: hashlib.sha256(state.encode('utf-8')).hexdigest() for key, state in states.items()
+        }
+        previous = self._previous['states']
+        return {
+            key
+            for key in self._states.keys() | previous.keys()
+            if self._states.get(key) != previous.get(key)
+        }
+
+    def record_dependencies(self, data):
+        """Record the JSON serializable dependencies of the outputs of this build."""
+        self._dependencies = data
+
+    def record_outputs(self, paths):
+        """Record the `paths` of the outputs of this build, relative to the site directory."""
+        self._outputs = sorted(paths)
+
+    @property
+    def previous_outputs(self):
+        """The paths of the outputs recorded by the previous build."""
+        return self._previous['outputs']
+
+    @property
+    def previous_dependencies(self):
+        """The dependencies of the outputs recorded by the previous build."""
+        return self._previous['dependencies']
+
+    def templates_changed(self, key, changed):
+        """
+        Return True if any of the templates that the output of the file `key` was rendered with
+        in the previous build has changed, according to the `changed` mapping of template names
+        to booleans. Templates missing from `changed` count as changed, and so do the templates
+        of a file which wasn't rendered before.
+        """
+        names = self._previous['templates'].get(key)
+        return names is None or any(changed.get(name, True) for name in names)
+
+    def save(self):
+        """Write the files and signatures recorded by this build for the next one."""
+        # The outputs which weren't rendered again depend on the same templates as before.
+        templates = {
+            key: names for key, names in self._previous['templates'].items() if key in self._files
+        }
+        templates.update(self._templates)
+        data = {
+            'version': mkdocs.__version__,
+            'signatures': self._signatures,
+            'files': self._files,
+            'templates': templates,
+            'states': self._states,
+            'dependencies': self._dependencies,
+            'outputs': self._outputs,
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Replace the file rather than write to it, in case it is a hard link.
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
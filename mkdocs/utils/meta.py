@@ -48,39 +48,53 @@ except ImportError:  # pragma: no cover
 #####################################################################
 
 YAML_RE = re.compile(r'^-{3}[ \t]*\n(.*?\n)(?:\.{3}|-{3})[ \t]*\n', re.UNICODE | re.DOTALL)
+YAML_START_RE = re.compile(r'^-{3}[ \t]*\n')
 META_RE = re.compile(r'^[ ]{0,3}(?P<key>[A-Za-z0-9_-]+):\s*(?P<value>.*)')
 META_MORE_RE = re.compile(r'^([ ]{4}|\t)(\s*)(?P<value>.*)')
+# Whitespace, then the first line with any content.
+FIRST_LINE_RE = re.compile(r'\s*([^\r\n]*)')
 
 
-def get_data(doc):
+def _scan_data(doc, final=True):
     """
-    Extract meta-data from a text document.
+    Find the meta-data at the head of a text document, looking at no more of it than needed.
 
-    Returns a tuple of document and a data dict.
-    """
-    data = {}
+    Return a tuple of the document, with normalized line endings unless it has YAML meta-data,
+    the offset at which the content after the meta-data starts in it, and the data dict.
 
+    If `final` is false, `doc` is only the start of the document, up to the end of a line,
+    and None is returned if more of it is needed to tell.
+    """
     # First try YAML
     m = YAML_RE.match(doc)
     if m:
         try:
             data = yaml.load(m.group(1), SafeLoader)
-            if isinstance(data, dict):
-                doc = doc[m.end() :].lstrip('\n')
-            else:
-                data = {}
         except Exception:
-            pass
-        return doc, data
+            return doc, 0, {}
+        if isinstance(data, dict):
+            return doc, m.end(), data
+        return doc, 0, {}
+    if not final and YAML_START_RE.match(doc):
+        return None
 
     # No YAML delimiters. Try MultiMarkdown style
-    lines = doc.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    if '\r' in doc:
+        doc = doc.replace('\r\n', '\n').replace('\r', '\n')
 
+    data = {}
     key = None
-    while lines:
-        line = lines.pop(0)
+    pos = 0
+    while pos <= len(doc):
+        end = doc.find('\n', pos)
+        if end == -1:
+            if not final:
+                return None
+            end = len(doc)
+        line = doc[pos:end]
 
         if line.strip() == '':
+            pos = end + 1
             break  # blank line - done
         m1 = META_RE.match(line)
         if m1:
@@ -96,6 +110,54 @@ def get_data(doc):
                 # Add another line to existing key
                 data[key] += ' {}'.format(m2.group('value').strip())
             else:
-                lines.insert(0, line)
                 break  # no meta data - done
-    return '\n'.join(lines).lstrip('\n'), data
+        pos = end + 1
+    return doc, pos, data
+
+
+def get_data(doc):
+    """
+    Extract meta-data from a text document.
+
+    Returns a tuple of document and a data dict.
+    """
+    doc, pos, data = _scan_data(doc)
+    return doc[pos:].lstrip('\n'), data
+
+
+def get_title(doc, pos=0):
+    """
+    Return the title of a Markdown document, starting at `pos`, or None.
+
+    The title is a level 1 heading which comes before any other content. Only the first
+    line with any content is looked at.
+    """
+    line = FIRST_LINE_RE.match(doc, pos).group(1).strip()
+    if not line.startswith('# '):
+        return None
+    return line.lstrip('# ')
+
+
+def read_head(path, size=4096):
+    """
+    Return the meta-data and the title of the Markdown file at `path`, as `get_data` and
+    `get_title` would, reading no more of the file than they need.
+
+    The file is read in chunks of growing `size`, so only its head is read unless the
+    meta-data is longer.
+    """
+    text = ''
+    with open(path, encoding='utf-8-sig', errors='strict') as f:
+        while True:
+            chunk = f.read(size)
+            text += chunk
+            final = len(chunk) < size
+            # Only complete lines are scanned, until the end of the file.
+            head = text if final else text[: text.rfind('\n') + 1]
+            result = _scan_data(head, final)
+            if result is not None:
+                doc, pos, data = result
+                # The first line of content must be complete too.
+                if final or FIRST_LINE_RE.match(doc, pos).end() < len(doc):
+                    return data, get_title(doc, pos)
+            size *= 2
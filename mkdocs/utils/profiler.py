@@ -0,0 +1,172 @@
+"""
+Timing of the phases of a build, of each page and of each plugin event handler.
+
+Code which is worth timing wraps itself in `span`, which does nothing unless a
+`Profiler` is installed with `set_profiler`.
+"""
+
+import json
+import os
+import threading
+import time
+
+import mkdocs
+
+_profiler = None
+
+
+class _NoSpan:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def set_profiler(profiler):
+    """Install `profiler` (or None) to record all spans. Return the previous one."""
+    global _profiler
+    previous, _profiler = _profiler, profiler
+    return previous
+
+
+def get_profiler():
+    """Return the installed profiler, or None."""
+    return _profiler
+
+
+def span(category, name, page=None):
+    """
+    Return a context manager which records the time spent in it, if a profiler is installed.
+
+    `category` is one of 'phase', 'page', 'template' or 'plugin'. For the 'page' category,
+    `name` is a stage of the build of the page identified by `page` (a `src_uri`).
+    """
+    profiler = _profiler
+    if profiler is None:
+        return _NO_SPAN
+    return profiler.span(category, name, page)
+
+
+class _Span:
+    def __init__(self, profiler, category, name, page):
+        self.profiler = profiler
+        self.args = (category, name, page)
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(*self.args, self.start, time.time() - self.start)
+
+
+class Profiler:
+    """
+    A record of spans of wall time spent in a build.
+
+    Spans may be recorded from several threads at once, and spans timed in other
+    processes may be added with `add`. Times are taken from `time.time`, so that they
+    can be compared between processes.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.end = None
+        # Tuples of (category, name, page, start, duration, pid, tid).
+        self.spans = []
+
+    def span(self, category, name, page=None):
+        """Return a context manager which records the time spent in it. See `span`."""
+        return _Span(self, category, name, page)
+
+    def add(self, category, name, page, start, duration, pid=None, tid=None):
+        """Record a span. `pid` and `tid` default to the current process and thread."""
+        if pid is None:
+            pid = os.getpid()
+        if tid is None:
+            tid = threading.get_ident()
+        self.spans.append((category, name, page, start, duration, pid, tid))
+
+    def stop(self):
+        """Mark the end of the build."""
+        self.end = time.time()
+
+    def get_report(self, limit=10):
+        """
+        Return a summary of the recorded spans, with the `limit` slowest pages and handlers.
+
+        The total time of a page is the sum of the time spent in each of its stages. The
+        time spent in plugin event handlers is also included in the phases and pages in
+        which they ran.
+        """
+        phases = {}
+        pages = {}
+        templates = {}
+        plugins = {}
+        for category, name, page, start, duration, pid, tid in self.spans:
+            if category == 'phase':
+                phases[name] = phases.get(name, 0) + duration
+            elif category == 'page':
+                stages = pages.setdefault(page, {})
+                stages[name] = stages.get(name, 0) + duration
+            elif category == 'template':
+                templates[name] = templates.get(name, 0) + duration
+            elif category == 'plugin':
+                handler = plugins.setdefault(name, {'calls': 0, 'total': 0})
+                handler['calls'] += 1
+                handler['total'] += duration
+        for stages in pages.values():
+            stages['total'] = sum(stages.values())
+
+        slowest_pages = sorted(pages.items(), key=lambda item: -item[1]['total'])[:limit]
+        slowest_handlers = sorted(plugins.items(), key=lambda item: -item[1]['total'])[:limit]
+        return {
+            'mkdocs_version': mkdocs.__version__,
+            'total': (self.end or time.time()) - self.start,
+            'phases': phases,
+            'pages': pages,
+            'templates': templates,
+            'plugins': plugins,
+            'slowest_pages': [
+                {'page': page, 'total': stages['total']} for page, stages in slowest_pages
+            ],
+            'slowest_handlers': [
+                {'handler': name, 'calls': handler['calls'], 'total': handler['total']}
+                for name, handler in slowest_handlers
+            ],
+        }
+
+    def get_trace(self):
+        """Return the recorded spans in the Trace Event Format of Chrome's trace viewer."""
+        events = []
+        for category, name, page, start, duration, pid, tid in self.spans:
+            event = {
+                'name': name if page is None else f'{name} {page}',
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.start) * 1e6),
+                'dur': round(duration * 1e6),
+                'pid': pid,
+                'tid': tid,
+            }
+            if page is not None:
+                event['args'] = {'page': page}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        """
+        Write the report to `path`, and the trace next to it. Return the path of the trace.
+
+        The trace has the same name as the report, with the extension replaced by
+        '.trace.json'.
+        """
+        trace_path = os.path.splitext(path)[0] + '.trace.json'
+        for data, output_path in ((self.get_report(), path), (self.get_trace(), trace_path)):
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        return trace_path
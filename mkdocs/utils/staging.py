@@ -0,0 +1,95 @@
+"""
+Building the site into a staging directory, which then replaces the site directory at once.
+
+The site directory is made a symbolic link to the latest of the generations of the site,
+which are kept in a sibling directory named after it, with a '.generations' suffix. A new
+generation is staged as hard links to the files of the current one, so that the files which
+a build doesn't change are neither copied nor written. As `utils.write_file` and
+`utils.copy_file` replace hard links instead of writing through them, the current
+generation stays intact while the next one is built.
+
+Where symbolic links aren't supported, the staging directory is renamed to the site
+directory instead, after moving the current one away. This leaves a moment during which
+the site directory is missing.
+"""
+
+import logging
+import os
+import shutil
+
+log = logging.getLogger(__name__)
+
+
+def get_generations_dir(site_dir):
+    """Return the directory in which the generations of `site_dir` are kept."""
+    return os.path.normpath(site_dir) + '.generations'
+
+
+def _list_generations(generations_dir):
+    """Return the numbers of the generations in `generations_dir`, in ascending order."""
+    try:
+        names = os.listdir(generations_dir)
+    except OSError:
+        return []
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def _link_or_copy(source_path, output_path):
+    try:
+        os.link(source_path, output_path)
+    except OSError:
+        shutil.copy2(source_path, output_path)
+
+
+def create_staging_dir(site_dir):
+    """
+    Create the directory of a new generation of `site_dir`, with the same files as the
+    current one, and return its path.
+    """
+    generations_dir = get_generations_dir(site_dir)
+    numbers = _list_generations(generations_dir)
+    staging_dir = os.path.join(generations_dir, str(numbers[-1] + 1 if numbers else 1))
+    if os.path.isdir(site_dir):
+        shutil.copytree(site_dir, staging_dir, symlinks=True, copy_function=_link_or_copy)
+    else:
+        os.makedirs(staging_dir)
+    log.debug(f"Staging the site in '{staging_dir}'")
+    return staging_dir
+
+
+def publish_staging_dir(site_dir, staging_dir, keep=1):
+    """
+    Replace `site_dir` with `staging_dir`, and remove all generations but the `keep` latest
+    previous ones.
+    """
+    generations_dir = get_generations_dir(site_dir)
+    if os.path.isdir(site_dir) and not os.path.islink(site_dir):
+        # A site built in place, or without support for symbolic links, is kept as a
+        # previous generation.
+        numbers = _list_generations(generations_dir)
+        os.rename(site_dir, os.path.join(generations_dir, str(numbers[-1] + 1)))
+
+    link_path = site_dir + '.link'
+    try:
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        os.symlink(
+            os.path.relpath(staging_dir, os.path.dirname(site_dir)),
+            link_path,
+            target_is_directory=True,
+        )
+    except (OSError, NotImplementedError):
+        os.rename(staging_dir, site_dir)
+    else:
+        # Atomic where the OS supports it.
+        os.replace(link_path, site_dir)
+    log.debug(f"Published the site from '{staging_dir}'")
+
+    current = os.path.realpath(site_dir)
+    previous = [
+        number
+        for number in _list_generations(generations_dir)
+        if os.path.join(os.path.realpath(generations_dir), str(number)) != current
+    ]
+    for number in previous[: max(len(previous) - keep, 0)]:
+        shutil.rmtree(os.path.join(generations_dir, str(number)), ignore_errors=True)
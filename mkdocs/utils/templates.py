@@ -0,0 +1,34 @@
+"""
+Records the names of the templates loaded while rendering an output, so that a build can
+tell which outputs depend on a template which changed.
+
+Templates are recorded per thread, as outputs are rendered in several threads at once.
+"""
+
+import threading
+from contextlib import contextmanager
+
+_recorders = threading.local()
+
+
+@contextmanager
+def recording():
+    """
+    Collect the names of the templates loaded in this thread for the duration into the
+    yielded set. Recordings can be nested, each gets all the names recorded within it.
+    """
+    names = set()
+    stack = getattr(_recorders, 'stack', None)
+    if stack is None:
+        stack = _recorders.stack = []
+    stack.append(names)
+    try:
+        yield names
+    finally:
+        stack.pop()
+
+
+def record(*names):
+    """Record that the templates `names` are used by the outputs being rendered in this thread."""
+    for recorded in getattr(_recorders, 'stack', ()):
+        recorded.update(names)
@@ -73,7 +73,7 @@ setup(
         'packaging>=20.5',
         'mergedeep>=1.3.4'
     ],
-    extras_require={"i18n": ['babel>=2.9.0']},
+    extras_require={"i18n": ['babel>=2.9.0'], "brotli": ['brotli>=1.0.9']},
     python_requires='>=3.6',
     entry_points={
         'console_scripts': [